@@ -0,0 +1,245 @@
+from typing import Dict, Literal
+
+import numpy as np
+import pandas as pd
+
+
+class BackTestResult():
+    '''
+    BackTest.run()의 결과입니다.
+
+    Attributes
+    ----------
+    timestamps: pd.Series, 각 캔들의 시점
+    position: np.ndarray[int8], 각 캔들 동안의 보유 여부(1: 보유, 0: 미보유)
+    returns: np.ndarray[float64], 각 캔들의 수수료를 반영한 수익률
+    equity: np.ndarray[float64], 각 캔들이 끝났을 때의 자산
+    drawdown: np.ndarray[float64], 각 캔들의 직전 최고 자산 대비 하락률(0 이하)
+    trades: pd.DataFrame, 매매 기록(entry_time, exit_time, entry_price, exit_price, return, open)
+        - open이 True인 매매는 끝까지 보유 중인 매매로, 마지막 종가로 평가하며 청산 수수료는 빼지 않습니다.
+    cagr, sharpe, max_drawdown, win_rate: float, 성과 지표
+    '''
+
+
+    def __init__(
+            self,
+            timestamps: pd.Series,
+            position: np.ndarray,
+            returns: np.ndarray,
+            equity: np.ndarray,
+            trades: pd.DataFrame,
+            seed_money: float,
+            periods_per_year: float,
+            ) -> None:
+
+        self.timestamps = timestamps
+        self.position = position
+        self.returns = returns
+        self.equity = equity
+        self.trades = trades
+        self.seed_money = seed_money
+
+        peak = np.maximum.accumulate(np.concatenate(([seed_money], equity)))[1:]
+        self.drawdown = equity / peak - 1
+
+        # 성과 지표
+        years = (timestamps.iloc[-1] - timestamps.iloc[0]).total_seconds() / (365.25 * 24 * 3600) if len(timestamps) > 1 else 0.0
+        final = equity[-1] if len(equity) != 0 else seed_money
+        std = returns.std()
+
+        self.cagr = (final / seed_money) ** (1 / years) - 1 if years > 0 else float("nan")
+        self.sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else float("nan")
+        self.max_drawdown = float(self.drawdown.min()) if len(self.drawdown) != 0 else 0.0
+        self.win_rate = float((trades["return"] > 0).mean()) if len(trades) != 0 else float("nan")
+
+
+    def summary(self) -> Dict[str, float]:
+        '''
+        성과 지표를 딕셔너리로 반환합니다.
+        '''
+
+        return {
+            "final_equity": float(self.equity[-1]) if len(self.equity) != 0 else float(self.seed_money),
+            "cagr": float(self.cagr),
+            "sharpe": float(self.sharpe),
+            "max_drawdown": self.max_drawdown,
+            "win_rate": self.win_rate,
+            "trades": len(self.trades),
+        }
+
+
+    def __repr__(self) -> str:
+        return f"BackTestResult({self.summary()})"
+
+
+class BackTest():
+    '''
+    매수 신호 배열로 수익성을 검증하는 백테스트입니다.
+
+    모든 계산은 캔들 단위 반복문 없이 NumPy 배열 연산으로 처리됩니다.
+    i번째 신호는 i번째 캔들이 시작하기 전에 알 수 있는 정보로 만든 것(e.g. MAL_model.predict_all())으로 보고,
+    신호가 바뀐 캔들의 시작 가격(직전 캔들의 종가)에 체결되어 i번째 캔들의 수익률을 얻는다고 가정합니다.
+
+
+    예제
+    ----
+
+    >> model = MAL_model(data, duration)
+    >> model.add_mal(inplace=True)
+    >> result = BackTest(model.data, model.predict_all()).run()
+    >> result.summary()
+    {'final_equity': ..., 'cagr': ..., 'sharpe': ..., 'max_drawdown': ..., 'win_rate': ..., 'trades': ...}
+    '''
+
+
+    def __init__(
+            self,
+            data: pd.DataFrame,
+            signal: np.ndarray,
+            fee: float=0.05 / 100,
+            seed_money: int=50_000,
+            strategy: Literal["fixed"]="fixed",
+            price_label: str="price_close",
+            timestamp_label: str="time_period_start",
+            ) -> None:
+        '''
+        Args
+        ----
+        data: pd.DataFrame, 시간순으로 정렬된 캔들 데이터
+        signal: np.ndarray, data의 행과 같은 순서의 매수 신호(bool 또는 0/1)
+        fee: float=0.05 / 100, 매수/매도 한 번마다 거래 금액에 부과되는 수수료율
+        seed_money: int=50_000, 초기 자산
+        strategy: Literal["fixed"]="fixed", 자산 운용 방법
+            - "fixed": 신호가 있는 동안 전체 자산을 보유하고, 신호가 없으면 모두 매도합니다.
+        price_label: str="price_close", 체결 가격으로 사용할 라벨
+        timestamp_label: str="time_period_start", 데이터의 타임스탬프 라벨
+
+        Raises
+        ------
+        ValueError: 라벨이 없거나, 신호의 길이가 데이터와 다르거나, 지원하지 않는 전략인 경우 발생합니다.
+        '''
+
+        if price_label not in data.keys():
+            raise ValueError(f"{price_label}이 데이터셋에 없습니다.")
+
+        if timestamp_label not in data.keys():
+            raise ValueError(f"{timestamp_label}이 데이터셋에 없습니다.")
+
+        if len(signal) != len(data):
+            raise ValueError(f"signal length {len(signal)} does not match data length {len(data)}.")
+
+        if strategy != "fixed":
+            raise ValueError(f"strategy {strategy} is not supported, only fixed is supported for now.")
+
+        if fee < 0 or seed_money <= 0:
+            raise ValueError("fee must be 0 or upper and seed_money must over 0.")
+
+        self.data = data
+        self.signal = np.asarray(signal)
+        self.fee = fee
+        self.seed_money = seed_money
+        self.strategy = strategy
+        self.price_label = price_label
+        self.timestamp_label = timestamp_label
+
+
+    def run(self) -> BackTestResult:
+        '''
+        백테스트를 실행합니다.
+
+        Returns
+        -------
+        BackTestResult, 보유 여부, 자산 곡선, 하락률, 매매 기록, 성과 지표
+        '''
+
+        price = self.data[self.price_label].to_numpy(dtype=np.float64)
+        timestamps = self.data[self.timestamp_label].reset_index(drop=True)
+
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, utc=True, format="ISO8601")
+
+        return self.simulate(price, self.signal, timestamps, fee=self.fee, seed_money=self.seed_money)
+
+
+    @staticmethod
+    def periods_per_year(timestamps: pd.Series) -> float:
+        '''
+        캔들 간격의 중앙값으로 연간 캔들 수를 추정합니다.
+        '''
+
+        step = timestamps.diff().median().total_seconds() if len(timestamps) > 1 else 0.0
+        return 365.25 * 24 * 3600 / step if step > 0 else 1.0
+
+
+    @staticmethod
+    def simulate(
+            price: np.ndarray,
+            signal: np.ndarray,
+            timestamps: pd.Series,
+            fee: float=0.05 / 100,
+            seed_money: float=50_000,
+            periods_per_year: float | None=None,
+            ) -> BackTestResult:
+        '''
+        "fixed" 전략의 백테스트를 배열에 대해 수행합니다. run()과 ParameterSweep이 사용합니다.
+
+        Args
+        ----
+        price: np.ndarray, 체결 가격
+        signal: np.ndarray, price와 같은 길이의 매수 신호
+        timestamps: pd.Series, price와 같은 길이의 시점(datetime), 인덱스는 0부터 시작해야 합니다.
+        fee: float=0.05 / 100, 수수료율
+        seed_money: float=50_000, 초기 자산
+        periods_per_year: float | None=None, 연간 캔들 수, None인 경우 timestamps로부터 추정합니다.
+
+        Returns
+        -------
+        BackTestResult
+        '''
+
+        # 보유 여부, 첫 캔들은 직전 가격이 없으므로 보유하지 않음
+        position = (signal != 0).astype(np.int8)
+        if len(position) != 0:
+            position[0] = 0
+
+        # 캔들 수익률과 보유 여부 변경 시의 수수료
+        price_return = np.zeros(len(price))
+        price_return[1:] = price[1:] / price[:-1] - 1
+        price_return = np.nan_to_num(price_return, nan=0.0, posinf=0.0, neginf=0.0)
+
+        turnover = np.abs(np.diff(position, prepend=0))
+        growth = (1 + position * price_return) * (1 - fee * turnover)
+
+        returns = growth - 1
+        equity = seed_money * np.cumprod(growth)
+
+        # 매매 기록: 진입은 0 -> 1, 청산은 1 -> 0, 체결 가격은 직전 캔들의 종가
+        # 끝까지 보유 중이면 마지막 종가로 평가하며(open), 자산 곡선처럼 청산 수수료는 빼지 않음
+        change = np.diff(position, prepend=0, append=0)
+        entries = np.flatnonzero(change == 1)
+        exits = np.flatnonzero(change == -1)
+        still_open = exits == len(price)
+
+        entry_price = price[entries - 1]
+        exit_price = price[exits - 1]
+        trades = pd.DataFrame({
+            "entry_time": timestamps.iloc[entries].to_numpy(),
+            "exit_time": timestamps.iloc[np.minimum(exits, len(price) - 1)].to_numpy(),
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "return": exit_price / entry_price * (1 - fee) ** np.where(still_open, 1, 2) - 1,
+            "open": still_open,
+        })
+
+        if periods_per_year is None:
+            periods_per_year = BackTest.periods_per_year(timestamps)
+
+        return BackTestResult(
+            timestamps=timestamps,
+            position=position,
+            returns=returns,
+            equity=equity,
+            trades=trades,
+            seed_money=seed_money,
+            periods_per_year=periods_per_year,
+        )
@@ -0,0 +1,199 @@
+from itertools import combinations, product
+from multiprocessing import Pool, shared_memory
+from typing import Dict, Iterable, List, Literal, Tuple
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from DataFetcher.Duration import Duration
+from models.MAL import MAL_model, cross_signal
+from .BackTest import BackTest
+
+
+# 작업 프로세스가 공유 메모리에서 읽은 배열과 설정
+_worker: Dict = {}
+
+
+def _init_worker(specs: Dict[str, Tuple[str, tuple, str]], settings: Dict) -> None:
+    # 공유 메모리 블록을 복사 없이 배열로 연결, 블록 객체는 프로세스가 끝날 때까지 유지
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, (block, _, _) in specs.items()}
+    arrays = {name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf) for name, (_, shape, dtype) in specs.items()}
+
+    _setup_worker(arrays, settings)
+    _worker["blocks"] = blocks
+
+
+def _setup_worker(arrays: Dict[str, np.ndarray], settings: Dict) -> None:
+    _worker.update(arrays)
+    _worker.update(settings)
+    _worker["timestamps"] = pd.Series(pd.to_datetime(arrays["timestamps"], utc=True))
+
+
+def _run_config(config: Tuple[int, int, int]) -> Dict:
+    short, long, cross_duration = config
+    days = _worker["days"]
+
+    signal = cross_signal(
+        _worker["mal"][days.index(short)],
+        _worker["mal"][days.index(long)],
+        _worker["days_weight"] * cross_duration - 1,
+    )
+
+    result = BackTest.simulate(
+        _worker["price"],
+        signal,
+        _worker["timestamps"],
+        fee=_worker["fee"],
+        seed_money=_worker["seed_money"],
+        periods_per_year=_worker["periods_per_year"],
+    )
+
+    return {"MAL_short": f"MAL_{short}DAY", "MAL_long": f"MAL_{long}DAY", "cross_duration": cross_duration, **result.summary()}
+
+
+class ParameterSweep():
+    '''
+    MAL_model의 이동 평균 조합(MAL_short, MAL_long)과 cross_duration을 바꿔 가며 백테스트하는 파라미터 탐색기입니다.
+
+    이동 평균은 서로 다른 구간마다 한 번만 구하고, 가격/이동 평균/시점 배열을 공유 메모리에 올려
+    프로세스 풀의 작업들이 데이터프레임을 pickle하지 않고 같은 배열을 읽도록 합니다.
+
+
+    예제
+    ----
+
+    >> sweep = ParameterSweep(data, duration)
+    >> table = sweep.run(MAL_days=[5, 10, 20, 60, 120], cross_durations=range(1, 11))
+    >> table.head()
+    '''
+
+
+    def __init__(
+            self,
+            data: pd.DataFrame,
+            duration: Duration,
+            target_label: str="price_close",
+            timestamp_label: str="time_period_start",
+            fee: float=0.05 / 100,
+            seed_money: int=50_000,
+            ) -> None:
+        '''
+        Args
+        ----
+        data: pd.DataFrame, 캔들 데이터
+        duration: Duration, 데이터의 시간 간격을 담은 Duration 객체
+        target_label: str="price_close", 이동평균을 구하고 체결 가격으로 사용할 라벨
+        timestamp_label: str="time_period_start", 데이터의 타임스탬프 라벨
+        fee: float=0.05 / 100, 수수료율
+        seed_money: int=50_000, 초기 자산
+        '''
+
+        self.data = data
+        self.duration = duration
+        self.target_label = target_label
+        self.timestamp_label = timestamp_label
+        self.fee = fee
+        self.seed_money = seed_money
+
+
+    def run(
+            self,
+            MAL_days: Iterable[int],
+            cross_durations: Iterable[int],
+            pairs: Iterable[Tuple[int, int]] | None=None,
+            workers: int | None=None,
+            rank_by: Literal["final_equity", "cagr", "sharpe", "max_drawdown", "win_rate"]="sharpe",
+            ) -> pd.DataFrame:
+        '''
+        모든 조합을 백테스트하고 rank_by 기준으로 정렬한 결과표를 반환합니다.
+
+        Args
+        ----
+        MAL_days: Iterable[int], 구할 이동 평균의 간격(일)들
+        cross_durations: Iterable[int], 탐색할 cross_duration 값들
+        pairs: Iterable[Tuple[int, int]] | None=None, 탐색할 (단기, 장기) 간격 쌍, None인 경우 MAL_days에서 단기 < 장기인 모든 쌍
+        workers: int | None=None, 프로세스 수, None인 경우 CPU 수, 1인 경우 현재 프로세스에서 실행합니다.
+        rank_by: str="sharpe", 정렬 기준 지표(내림차순)
+
+        Raises
+        ------
+        ValueError: 탐색할 조합이 없는 경우 발생합니다.
+
+        Returns
+        -------
+        pd.DataFrame, 조합별 성과 지표(MAL_short, MAL_long, cross_duration, final_equity, cagr, sharpe, max_drawdown, win_rate, trades)
+        '''
+
+        workers = (os.cpu_count() or 1) if workers is None else workers
+
+        # 서로 다른 이동 평균은 한 번씩만 계산
+        model = MAL_model(
+            self.data,
+            self.duration,
+            moving_avr_interval_days=sorted(set(MAL_days)),
+            target_label=self.target_label,
+            timestamp_label=self.timestamp_label,
+        )
+        model.add_mal(inplace=True)
+
+        days: List[int] = list(model.moving_avr_interval_days)
+        pairs = combinations(days, 2) if pairs is None else pairs
+        configs = [
+            (short, long, cross_duration)
+            for (short, long), cross_duration in product(pairs, cross_durations)
+            if short < long and short in days and long in days
+        ]
+
+        if len(configs) == 0:
+            raise ValueError("no parameter combination to sweep.")
+
+        arrays = {
+            "price": model.data[self.target_label].to_numpy(dtype=np.float64),
+            "mal": np.stack([model.data[f"MAL_{day}DAY"].to_numpy(dtype=np.float64) for day in days]),
+            "timestamps": model.timestamps.astype("datetime64[ns]"),
+        }
+        settings = {
+            "days": days,
+            "days_weight": model.days_weight,
+            "fee": self.fee,
+            "seed_money": self.seed_money,
+            "periods_per_year": BackTest.periods_per_year(pd.Series(pd.to_datetime(arrays["timestamps"], utc=True))),
+        }
+
+        if workers == 1:
+            try:
+                _setup_worker(arrays, settings)
+                rows = [_run_config(config) for config in configs]
+            finally:
+                _worker.clear()
+
+        else:
+            rows = self._run_pool(arrays, settings, configs, workers)
+
+        table = pd.DataFrame(rows)
+        return table.sort_values(by=rank_by, ascending=False, na_position="last", ignore_index=True)
+
+
+    @staticmethod
+    def _run_pool(arrays: Dict[str, np.ndarray], settings: Dict, configs: List[Tuple[int, int, int]], workers: int) -> List[Dict]:
+        # 배열을 공유 메모리에 복사, 작업 프로세스는 블록 이름으로 연결
+        blocks = []
+        try:
+            specs = {}
+            for name, array in arrays.items():
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                specs[name] = (block.name, array.shape, array.dtype.str)
+
+            chunksize = max(1, len(configs) // (workers * 4))
+            with Pool(processes=workers, initializer=_init_worker, initargs=(specs, settings)) as pool:
+                return list(pool.imap_unordered(_run_config, configs, chunksize=chunksize))
+
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
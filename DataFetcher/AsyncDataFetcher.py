@@ -0,0 +1,212 @@
+from typing import AsyncIterator, Deque, List, Literal, Tuple
+from collections import deque
+
+import asyncio
+
+import pandas as pd
+
+from .Duration import Duration
+from .Candles import Candles
+from .CandleStore import CandleStore
+from .DataFetcher import DataFetcher, PartialFetchError, BTC_SYMBOL_ID, logger
+
+from RequestManager.AsyncRequestManager import AsyncRequestManager
+
+
+class AsyncDataFetcher():
+    '''
+    DataFetcher의 asyncio 버전입니다.
+
+    내부의 DataFetcher와 RequestManager(키, 요청 제한기)를 공유하므로, 같은 프로세스에서
+    동기 코드와 비동기 코드가 함께 요청을 보내도 하나의 요청 제한을 나누어 씁니다.
+
+
+    예제
+    ----
+
+    >> async with AsyncDataFetcher() as dataFetcher:
+    ...     data = await dataFetcher.get_bitcoin_candle(duration, workers=32)
+    '''
+
+
+    def __init__(self, dataFetcher: DataFetcher | None=None, pool_maxsize: int=100) -> None:
+        '''
+        Args
+        ----
+        dataFetcher: DataFetcher | None=None, RequestManager를 공유할 DataFetcher, None인 경우 새로 만듭니다.
+        pool_maxsize: int=100, 호스트 하나에 동시에 열어 둘 최대 연결 수
+        '''
+
+        self.dataFetcher = DataFetcher() if dataFetcher is None else dataFetcher
+        self.requestManager = AsyncRequestManager(self.dataFetcher.requestManager, pool_maxsize=pool_maxsize)
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+    async def close(self) -> None:
+        await self.requestManager.close()
+
+
+    async def get_bitcoin_candle(
+            self,
+            duration: Duration,
+            workers: int=8,
+            store: CandleStore | None=None,
+            format: Literal["pandas", "candles"]="pandas",
+            ) -> pd.DataFrame | Candles:
+        '''
+        DataFetcher.get_bitcoin_candle의 asyncio 버전입니다.
+
+        Parameters
+        ----------
+            duration: Duration 객체
+            workers: int=8, 동시에 요청할 최대 배치 수
+            store: CandleStore | None=None, 지정된 경우 저장소에 있는 구간은 디스크에서 읽고, 빠진 구간만 API로 받아 저장소에 추가합니다.
+            format: Literal["pandas", "candles"]="pandas", 반환 형식, DataFetcher.get_bitcoin_candle과 같습니다.
+
+        Raises
+        ------
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+            PartialFetchError: 일부 배치를 가져오지 못한 경우, 가져온 데이터는 data 속성에 담겨 있습니다.
+
+        Returns
+        -------
+            pd.DataFrame | Candles: 캔들 데이터를 담고 있는 데이터프레임, 시간 데이터는 datetime64[ns, Asia/Seoul] 형식입니다.
+        '''
+
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        if format not in ("pandas", "candles"):
+            raise ValueError(f'format must be "pandas" or "candles". input is {format}')
+
+        if store is not None:
+            for gap, covered in self.dataFetcher._missing_durations(duration, store):
+                try:
+                    data = await self.get_bitcoin_candle(gap, workers=workers)
+                except PartialFetchError as e:
+                    store.write(BTC_SYMBOL_ID, gap.period_id, e.data)
+                    raise
+
+                store.write(BTC_SYMBOL_ID, gap.period_id, data, covered=covered)
+
+            result = store.load(BTC_SYMBOL_ID, duration.period_id, duration.start, duration.end)
+            return result if format == "pandas" else Candles.from_frame(result, duration.period_id, timezone=duration.timezone)
+
+        BATCH_SIZE: int = duration.batch_size
+        period_id = duration.period_id
+
+        header = self.requestManager.generate_header(source="coinapi")
+
+        # 본 데이터 수집, 최대 workers개의 배치를 동시에 요청
+        # coinapi는 UTC 시간을 기준으로 함, duration은 바꾸지 않음
+        batches = duration.plan().strftime(utc=True)
+        semaphore = asyncio.Semaphore(workers)
+
+        async def fetch(batch_start: str, batch_end: str) -> List[dict] | Candles:
+            async with semaphore:
+                response = await self.requestManager.delayed_get(
+                    url=self.dataFetcher._candle_url(period_id, batch_start, batch_end, BATCH_SIZE),
+                    headers=header,
+                    cache=self.dataFetcher._is_final(period_id, batch_end),
+                )
+                logger.info("fetched %s ~ %s", batch_start, batch_end)
+                page = self.dataFetcher._decode(response)
+                return page if format == "pandas" else self.dataFetcher._parse_candles(page, "candles", duration=duration)
+
+        pages = await asyncio.gather(*[fetch(batch_start, batch_end) for batch_start, batch_end in batches], return_exceptions=True)
+
+        failed: List[Tuple[str, str, Exception]] = [
+            (batch_start, batch_end, page) for (batch_start, batch_end), page in zip(batches, pages) if isinstance(page, BaseException)
+        ]
+
+        # 받은 데이터를 시간 순서대로 연결하여 한 번에 데이터프레임으로 변환
+        if format == "pandas":
+            records = [row for page in pages if not isinstance(page, BaseException) for row in page]
+            result = self.dataFetcher._parse_candles(records, "pandas")
+        else:
+            result = Candles.concat([page for page in pages if not isinstance(page, BaseException)] or [Candles.from_records([], period_id, timezone=duration.timezone)])
+
+        if len(failed) != 0:
+            raise PartialFetchError(result, failed)
+
+        return result
+
+
+    async def iter_bitcoin_candle(
+            self,
+            duration: Duration,
+            workers: int=8,
+            format: Literal["pandas", "arrow", "candles"]="pandas",
+            ) -> AsyncIterator[pd.DataFrame]:
+        '''
+        DataFetcher.iter_bitcoin_candle의 asyncio 버전입니다. 최대 workers개의 배치를 미리 요청해 두고 시간 순서대로 돌려줍니다.
+
+        예제
+        ----
+
+        >> async for batch in dataFetcher.iter_bitcoin_candle(duration):
+        ...     print(len(batch))
+        '''
+
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        convert = self.dataFetcher._batch_converter(format, duration)
+
+        # coinapi는 UTC 시간을 기준으로 함
+        batches = duration.plan().strftime(utc=True)
+
+        header = self.requestManager.generate_header(source="coinapi")
+        period_id, BATCH_SIZE = duration.period_id, duration.batch_size
+
+        async def fetch(batch_start: str, batch_end: str) -> pd.DataFrame:
+            response = await self.requestManager.delayed_get(
+                url=self.dataFetcher._candle_url(period_id, batch_start, batch_end, BATCH_SIZE),
+                headers=header,
+                cache=self.dataFetcher._is_final(period_id, batch_end),
+            )
+            return self.dataFetcher._parse_candles(self.dataFetcher._decode(response), "pandas")
+
+        pending: Deque[asyncio.Task] = deque()
+
+        try:
+            for batch_start, batch_end in batches:
+                pending.append(asyncio.create_task(fetch(batch_start, batch_end)))
+
+                if len(pending) >= workers:
+                    yield convert(await pending.popleft())
+
+            while len(pending) != 0:
+                yield convert(await pending.popleft())
+
+        finally:
+            # 중간에 멈춘 경우 남은 요청은 취소
+            for task in pending:
+                task.cancel()
+
+
+    async def get_bitcoin_cme(self, duration: Duration) -> pd.DataFrame:
+        '''
+        DataFetcher.get_bitcoin_cme의 asyncio 버전입니다. FinanceDataReader는 동기 API이므로 별도 스레드에서 실행합니다.
+        '''
+
+        return await asyncio.to_thread(self.dataFetcher.get_bitcoin_cme, duration)
+
+
+    async def get_account_info(self):
+        return self.dataFetcher.get_account_info()
+
+
+    async def get_market_code(self):
+        return self.dataFetcher.get_market_code()
+
+
+    async def get_api_rate_info(self):
+        return self.dataFetcher.get_api_rate_info()
@@ -0,0 +1,156 @@
+from datetime import timedelta
+from typing import Dict, Sequence
+
+import pandas as pd
+
+from .Duration import PERIODS
+
+
+class CandleAggregator():
+    '''
+    체결(tick)을 받아 캔들로 모으는 집계기입니다.
+
+    캔들은 UTC epoch 기준으로 period 길이만큼 나누며(coinapi, upbit와 같음), 다음 캔들 구간의 체결이 들어오면
+    이전 캔들을 완성된 캔들로 돌려줍니다. 이미 완성된 구간의 늦은 체결은 버리고 late에 개수를 셉니다.
+    캔들의 키는 coinapi 캔들과 같으므로(time_period_start, price_close, ...) MAL_model.update에 바로 넣을 수 있습니다.
+
+
+    예제
+    ----
+
+    >> aggregator = CandleAggregator("1MIN")
+    >> for candle in aggregator.add(trade["trade_timestamp"], trade["trade_price"], trade["trade_volume"]):
+    ...     model.update(candle)
+    '''
+
+
+    def __init__(self, period_id: str="1MIN", fill_gaps: bool=True, timezone: str="Asia/Seoul") -> None:
+        '''
+        Args
+        ----
+        period_id: str="1MIN", 캔들 간격, 길이가 일정한 간격(1SEC ~ 10DAY)만 사용할 수 있습니다.
+        fill_gaps: bool=True, 체결이 없던 구간을 직전 종가로 채운 빈 캔들(거래량 0)로 돌려줄지 여부
+        timezone: str="Asia/Seoul", 캔들 시간 데이터의 timezone
+
+        Raises
+        ------
+        ValueError: period_id가 coinapi의 간격이 아니거나 월/년 단위인 경우 발생합니다.
+        '''
+
+        period = PERIODS.get(period_id)
+
+        if not isinstance(period, timedelta):
+            raise ValueError(f"period_id must be one of fixed length periods(1SEC ~ 10DAY). input is {period_id}")
+
+        self.period_id = period_id
+        self.period_ms = period // timedelta(milliseconds=1)
+        self.fill_gaps = fill_gaps
+        self.timezone = timezone
+        self.late = 0
+
+        # 진행 중인 캔들, 시간은 UTC epoch ms
+        self._start: int | None = None
+        self._open = self._high = self._low = self._close = 0.0
+        self._volume = 0.0
+        self._count = 0
+        self._first = self._last = 0
+
+
+    def add(self, timestamp: int, price: float, volume: float) -> Sequence[Dict]:
+        '''
+        체결 하나를 더합니다.
+
+        Args
+        ----
+        timestamp: int, 체결 시각(UTC epoch ms)
+        price: float, 체결 가격
+        volume: float, 체결량
+
+        Returns
+        -------
+        Sequence[Dict], 이 체결로 완성된 캔들들(대부분 비어 있음), 체결이 없던 구간을 건너뛴 경우 여러 개일 수 있습니다.
+        '''
+
+        start = timestamp - timestamp % self.period_ms
+
+        if start == self._start:
+            if price > self._high:
+                self._high = price
+            elif price < self._low:
+                self._low = price
+
+            self._close = price
+            self._volume += volume
+            self._count += 1
+
+            if timestamp > self._last:
+                self._last = timestamp
+
+            return ()
+
+        if self._start is None:
+            self._begin(start, timestamp, price, volume)
+            return ()
+
+        if start < self._start:
+            self.late += 1
+            return ()
+
+        completed = [self._candle()]
+
+        # 체결이 없던 구간은 직전 종가로 채움
+        if self.fill_gaps:
+            close = self._close
+            for gap_start in range(self._start + self.period_ms, start, self.period_ms):
+                completed.append(self._make(gap_start, gap_start, gap_start, close, close, close, close, 0.0, 0))
+
+        self._begin(start, timestamp, price, volume)
+        return completed
+
+
+    def partial(self) -> Dict | None:
+        '''
+        진행 중인 캔들을 반환합니다. 아직 체결이 없었다면 None입니다.
+        '''
+
+        return None if self._start is None else self._candle()
+
+
+    def flush(self) -> Dict | None:
+        '''
+        진행 중인 캔들을 완성된 것으로 보고 반환한 뒤 비웁니다. 스트림을 끝낼 때 사용합니다.
+        '''
+
+        candle = self.partial()
+        self._start = None
+        return candle
+
+
+    def _begin(self, start: int, timestamp: int, price: float, volume: float) -> None:
+        self._start = start
+        self._open = self._high = self._low = self._close = price
+        self._volume = volume
+        self._count = 1
+        self._first = self._last = timestamp
+
+
+    def _candle(self) -> Dict:
+        return self._make(self._start, self._first, self._last, self._open, self._high, self._low, self._close, self._volume, self._count)   # type: ignore
+
+
+    def _make(self, start: int, first: int, last: int, open: float, high: float, low: float, close: float, volume: float, count: int) -> Dict:
+        def to_time(ms: int) -> pd.Timestamp:
+            return pd.Timestamp(ms, unit="ms", tz="UTC").tz_convert(self.timezone)
+
+        return {
+            "time_period_start": to_time(start),
+            "time_period_end": to_time(start + self.period_ms),
+            "time_open": to_time(first),
+            "time_close": to_time(last),
+            "price_open": open,
+            "price_high": high,
+            "price_low": low,
+            "price_close": close,
+            "volume_traded": volume,
+            "trades_count": count,
+        }
@@ -0,0 +1,380 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import json
+import os
+import shutil
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+
+class CandleStore():
+    '''
+    캔들 데이터를 로컬 디스크에 저장하는 저장소입니다.
+
+    (심볼, period_id)마다 디렉터리 하나를 두고, write()마다 조각(chunks/000000/ 등) 하나에 열마다 .npy 파일 하나씩 저장합니다.
+    조각 목록은 meta.json에 있으며, meta.json은 조각을 모두 쓴 뒤에 교체하므로 쓰는 도중에 중단되어도 저장소가 손상되지 않습니다.
+    시간 열은 UTC 기준 datetime64[ns]로 저장되며, 모든 열은 memory-map으로 읽기 때문에
+    긴 기간의 데이터도 밀리초 단위로 불러올 수 있습니다.
+    이미 받아 둔 시간 구간(coverage)을 meta.json에 기록하여, 빠진 구간만 API로 받아올 수 있게 합니다.
+
+
+    예제
+    ----
+
+    >> store = CandleStore("./data/candles")
+    >> store.missing("BITSTAMP_SPOT_BTC_USD", "1DAY", start, end)
+    [(Timestamp('2023-07-01 00:00:00+0900', tz='Asia/Seoul'), Timestamp('2023-08-01 00:00:00+0900', tz='Asia/Seoul'))]
+    >> store.write("BITSTAMP_SPOT_BTC_USD", "1DAY", data, covered=(start, end))
+    >> store.load("BITSTAMP_SPOT_BTC_USD", "1DAY", start, end)
+    '''
+
+
+    def __init__(self, root: str="./data/candles", time_key: str="time_period_start", timezone: str="Asia/Seoul", max_chunks: int=64) -> None:
+        '''
+        Args
+        ----
+        root: str="./data/candles", 저장소의 최상위 디렉터리
+        time_key: str="time_period_start", 캔들의 시점을 나타내는 열 이름
+        timezone: str="Asia/Seoul", 불러온 시간 데이터와 timezone이 없는 입력에 적용할 timezone
+        max_chunks: int=64, (심볼, period_id)마다 유지할 최대 조각 수, 넘으면 write()가 조각들을 하나로 합칩니다.
+        '''
+
+        if max_chunks < 1:
+            raise ValueError("max_chunks must be 1 or upper.")
+
+        self.root = root
+        self.max_chunks = max_chunks
+        self.time_key = time_key
+        self.timezone = timezone
+        self._lock = Lock()
+
+
+    def path(self, symbol: str, period_id: str) -> str:
+        return os.path.join(self.root, symbol, period_id)
+
+
+    def _read_meta(self, symbol: str, period_id: str) -> Dict:
+        meta_path = os.path.join(self.path(symbol, period_id), "meta.json")
+
+        if not os.path.exists(meta_path):
+            return {"columns": {}, "coverage": [], "chunks": [], "next_chunk": 0}
+
+        with open(meta_path, encoding="utf8") as f:
+            meta = json.load(f)
+
+        # 조각 목록이 없는 이전 형식은 디렉터리 바로 아래의 열 파일들을 조각 하나(".")로 취급
+        if "chunks" not in meta:
+            legacy = [{"name": ".", "rows": None, "start": None, "end": None, "columns": meta["columns"]}]
+            meta["chunks"] = legacy if len(meta["columns"]) != 0 else []
+            meta["next_chunk"] = 0
+
+        return meta
+
+
+    def _to_ns(self, time: datetime | pd.Timestamp) -> int:
+        # timezone이 없는 시간은 self.timezone 기준으로 간주
+        timestamp = pd.Timestamp(time)
+
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize(self.timezone)
+
+        return int(timestamp.tz_convert("UTC").value)
+
+
+    def _from_ns(self, ns: int) -> pd.Timestamp:
+        return pd.Timestamp(ns, tz="UTC").tz_convert(self.timezone)
+
+
+    def coverage(self, symbol: str, period_id: str) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        '''
+        저장소가 이미 가지고 있는 시간 구간 [start, end)들을 반환합니다.
+        '''
+
+        return [(self._from_ns(start), self._from_ns(end)) for start, end in self._read_meta(symbol, period_id)["coverage"]]
+
+
+    def missing(self, symbol: str, period_id: str, start: datetime | pd.Timestamp, end: datetime | pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        '''
+        [start, end) 중 저장소에 없는 구간들을 시간 순서대로 반환합니다.
+
+        Args
+        ----
+        symbol: str, 심볼(e.g. "BITSTAMP_SPOT_BTC_USD")
+        period_id: str, 캔들 간격(e.g. "1DAY")
+        start: datetime | pd.Timestamp, 시작 시점, timezone이 없다면 self.timezone 기준
+        end: datetime | pd.Timestamp, 종료 시점, timezone이 없다면 self.timezone 기준
+
+        Returns
+        -------
+        List[Tuple[pd.Timestamp, pd.Timestamp]], 받아와야 하는 구간들
+        '''
+
+        cursor, end_ns = self._to_ns(start), self._to_ns(end)
+        gaps = []
+
+        for covered_start, covered_end in self._read_meta(symbol, period_id)["coverage"]:
+            if covered_end <= cursor:
+                continue
+
+            if covered_start >= end_ns:
+                break
+
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+
+            cursor = max(cursor, covered_end)
+
+        if cursor < end_ns:
+            gaps.append((cursor, end_ns))
+
+        return [(self._from_ns(gap_start), self._from_ns(gap_end)) for gap_start, gap_end in gaps]
+
+
+    def write(self, symbol: str, period_id: str, data: pd.DataFrame, covered: Tuple[datetime | pd.Timestamp, datetime | pd.Timestamp] | None=None) -> None:
+        '''
+        캔들 데이터를 저장소에 추가합니다. 같은 시점의 캔들은 새 데이터로 덮어씁니다.
+
+        기존 데이터는 읽거나 다시 쓰지 않고 data만 새 조각(chunk)으로 저장하므로, 한 번의 비용은 data의 크기에만 비례합니다.
+        조각의 열 파일을 모두 쓴 뒤 마지막에 meta.json을 교체하므로, 도중에 프로세스가 중단되어도
+        저장소는 이전 상태 그대로 남습니다(목록에 없는 조각은 무시됩니다).
+        조각이 max_chunks개를 넘으면 하나로 합칩니다(compact).
+
+        Args
+        ----
+        symbol: str, 심볼
+        period_id: str, 캔들 간격
+        data: pd.DataFrame, 저장할 캔들 데이터, self.time_key 열이 있어야 합니다.
+        covered: Tuple[start, end] | None=None, data가 빠짐없이 담고 있는 구간, 지정된 경우 coverage에 추가합니다.
+
+        Raises
+        ------
+        ValueError: self.time_key 열이 없거나, 숫자/시간이 아닌 열이 있는 경우 발생합니다.
+        '''
+
+        if self.time_key not in data.columns:
+            raise ValueError(f"{self.time_key}이 데이터셋에 없습니다.")
+
+        with self._lock:
+            directory = self.path(symbol, period_id)
+            os.makedirs(directory, exist_ok=True)
+
+            meta = self._read_meta(symbol, period_id)
+            removed: List[Dict] = []
+
+            if len(data) != 0:
+                data = data.drop_duplicates(subset=self.time_key, keep="last").sort_values(by=self.time_key, ignore_index=True)
+                meta["chunks"].append(self._write_chunk(directory, meta, data))
+
+                # 조각이 많아지면 하나로 합쳐 load()가 여는 파일 수를 제한
+                if len(meta["chunks"]) > self.max_chunks:
+                    removed = meta["chunks"]
+                    meta["chunks"] = [self._write_chunk(directory, meta, self._read_chunks(directory, removed))]
+
+            meta["columns"] = {key: kind for chunk in meta["chunks"] for key, kind in chunk["columns"].items()}
+
+            if covered is not None:
+                meta["coverage"] = self._merge(meta["coverage"] + [[self._to_ns(covered[0]), self._to_ns(covered[1])]])
+
+            # 조각을 모두 쓴 뒤 마지막에 meta.json을 교체
+            self._write_meta(directory, meta)
+
+            for chunk in removed:
+                self._remove_chunk(directory, chunk)
+
+
+    def compact(self, symbol: str, period_id: str) -> None:
+        '''
+        (심볼, period_id)의 조각들을 시간순으로 정렬된 조각 하나로 합칩니다.
+        '''
+
+        with self._lock:
+            directory = self.path(symbol, period_id)
+            meta = self._read_meta(symbol, period_id)
+
+            if len(meta["chunks"]) <= 1:
+                return
+
+            removed = meta["chunks"]
+            meta["chunks"] = [self._write_chunk(directory, meta, self._read_chunks(directory, removed))]
+            self._write_meta(directory, meta)
+
+            for chunk in removed:
+                self._remove_chunk(directory, chunk)
+
+
+    def _write_chunk(self, directory: str, meta: Dict, data: pd.DataFrame) -> Dict:
+        # 시간순으로 정렬된 data를 새 조각 디렉터리에 열마다 .npy 파일로 쓰고, meta.json에 넣을 조각 정보를 반환
+        name = f"{meta['next_chunk']:06d}"
+        meta["next_chunk"] += 1
+
+        # 중단된 이전 쓰기가 남긴 같은 이름의 조각은 목록에 없으므로 지워도 됨
+        chunk_directory = os.path.join(directory, "chunks", name)
+        shutil.rmtree(chunk_directory, ignore_errors=True)
+        os.makedirs(chunk_directory)
+
+        columns = {}
+        for key in data.columns:
+            series = data[key]
+
+            if isinstance(series.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+                if getattr(series.dt, "tz", None) is None:
+                    series = series.dt.tz_localize(self.timezone)
+
+                array = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+                columns[key] = "time"
+
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                array = series.to_numpy()
+                columns[key] = str(array.dtype)
+
+            else:
+                raise ValueError(f"{key} 열은 숫자나 시간 데이터가 아니므로 저장할 수 없습니다.")
+
+            # meta.json보다 먼저 디스크에 기록되도록 fsync
+            with open(os.path.join(chunk_directory, f"{key}.npy"), "wb") as f:
+                np.save(f, array)
+                f.flush()
+                os.fsync(f.fileno())
+
+        times = data[self.time_key]
+        times = times.dt.tz_localize(self.timezone) if getattr(times.dt, "tz", None) is None else times
+
+        return {
+            "name": name,
+            "rows": len(data),
+            "start": int(times.iloc[0].tz_convert("UTC").value) if len(data) != 0 else None,
+            "end": int(times.iloc[-1].tz_convert("UTC").value) if len(data) != 0 else None,
+            "columns": columns,
+        }
+
+
+    def _write_meta(self, directory: str, meta: Dict) -> None:
+        with open(os.path.join(directory, "meta.tmp.json"), "w", encoding="utf8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(os.path.join(directory, "meta.tmp.json"), os.path.join(directory, "meta.json"))
+
+
+    @staticmethod
+    def _remove_chunk(directory: str, chunk: Dict) -> None:
+        if chunk["name"] == ".":
+            for key in chunk["columns"]:
+                os.remove(os.path.join(directory, f"{key}.npy"))
+        else:
+            shutil.rmtree(os.path.join(directory, "chunks", chunk["name"]), ignore_errors=True)
+
+
+    def _chunk_arrays(self, directory: str, chunk: Dict) -> Dict[str, np.ndarray]:
+        # 조각의 열들을 memory-map으로 열고, 모든 열의 길이가 같은지 확인
+        chunk_directory = directory if chunk["name"] == "." else os.path.join(directory, "chunks", chunk["name"])
+        arrays = {key: np.load(os.path.join(chunk_directory, f"{key}.npy"), mmap_mode="r") for key in chunk["columns"]}
+
+        lengths = {key: len(array) for key, array in arrays.items()}
+        rows = chunk["rows"] if chunk["rows"] is not None else lengths.get(self.time_key)
+
+        if any(length != rows for length in lengths.values()):
+            raise RuntimeError(f"candle store chunk {chunk_directory} is corrupted, column lengths {lengths} do not match {rows} rows.")
+
+        return arrays
+
+
+    def _read_chunks(self, directory: str, chunks: List[Dict], start: int | None=None, end: int | None=None) -> pd.DataFrame:
+        # 조각들의 [start, end) 구간(UTC ns)을 하나의 데이터프레임으로 합침, 같은 시점은 나중에 쓴 조각의 값을 사용
+        parts: List[Dict[str, np.ndarray]] = []
+        ranges: List[Tuple[int, int]] = []
+        kinds = {key: kind for chunk in chunks for key, kind in chunk["columns"].items()}
+
+        for chunk in chunks:
+            if chunk["rows"] == 0 or (start is not None and chunk["end"] is not None and chunk["end"] < start) or (end is not None and chunk["start"] is not None and chunk["start"] >= end):
+                continue
+
+            arrays = self._chunk_arrays(directory, chunk)
+
+            # 조각 안의 시간 열은 정렬되어 있으므로 이진 탐색으로 구간을 자름
+            times = arrays[self.time_key].view("int64")
+            lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+            hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+
+            if lo == hi:
+                continue
+
+            parts.append({key: arrays[key][lo:hi] for key in chunk["columns"]})
+            ranges.append((int(times[lo]), int(times[hi - 1])))
+
+        if len(parts) == 0:
+            return pd.DataFrame({key: pd.Series(dtype="datetime64[ns, UTC]" if kind == "time" else kind) for key, kind in kinds.items()})
+
+        # 조각들이 겹치지 않고 같은 열을 가졌다면(대부분의 경우) 시작 시점 순으로 이어 붙이기만 하면 됨
+        order = sorted(range(len(parts)), key=lambda i: ranges[i][0])
+        disjoint = all(ranges[a][1] < ranges[b][0] for a, b in zip(order, order[1:]))
+        same_columns = all(part.keys() == parts[0].keys() for part in parts)
+
+        if disjoint and same_columns:
+            result = pd.DataFrame({key: np.concatenate([parts[i][key] for i in order]) for key in parts[0]})
+        else:
+            result = pd.concat([pd.DataFrame({key: np.asarray(array) for key, array in part.items()}) for part in parts], ignore_index=True)
+            result = result.drop_duplicates(subset=self.time_key, keep="last").sort_values(by=self.time_key, kind="stable", ignore_index=True)
+
+        for key, kind in kinds.items():
+            if kind == "time" and key in result:
+                result[key] = pd.to_datetime(result[key].to_numpy(dtype="datetime64[ns]")).tz_localize("UTC")
+
+        return result
+
+
+    def load(self, symbol: str, period_id: str, start: datetime | pd.Timestamp | None=None, end: datetime | pd.Timestamp | None=None) -> pd.DataFrame:
+        '''
+        저장소에서 [start, end) 구간의 캔들 데이터를 불러옵니다.
+
+        Args
+        ----
+        symbol: str, 심볼
+        period_id: str, 캔들 간격
+        start: datetime | pd.Timestamp | None=None, 시작 시점, None인 경우 처음부터
+        end: datetime | pd.Timestamp | None=None, 종료 시점, None인 경우 끝까지
+
+        Raises
+        ------
+        RuntimeError: 조각의 열 길이가 서로 다른(손상된) 경우 발생합니다.
+
+        Returns
+        -------
+        pd.DataFrame, 캔들 데이터, 시간 데이터는 datetime64[ns, self.timezone] 형식입니다.
+        '''
+
+        meta = self._read_meta(symbol, period_id)
+
+        if len(meta["chunks"]) == 0:
+            return pd.DataFrame()
+
+        result = self._read_chunks(
+            self.path(symbol, period_id),
+            meta["chunks"],
+            None if start is None else self._to_ns(start),
+            None if end is None else self._to_ns(end),
+        )
+
+        for key in result.columns:
+            if isinstance(result[key].dtype, pd.DatetimeTZDtype):
+                result[key] = result[key].dt.tz_convert(self.timezone)
+
+        return result
+
+
+    @staticmethod
+    def _merge(ranges: List[List[int]]) -> List[List[int]]:
+        # 겹치거나 맞닿은 구간들을 하나로 합침
+        merged: List[List[int]] = []
+
+        for start, end in sorted(ranges):
+            if len(merged) != 0 and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        return merged
@@ -0,0 +1,190 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from .Duration import PERIODS
+
+
+# 가격/거래량 열, dtype 인자를 따름
+VALUE_COLUMNS = ("price_open", "price_high", "price_low", "price_close", "volume_traded")
+
+
+class Candles():
+    '''
+    캔들 데이터를 열마다 numpy 배열 하나로 들고 있는 컬럼형 구조입니다.
+
+    시점은 time_period_start만 UTC 기준 int64(epoch ns)로 저장하고, 나머지 시간 열(time_period_end 등)은
+    period_id로 다시 계산할 수 있으므로 저장하지 않습니다. 가격과 거래량은 float32 또는 float64,
+    거래 횟수는 int32로 저장하므로 분봉처럼 행이 많은 데이터도 DataFrame보다 몇 배 적은 메모리로 다룰 수 있습니다.
+    캔들이 없는 구간(include_empty_items)의 가격은 NaN, 거래 횟수는 0입니다.
+
+
+    예제
+    ----
+
+    >> candles = dataFetcher.get_bitcoin_candle(Duration(start, end, interval="1MIN", batch_size=1000), format="candles")
+    >> candles.nbytes / len(candles)
+    32.0
+    >> candles["price_close"]
+    array([...], dtype=float32)
+    >> MAL_model(candles.to_frame(), duration)
+    '''
+
+
+    def __init__(
+            self,
+            period_id: str,
+            time: np.ndarray,
+            values: Dict[str, np.ndarray],
+            trades_count: np.ndarray,
+            timezone: str="Asia/Seoul",
+            ) -> None:
+        '''
+        Args
+        ----
+        period_id: str, 캔들 간격(e.g. "1MIN")
+        time: np.ndarray[int64], 캔들 시작 시점(UTC epoch ns)
+        values: Dict[str, np.ndarray], VALUE_COLUMNS의 열들
+        trades_count: np.ndarray[int32], 거래 횟수
+        timezone: str="Asia/Seoul", to_frame()에서 시간 열에 적용할 timezone
+
+        Raises
+        ------
+        ValueError: period_id가 coinapi의 간격이 아니거나 열의 길이가 서로 다른 경우 발생합니다.
+        '''
+
+        if period_id not in PERIODS:
+            raise ValueError(f"invaild period_id found: {period_id}")
+
+        self.period_id = period_id
+        self.time = np.asarray(time, dtype=np.int64)
+        self.values = {key: np.asarray(values[key]) for key in VALUE_COLUMNS}
+        self.trades_count = np.asarray(trades_count, dtype=np.int32)
+        self.timezone = timezone
+
+        if any(len(column) != len(self.time) for column in (*self.values.values(), self.trades_count)):
+            raise ValueError("all columns must have the same length.")
+
+
+    @classmethod
+    def from_records(cls, records: List[dict], period_id: str, dtype: type=np.float32, timezone: str="Asia/Seoul") -> "Candles":
+        '''
+        coinapi 캔들 목록(응답 JSON)을 DataFrame을 거치지 않고 바로 배열로 변환합니다.
+
+        Args
+        ----
+        records: List[dict], coinapi 캔들 목록
+        period_id: str, 캔들 간격
+        dtype: type=np.float32, 가격과 거래량의 dtype
+        timezone: str="Asia/Seoul", to_frame()에서 사용할 timezone
+        '''
+
+        time = pd.to_datetime([record["time_period_start"] for record in records], utc=True, format="ISO8601")
+
+        # None(빈 캔들)은 NaN으로 변환됨
+        values = {key: np.array([record.get(key) for record in records], dtype=np.float64).astype(dtype, copy=False) for key in VALUE_COLUMNS}
+        trades_count = np.fromiter((record.get("trades_count") or 0 for record in records), dtype=np.int32, count=len(records))
+
+        return cls(period_id, time.as_unit("ns").asi8, values, trades_count, timezone)
+
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, period_id: str, dtype: type=np.float32, timezone: str="Asia/Seoul") -> "Candles":
+        '''
+        DataFetcher.get_bitcoin_candle 형식의 데이터프레임을 변환합니다.
+        '''
+
+        time = pd.to_datetime(frame["time_period_start"], utc=True, format="ISO8601").dt.as_unit("ns")
+        values = {key: frame[key].to_numpy(dtype=np.float64, na_value=np.nan).astype(dtype, copy=False) for key in VALUE_COLUMNS}
+        trades_count = frame["trades_count"].fillna(0).to_numpy(dtype=np.int32)
+
+        return cls(period_id, time.to_numpy(dtype="datetime64[ns]").view(np.int64), values, trades_count, timezone)
+
+
+    @classmethod
+    def concat(cls, parts: Iterable["Candles"]) -> "Candles":
+        '''
+        시간 순서대로 나열된 Candles들을 이어 붙입니다.
+
+        Raises
+        ------
+        ValueError: 이어 붙일 Candles가 없거나 period_id가 서로 다른 경우 발생합니다.
+        '''
+
+        parts = list(parts)
+
+        if len(parts) == 0:
+            raise ValueError("nothing to concat.")
+
+        if any(part.period_id != parts[0].period_id for part in parts):
+            raise ValueError("all candles must have the same period_id.")
+
+        return cls(
+            parts[0].period_id,
+            np.concatenate([part.time for part in parts]),
+            {key: np.concatenate([part.values[key] for part in parts]) for key in VALUE_COLUMNS},
+            np.concatenate([part.trades_count for part in parts]),
+            parts[0].timezone,
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+    def __getitem__(self, key):
+        # 열 이름이면 배열, 슬라이스/인덱스 배열이면 해당 행들의 Candles
+        if isinstance(key, str):
+            if key == "time_period_start":
+                return self.time
+            if key == "trades_count":
+                return self.trades_count
+            return self.values[key]
+
+        return Candles(
+            self.period_id,
+            self.time[key],
+            {name: column[key] for name, column in self.values.items()},
+            self.trades_count[key],
+            self.timezone,
+        )
+
+
+    def __repr__(self) -> str:
+        return f"Candles(period_id={self.period_id!r}, rows={len(self)}, nbytes={self.nbytes})"
+
+
+    @property
+    def nbytes(self) -> int:
+        '''
+        배열들이 차지하는 메모리(바이트)
+        '''
+
+        return self.time.nbytes + self.trades_count.nbytes + sum(column.nbytes for column in self.values.values())
+
+
+    def to_frame(self) -> pd.DataFrame:
+        '''
+        DataFetcher.get_bitcoin_candle과 같은 열 이름의 데이터프레임으로 변환합니다.
+        시간 열은 time_period_start, time_period_end만 만들며 datetime64[ns, timezone] 형식입니다.
+        '''
+
+        start = pd.DatetimeIndex(self.time.view("datetime64[ns]")).tz_localize("UTC")
+        period = PERIODS[self.period_id]
+
+        # coinapi는 UTC 기준으로 캔들을 나눔, 월/년 단위는 달력 기준으로 더함
+        if isinstance(period, timedelta):
+            end = start + period
+        else:
+            end = start + pd.DateOffset(years=period.years, months=period.months)
+
+        frame = pd.DataFrame({"time_period_start": start.tz_convert(self.timezone), "time_period_end": end.tz_convert(self.timezone)})
+
+        for key in VALUE_COLUMNS:
+            frame[key] = self.values[key]
+
+        frame["trades_count"] = self.trades_count
+
+        return frame
@@ -0,0 +1,106 @@
+from typing import List
+
+import os
+import shutil
+
+import pandas as pd
+
+from .Duration import BatchPlan
+
+
+class Checkpoint():
+    '''
+    오래 걸리는 데이터 수집(backfill)의 진행 상황을 디스크에 기록하는 체크포인트입니다.
+
+    디렉터리에 BatchPlan(plan.json)을 저장하고, 다 받은 구간마다 windows/{구간 번호}.pkl 파일 하나를 씁니다.
+    구간 파일은 임시 파일에 먼저 쓴 뒤 교체하므로, 파일이 있는 구간은 끝까지 받은 구간입니다.
+    수집이 중간에 실패하더라도 같은 경로로 다시 열면 남은 구간부터 이어서 받을 수 있습니다.
+
+
+    예제
+    ----
+
+    >> checkpoint = Checkpoint("./data/backfill/btc_1hrs", duration.plan())
+    >> for index in checkpoint.pending():
+    ...     checkpoint.mark(index, fetch(checkpoint.plan[index]))
+    >> data = checkpoint.load()
+    '''
+
+
+    def __init__(self, path: str, plan: BatchPlan) -> None:
+        '''
+        Args
+        ----
+        path: str, 체크포인트 디렉터리
+        plan: BatchPlan, 수집할 구간 목록
+
+        Raises
+        ------
+        ValueError: path에 다른 BatchPlan의 체크포인트가 있는 경우 발생합니다.
+        '''
+
+        self.path = path
+        self.plan = plan
+
+        os.makedirs(os.path.join(path, "windows"), exist_ok=True)
+        plan_path = os.path.join(path, "plan.json")
+
+        if os.path.exists(plan_path):
+            with open(plan_path, encoding="utf8") as f:
+                saved = BatchPlan.from_json(f.read())
+
+            if saved != plan:
+                raise ValueError(f"checkpoint at {path} belongs to a different plan: {saved}")
+
+        else:
+            with open(plan_path + ".tmp", "w", encoding="utf8") as f:
+                f.write(plan.to_json())
+
+            os.replace(plan_path + ".tmp", plan_path)
+
+
+    def _window_path(self, index: int) -> str:
+        return os.path.join(self.path, "windows", f"{index:08d}.pkl")
+
+
+    def done(self, index: int) -> bool:
+        return os.path.exists(self._window_path(index))
+
+
+    def pending(self) -> List[int]:
+        '''
+        아직 받지 않은 구간 번호들을 순서대로 반환합니다.
+        '''
+
+        return [index for index in range(len(self.plan)) if not self.done(index)]
+
+
+    def mark(self, index: int, data: pd.DataFrame) -> None:
+        '''
+        index번째 구간을 다 받았다고 기록하고 데이터를 저장합니다. 여러 스레드에서 동시에 호출해도 됩니다.
+        '''
+
+        path = self._window_path(index)
+        data.to_pickle(path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+
+    def load(self) -> pd.DataFrame:
+        '''
+        받은 구간들의 데이터를 순서대로 이어 붙여 반환합니다.
+        '''
+
+        frames = [pd.read_pickle(self._window_path(index)) for index in range(len(self.plan)) if self.done(index)]
+
+        if len(frames) == 0:
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True)
+
+
+    def clear(self) -> None:
+        '''
+        체크포인트 디렉터리를 지웁니다.
+        '''
+
+        shutil.rmtree(self.path, ignore_errors=True)
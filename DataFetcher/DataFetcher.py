@@ -5,128 +5,682 @@ import requests
 import uuid
 
 import json
+import logging
+import re
+import numpy as np
 import pandas as pd
 
-from typing import Literal, Dict
+from typing import Callable, Deque, Iterator, Literal, Dict, List, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 from time import sleep
 from random import random
-from .Duration import Duration
+from .Duration import Duration, PERIODS
+from .Candles import Candles
+from .CandleStore import CandleStore
+from .Checkpoint import Checkpoint
 
 import FinanceDataReader as fdr
 
 from RequestManager.RequestManager import RequestManager
 
+
+# 배치 진행 상황을 남기는 로거, logging.basicConfig(level=logging.INFO) 등으로 켭니다.
+logger = logging.getLogger(__name__)
+
+# coinapi 비트코인 심볼
+BTC_SYMBOL_ID = "BITSTAMP_SPOT_BTC_USD"
+
+# coinapi OHLCV 응답의 키(열 이름)
+CANDLE_COLUMNS = [
+    "time_period_start", "time_period_end", "time_open", "time_close",
+    "price_open", "price_high", "price_low", "price_close", "volume_traded", "trades_count",
+]
+
+# get_candle_panel로 모을 수 있는 (숫자) 열
+PANEL_FIELDS = ["price_open", "price_high", "price_low", "price_close", "volume_traded", "trades_count"]
+
+# upbit 마켓 코드 형식(e.g. KRW-BTC), coinapi 심볼(e.g. BITSTAMP_SPOT_BTC_USD)과 구분하는 데 사용
+UPBIT_MARKET_PATTERN = re.compile(r"^[A-Z]+-[A-Z0-9]+$")
+
+# upbit 캔들 API가 지원하는 간격(period_id)과 그 경로
+UPBIT_CANDLE_PATHS: Dict[str, str] = {
+    **{f"{n}MIN": f"v1/candles/minutes/{n}" for n in (1, 3, 5, 10, 15, 30)},
+    "1HRS": "v1/candles/minutes/60",
+    "4HRS": "v1/candles/minutes/240",
+    "1DAY": "v1/candles/days",
+    "7DAY": "v1/candles/weeks",
+    "1MTH": "v1/candles/months",
+}
+
+# upbit 캔들 요청 하나로 받을 수 있는 최대 캔들 수
+UPBIT_CANDLE_LIMIT = 200
+
+
+class PartialFetchError(RuntimeError):
+    '''
+    일부 배치를 가져오지 못했을 때 발생하는 예외입니다.
+
+    Attributes
+    ----------
+    data: pd.DataFrame | Candles, 가져오는 데 성공한 배치들로 만든 데이터프레임(format="candles"인 경우 Candles)
+    failed: List[Tuple[batch_start, batch_end, Exception]], 실패한 배치들과 그 원인
+        - get_candle_panel에서는 (symbol, batch_start, batch_end, Exception)입니다.
+    '''
+
+    def __init__(self, data: pd.DataFrame | Candles, failed: list):
+        self.data = data
+        self.failed = failed
+
+        *symbol, batch_start, batch_end, error = failed[0]
+
+        super().__init__(
+            f"failed to fetch {len(failed)} batch(es), "
+            f"first failure: {' '.join([*symbol, f'{batch_start} ~ {batch_end}'])}: {error}"
+        )
+
+
 class DataFetcher():
-    def __init__(self):
-        self.requestManager = RequestManager()
+    def __init__(self, requestManager: RequestManager | None=None):
+        '''
+        Parameters
+        ----------
+            requestManager: RequestManager | None=None, 요청에 사용할 RequestManager, None인 경우 새로 만듭니다.
+        '''
+
+        self.requestManager = RequestManager() if requestManager is None else requestManager
         return
 
 
-    def get_bitcoin_candle(self, duration: Duration) -> pd.DataFrame:
+    def get_bitcoin_candle(
+            self,
+            duration: Duration,
+            workers: int=1,
+            store: CandleStore | None=None,
+            format: Literal["pandas", "candles"]="pandas",
+            ) -> pd.DataFrame | Candles:
         '''
         비트코인 캔들 데이터(BTC-USD, coinapi)를 가져옵니다.
         Parameters
         ----------
             duration: Duration 객체
+            workers: int=1, 동시에 요청할 배치 수, 1보다 큰 경우 스레드 풀에서 배치들을 병렬로 가져옵니다.
+            store: CandleStore | None=None, 지정된 경우 저장소에 있는 구간은 디스크에서 읽고, 빠진 구간만 API로 받아 저장소에 추가합니다.
+            format: Literal["pandas", "candles"]="pandas", 반환 형식
+            - "pandas": pd.DataFrame
+            - "candles": Candles(int64 시점, float32 가격/거래량), 분봉처럼 행이 많은 경우에 사용합니다.
+              응답은 배치마다 바로 배열로 바꾸므로 전체 응답 JSON을 메모리에 모아 두지 않습니다.
 
 
         Raises
         ------
             RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+            PartialFetchError: 일부 배치를 가져오지 못한 경우, 가져온 데이터는 data 속성에 담겨 있습니다.
             
         Returns
         -------
-            pd.DataFrame: 캔들 데이터를 담고 있는 데이터프레임
+            pd.DataFrame | Candles: 캔들 데이터를 담고 있는 데이터프레임, 시간 데이터는 datetime64[ns, Asia/Seoul] 형식입니다.
         '''
 
-        # coinapi는 UTC 시간을 기준으로 함
-        if not duration.return_utc_in_iter:
-            duration.return_utc_in_iter = True
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        if format not in ("pandas", "candles"):
+            raise ValueError(f'format must be "pandas" or "candles". input is {format}')
+
+        if store is not None:
+            result = self._sync_bitcoin_candle(duration, workers, store)
+            return result if format == "pandas" else Candles.from_frame(result, duration.period_id, timezone=duration.timezone)
 
         # 한 번에 들고 올 데이터 수
         BATCH_SIZE: int = duration.batch_size
 
         # request 준비
         header = self.requestManager.generate_header(source="coinapi")
+        period_id = duration.period_id
+
+        # 본 데이터 수집, 배치들은 서로 겹치지 않는 시간 구간이므로 순서와 무관하게 가져올 수 있음
+        # coinapi는 UTC 시간을 기준으로 함, duration은 바꾸지 않음
+        batches = duration.plan().strftime(utc=True)
+        pages: List[List[dict] | Candles | None] = [None] * len(batches)
+        failed: List[Tuple[str, str, Exception]] = []
+
+        def fetch(idx: int) -> None:
+            batch_start, batch_end = batches[idx]
+            page = self._fetch_candle_batch(header, period_id, batch_start, batch_end, BATCH_SIZE)
+            pages[idx] = page if format == "pandas" else self._parse_candles(page, "candles", duration=duration)
+
+        # 진행 상황은 작업자가 아니라 결과를 모으는 쪽에서 배치가 끝날 때마다 한 번 남김
+        if workers == 1:
+            for idx, (batch_start, batch_end) in enumerate(batches):
+                try:
+                    fetch(idx)
+                except Exception as e:
+                    failed.append((batch_start, batch_end, e))
+                else:
+                    logger.info("fetched %s ~ %s (%d/%d)", batch_start, batch_end, idx + 1, len(batches))
+
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(fetch, idx): idx for idx in range(len(batches))}
+
+                for done, future in enumerate(as_completed(futures), start=1):
+                    error = future.exception()
+                    batch_start, batch_end = batches[futures[future]]
+
+                    if error is not None:
+                        failed.append((batch_start, batch_end, error))
+                    else:
+                        logger.info("fetched %s ~ %s (%d/%d)", batch_start, batch_end, done, len(batches))
+
+        # 받은 데이터를 시간 순서대로 연결하여 한 번에 데이터프레임으로 변환
+        if format == "pandas":
+            records = [row for page in pages if page is not None for row in page]
+            result = self._parse_candles(records, "pandas")
+        else:
+            result = Candles.concat([page for page in pages if page is not None] or [Candles.from_records([], period_id, timezone=duration.timezone)])
+
+        # 일부 배치를 가져오지 못한 경우, 가져온 데이터는 예외와 함께 반환
+        if len(failed) != 0:
+            failed.sort(key=lambda batch: batch[0])
+            raise PartialFetchError(result, failed)
+
+        return result
+
+
+    def get_candle_panel(
+            self,
+            symbols: List[str],
+            duration: Duration,
+            workers: int=8,
+            fields: List[str]=PANEL_FIELDS,
+            ) -> pd.DataFrame:
+        '''
+        여러 심볼의 캔들 데이터를 한 번에 가져와 시간 축을 맞춘 패널로 반환합니다.
+        coinapi 심볼(e.g. "BITSTAMP_SPOT_BTC_USD")과 upbit 마켓 코드(e.g. "KRW-BTC")를 섞어서 지정할 수 있습니다.
+
+        모든 심볼의 배치를 하나의 스레드 풀에서 함께 가져오며, 요청 속도는 RequestManager의 요청 제한기가
+        API(coinapi, upbit 캔들 그룹)별로 조절합니다. 모든 캔들이 끝난 구간은 응답 캐시를 사용합니다.
+
+        Parameters
+        ----------
+            symbols: List[str], coinapi 심볼 또는 upbit 마켓 코드의 목록
+            duration: Duration 객체, upbit 마켓은 UPBIT_CANDLE_PATHS의 간격만 지원하며 배치 크기는 최대 200입니다.
+            workers: int=8, 동시에 요청할 배치 수
+            fields: List[str]=PANEL_FIELDS, 패널에 담을 열
+
+
+        Raises
+        ------
+            ValueError: 조건에 맞지 않는 매개변수가 감지된 경우
+            PartialFetchError: 일부 배치를 가져오지 못한 경우, 가져온 데이터로 만든 패널은 data 속성에 담겨 있습니다.
+
+        Returns
+        -------
+            pd.DataFrame: time_period_start(datetime64[ns, Asia/Seoul])를 인덱스로, (field, symbol)을 열로 갖는 float64 데이터프레임
+            - 모든 심볼의 시각을 합친 인덱스에 맞춰 정렬되며, 해당 시각의 캔들이 없는 심볼은 NaN입니다.
+            - panel["price_close"]는 시간 × 심볼 종가 데이터프레임입니다.
+            - panel.to_numpy().reshape(len(panel), len(fields), len(symbols))는 시간 × 열 × 심볼 배열입니다.
+
+
+        예제
+        ----
+
+        >> panel = dataFetcher.get_candle_panel(["BITSTAMP_SPOT_BTC_USD", "KRW-BTC", "KRW-ETH"], duration)
+        >> closes = panel["price_close"]
+        '''
+
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        if len(symbols) == 0 or len(set(symbols)) != len(symbols):
+            raise ValueError("symbols must be non-empty and unique.")
+
+        unknown = [field for field in fields if field not in PANEL_FIELDS]
+        if len(unknown) != 0:
+            raise ValueError(f"unknown fields: {unknown}, use some of {PANEL_FIELDS}.")
 
-        start_date, end_date = duration.strftime(timezone=True).values()
-        test_end_date = (duration.start + duration.interval * 2).isoformat().split('.')[0] + "+09:00"
+        upbit_markets = [symbol for symbol in symbols if UPBIT_MARKET_PATTERN.match(symbol)]
+        if len(upbit_markets) != 0 and duration.period_id not in UPBIT_CANDLE_PATHS:
+            raise ValueError(f"upbit does not support {duration.period_id} candles, use one of {list(UPBIT_CANDLE_PATHS)}.")
 
+        # upbit는 요청 하나에 최대 200개의 캔들만 반환
+        upbit_duration = duration.copy()
+        upbit_duration.batch_size = min(duration.batch_size, UPBIT_CANDLE_LIMIT)
+
+        header = self.requestManager.generate_header(source="coinapi")
         period_id = duration.period_id
 
-        # 테스트 겸 데이터 헤더 가져오기
-        test_url = self.requestManager.generate_url(
+        # (심볼, 배치 시작, 배치 끝, 요청할 캔들 수)
+        tasks: List[Tuple[str, str, str, int]] = []
+        for symbol in symbols:
+            upbit = symbol in upbit_markets
+            target = upbit_duration if upbit else duration
+            tasks.extend((symbol, batch_start, batch_end, target.batch_size) for batch_start, batch_end in target.plan().strftime(utc=True))
+
+        pages: List[List[dict] | None] = [None] * len(tasks)
+        failed: List[Tuple[str, str, str, Exception]] = []
+
+        def fetch(idx: int) -> None:
+            symbol, batch_start, batch_end, batch_size = tasks[idx]
+
+            if symbol in upbit_markets:
+                pages[idx] = self._fetch_upbit_candle_batch(symbol, period_id, batch_start, batch_end, batch_size)
+            else:
+                pages[idx] = self._fetch_candle_batch(header, period_id, batch_start, batch_end, batch_size, symbol_id=symbol)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, idx): idx for idx in range(len(tasks))}
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                error = future.exception()
+                symbol, batch_start, batch_end, _ = tasks[futures[future]]
+
+                if error is not None:
+                    failed.append((symbol, batch_start, batch_end, error))
+                else:
+                    logger.info("fetched %s %s ~ %s (%d/%d)", symbol, batch_start, batch_end, done, len(tasks))
+
+        # 심볼별로 캔들을 모아 변환한 뒤, 모든 시각을 합친 인덱스에 맞춰 (시간, 열, 심볼) 배열에 채움
+        frames: List[pd.DataFrame] = []
+        for symbol in symbols:
+            records = [row for (owner, *_), page in zip(tasks, pages) if owner == symbol and page is not None for row in page]
+            frames.append(self._parse_candles(records, "pandas").set_index("time_period_start"))
+
+        index = frames[0].index
+        for frame in frames[1:]:
+            index = index.union(frame.index)
+
+        values = np.full((len(index), len(fields), len(symbols)), np.nan)
+        for column, frame in enumerate(frames):
+            values[:, :, column] = frame.reindex(index)[fields].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        result = pd.DataFrame(
+            values.reshape(len(index), -1),
+            index=index.rename("time_period_start"),
+            columns=pd.MultiIndex.from_product([fields, symbols], names=["field", "symbol"]),
+        )
+
+        # 일부 배치를 가져오지 못한 경우, 가져온 데이터는 예외와 함께 반환
+        if len(failed) != 0:
+            failed.sort(key=lambda batch: (symbols.index(batch[0]), batch[1]))
+            raise PartialFetchError(result, failed)
+
+        return result
+
+
+    def iter_bitcoin_candle(
+            self,
+            duration: Duration,
+            workers: int=1,
+            format: Literal["pandas", "arrow", "candles"]="pandas",
+            ) -> Iterator[pd.DataFrame]:
+        '''
+        비트코인 캔들 데이터(BTC-USD, coinapi)를 배치 단위로, 받는 대로 시간 순서대로 돌려주는 generator입니다.
+
+        전체 기간을 메모리에 모으지 않으므로 긴 시간봉/분봉 기록도 최대 workers개 배치만큼의 메모리로 받을 수 있고,
+        중간에 실패하더라도 이미 돌려준 배치는 그대로 남습니다.
+
+        Parameters
+        ----------
+            duration: Duration 객체
+            workers: int=1, 동시에 요청할 배치 수, 1보다 큰 경우 다음 배치들을 스레드 풀에서 미리 받아 둡니다.
+            format: Literal["pandas", "arrow", "candles"]="pandas", 배치의 형식
+            - "pandas": get_bitcoin_candle과 같은 형식의 pd.DataFrame
+            - "arrow": pyarrow.RecordBatch, pyarrow가 설치되어 있어야 합니다.
+            - "candles": Candles
+
+        Raises
+        ------
+            ValueError: 조건에 맞지 않는 매개변수가 감지된 경우
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우, 실패한 배치 직전까지는 이미 반환되어 있습니다.
+
+        Yields
+        ------
+            pd.DataFrame | pyarrow.RecordBatch | Candles: 배치 하나의 캔들 데이터
+
+
+        예제
+        ----
+
+        >> for batch in dataFetcher.iter_bitcoin_candle(duration, workers=4):
+        ...     model.update(...)
+        '''
+
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        convert = self._batch_converter(format, duration)
+
+        # coinapi는 UTC 시간을 기준으로 함
+        batches = duration.plan().strftime(utc=True)
+
+        header = self.requestManager.generate_header(source="coinapi")
+        period_id, BATCH_SIZE = duration.period_id, duration.batch_size
+
+        def fetch(batch_start: str, batch_end: str) -> pd.DataFrame:
+            return self._parse_candles(self._fetch_candle_batch(header, period_id, batch_start, batch_end, BATCH_SIZE), "pandas")
+
+        if workers == 1:
+            for batch_start, batch_end in batches:
+                yield convert(fetch(batch_start, batch_end))
+
+            return
+
+        # 최대 workers개의 배치만 미리 요청해 두고, 가장 오래된 배치부터 순서대로 돌려줌
+        executor = ThreadPoolExecutor(max_workers=workers)
+        pending: Deque[Future] = deque()
+
+        try:
+            for batch_start, batch_end in batches:
+                pending.append(executor.submit(fetch, batch_start, batch_end))
+
+                if len(pending) >= workers:
+                    yield convert(pending.popleft().result())
+
+            while len(pending) != 0:
+                yield convert(pending.popleft().result())
+
+        finally:
+            # 중간에 멈춘 경우 아직 시작하지 않은 요청은 취소
+            for future in pending:
+                future.cancel()
+
+            executor.shutdown(wait=True)
+
+
+    def backfill(self, duration: Duration, checkpoint_path: str, workers: int=1) -> pd.DataFrame:
+        '''
+        get_bitcoin_candle과 같은 데이터를 가져오되, 다 받은 구간마다 checkpoint_path에 기록합니다.
+        중간에 실패한 경우 같은 duration과 checkpoint_path로 다시 호출하면 받지 못한 구간부터 이어서 받습니다.
+
+        Parameters
+        ----------
+            duration: Duration 객체
+            checkpoint_path: str, 체크포인트 디렉터리, 다 받은 뒤에도 지우지 않으므로 필요 없으면 Checkpoint.clear()로 지웁니다.
+            workers: int=1, 동시에 요청할 배치 수
+
+        Raises
+        ------
+            ValueError: checkpoint_path에 다른 duration의 체크포인트가 있는 경우
+            PartialFetchError: 일부 구간을 가져오지 못한 경우, 그동안 받은 데이터는 data 속성에 담겨 있습니다.
+
+        Returns
+        -------
+            pd.DataFrame: 캔들 데이터를 담고 있는 데이터프레임
+        '''
+
+        if workers < 1:
+            raise ValueError("workers must be 1 or upper.")
+
+        plan = duration.plan()
+        checkpoint = Checkpoint(checkpoint_path, plan)
+        pending = checkpoint.pending()
+
+        if len(pending) != 0:
+            header = self.requestManager.generate_header(source="coinapi")
+            batches = plan.strftime(utc=True)
+            failed: List[Tuple[str, str, Exception]] = []
+
+            def fetch(idx: int) -> None:
+                batch_start, batch_end = batches[idx]
+                page = self._fetch_candle_batch(header, plan.period_id, batch_start, batch_end, duration.batch_size)
+                checkpoint.mark(idx, self._parse_candles(page, "pandas"))
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(fetch, idx): idx for idx in pending}
+
+                for future in as_completed(futures):
+                    error = future.exception()
+
+                    if error is not None:
+                        batch_start, batch_end = batches[futures[future]]
+                        failed.append((batch_start, batch_end, error))
+
+            if len(failed) != 0:
+                failed.sort(key=lambda batch: batch[0])
+                raise PartialFetchError(checkpoint.load(), failed)
+
+        return checkpoint.load()
+
+
+    @staticmethod
+    def _batch_converter(format: Literal["pandas", "arrow", "candles"], duration: Duration) -> Callable[[pd.DataFrame], object]:
+        if format == "pandas":
+            return lambda frame: frame
+
+        if format == "candles":
+            return lambda frame: Candles.from_frame(frame, duration.period_id, timezone=duration.timezone)
+
+        if format == "arrow":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise ImportError('format="arrow" needs pyarrow, install it with `pip install pyarrow`.')
+
+            return lambda frame: pa.RecordBatch.from_pandas(frame, preserve_index=False)
+
+        raise ValueError(f'format must be "pandas", "arrow" or "candles". input is {format}')
+
+
+    def _sync_bitcoin_candle(self, duration: Duration, workers: int, store: CandleStore) -> pd.DataFrame:
+        '''
+        저장소에 없는 구간만 get_bitcoin_candle로 받아 저장소에 추가한 뒤, duration 구간 전체를 저장소에서 읽어 반환합니다.
+
+        Raises
+        ------
+            PartialFetchError: 일부 배치를 가져오지 못한 경우, 가져온 데이터는 저장소에 추가되지만 coverage에는 반영되지 않습니다.
+        '''
+
+        for gap, covered in self._missing_durations(duration, store):
+            try:
+                data = self.get_bitcoin_candle(gap, workers=workers)
+            except PartialFetchError as e:
+                store.write(BTC_SYMBOL_ID, gap.period_id, e.data)
+                raise
+
+            store.write(BTC_SYMBOL_ID, gap.period_id, data, covered=covered)
+
+        return store.load(BTC_SYMBOL_ID, duration.period_id, duration.start, duration.end)
+
+
+    @staticmethod
+    def _missing_durations(duration: Duration, store: CandleStore) -> List[Tuple[Duration, Tuple[datetime, datetime] | None]]:
+        '''
+        저장소에 없는 구간마다 (해당 구간의 Duration, coverage에 넣을 구간)을 반환합니다.
+        아직 끝나지 않은 캔들은 바뀔 수 있으므로 coverage에 넣지 않습니다.
+        '''
+
+        now = pd.Timestamp.now(tz=duration.timezone).tz_localize(None).to_pydatetime()
+        final_until = now - duration.interval
+
+        result = []
+        for gap_start, gap_end in store.missing(BTC_SYMBOL_ID, duration.period_id, duration.start, duration.end):
+            gap_start = gap_start.tz_convert(duration.timezone).tz_localize(None).to_pydatetime()
+            gap_end = gap_end.tz_convert(duration.timezone).tz_localize(None).to_pydatetime()
+
+            covered_end = min(gap_end, final_until)
+            result.append((duration.copy(start=gap_start, end=gap_end), (gap_start, covered_end) if covered_end > gap_start else None))
+
+        return result
+
+
+    def _candle_url(self, period_id: str, time_start: str, time_end: str, limit: int, symbol_id: str=BTC_SYMBOL_ID) -> str:
+        '''
+        coinapi 캔들 데이터 요청 URL을 생성합니다.
+        '''
+
+        return self.requestManager.generate_url(
             source="coinapi",
-            api_url="v1/ohlcv/BITSTAMP_SPOT_BTC_USD/history",
+            api_url=f"v1/ohlcv/{symbol_id}/history",
             query={
                 "period_id": period_id,
-                "time_start": start_date,
-                "time_end": test_end_date,
+                "time_start": time_start,
+                "time_end": time_end,
                 "include_empty_items": "true",
-                "limit": BATCH_SIZE
-                }
-            )
+                "limit": limit
+            }
+        )
+
+
+    def _fetch_candle_batch(
+            self,
+            header: dict,
+            period_id: str,
+            batch_start: str,
+            batch_end: str,
+            batch_size: int,
+            symbol_id: str=BTC_SYMBOL_ID,
+            ) -> List[dict]:
+        '''
+        get_bitcoin_candle(get_candle_panel의 coinapi 심볼)의 배치 하나를 가져옵니다.
 
-        test_response = self.requestManager.delayed_get(url=test_url, headers=header)
+        Raises
+        ------
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+
+        Returns
+        -------
+            List[dict]: 캔들 데이터 목록
+        '''
+
+        # URL 생성
+        url = self._candle_url(period_id, batch_start, batch_end, batch_size, symbol_id)
+
+        # 데이터 변환, 모든 캔들이 끝난 구간이라면 응답 캐시를 사용
+        response = self.requestManager.delayed_get(url=url, headers=header, cache=self._is_final(period_id, batch_end))
 
         # 정상적인 응답이 돌아오지 않은 경우
-        if test_response.status_code != 200:
-            raise RuntimeError(test_response.text)
+        if response.status_code != 200:
+            raise RuntimeError(response.text)
 
-        test_resp_json = test_response.json()
+        return self._decode(response)
 
-        result_json = {i:[] for i in test_resp_json[0].keys()}
 
-        # try:
-            # 본 데이터 수집
-        for batch_start, batch_end in duration:
-            print(f"\rfetching {batch_start} ~ {batch_end}...", end="")
-            # URL 생성
-            url = self.requestManager.generate_url(
-                source="coinapi",
-                api_url="v1/ohlcv/BITSTAMP_SPOT_BTC_USD/history",
-                query={
-                    "period_id": period_id,
-                    "time_start": batch_start,
-                    "time_end": batch_end,
-                    "include_empty_items": "true",
-                    "limit": BATCH_SIZE
-                }
-            )
-
-            # 데이터 변환
-            response = self.requestManager.delayed_get(url=url, headers=header)
-            resp_json = response.json()
-
-            # 정상적인 응답이 돌아오지 않은 경우
-            if response.status_code != 200:
-                raise RuntimeError(response.text)
-            
-            # 불러온 데이터는 UTC+00:00 -> UTC+09:00으로 변환
-            for idx, data in enumerate(resp_json):
-                    for key in data.keys():
-                        if key.find("time") != -1:
-                            data_modified = datetime.strptime(data[key].split('.')[0], "%Y-%m-%dT%H:%M:%S") + timedelta(hours=9)
-                            resp_json[idx][key] = data_modified.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
-
-            # 받은 데이터를 전체 데이터에 연결
-            for i in resp_json:
-                for key in result_json.keys():
-                    if key in i.keys():
-                        result_json[key].append(i[key])
-                        continue
-
-                    # null data
-                    result_json[key].append(None)
-
-        # except:
-        #     # 예외 발생시 그동안 처리했던 데이터는 반환
-        #     print("An error occured while processing data.")
-        #     return pd.DataFrame(result_json)
-
-        return pd.DataFrame(result_json)
-    
+    def _fetch_upbit_candle_batch(self, market: str, period_id: str, batch_start: str, batch_end: str, count: int) -> List[dict]:
+        '''
+        get_candle_panel의 upbit 마켓 배치 하나를 가져와 coinapi 캔들과 같은 키로 바꿉니다.
+        upbit는 batch_end(to) 이전의 최근 캔들 count개를 최신순으로 반환하므로, batch_start 이전의 캔들은 버리고 시간순으로 뒤집습니다.
+        거래가 없었던 시각의 캔들은 반환하지 않습니다.
+
+        Raises
+        ------
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+
+        Returns
+        -------
+            List[dict]: 캔들 데이터 목록, upbit가 제공하지 않는 키(time_period_end, trades_count 등)는 없습니다.
+        '''
+
+        url = self.requestManager.generate_url(
+            source="upbit",
+            api_url=UPBIT_CANDLE_PATHS[period_id],
+            query={"market": market, "to": batch_end, "count": count}
+        )
+
+        response = self.requestManager.delayed_get(url=url, headers={}, cache=self._is_final(period_id, batch_end))
+
+        if response.status_code != 200:
+            raise RuntimeError(response.text)
+
+        result = []
+        for row in reversed(self._decode(response)):
+            time_period_start = row["candle_date_time_utc"] + "Z"
+
+            if time_period_start < batch_start:
+                continue
+
+            result.append({
+                "time_period_start": time_period_start,
+                "price_open": row["opening_price"],
+                "price_high": row["high_price"],
+                "price_low": row["low_price"],
+                "price_close": row["trade_price"],
+                "volume_traded": row["candle_acc_trade_volume"],
+            })
+
+        return result
+
+
+    @staticmethod
+    def _is_final(period_id: str, time_end: str) -> bool:
+        '''
+        [time_start, time_end) 구간의 캔들이 모두 끝나 다시 요청해도 바뀌지 않는지 반환합니다.
+        구간의 마지막 캔들은 time_end + 간격 이전에 끝나므로, 그 시점이 지났는지 확인합니다.
+        '''
+
+        end = pd.Timestamp(time_end)
+        end = end.tz_localize("UTC") if end.tzinfo is None else end
+
+        return end.to_pydatetime() + PERIODS[period_id] <= pd.Timestamp.now(tz="UTC").to_pydatetime()
+
+
+    def _decode(self, response) -> List[dict]:
+        '''
+        응답 본문을 JSON으로 변환합니다. 계측기가 켜져 있다면 변환 시간을 json_decode_seconds에 기록합니다.
+        '''
+
+        with self.requestManager.metrics.timer("json_decode_seconds"):
+            return response.json()
+
+
+    def _parse_candles(
+            self,
+            records: List[dict],
+            format: Literal["pandas", "candles"],
+            columns: List[str]=CANDLE_COLUMNS,
+            duration: Duration | None=None,
+            ) -> pd.DataFrame | Candles:
+        '''
+        coinapi 캔들 목록을 데이터프레임(_to_candle_frame) 또는 Candles(Candles.from_records)로 변환합니다.
+        계측기가 켜져 있다면 변환 시간을 candle_parse_seconds에, 변환한 캔들 수를 candles_parsed_total에 기록합니다.
+
+        Parameters
+        ----------
+            records: List[dict], 캔들 데이터 목록
+            format: Literal["pandas", "candles"], 변환할 형식
+            columns: List[str]=CANDLE_COLUMNS, format="pandas"인 경우 데이터프레임의 열 이름
+            duration: Duration | None=None, format="candles"인 경우 캔들 간격과 timezone을 가져올 Duration
+        '''
+
+        metrics = self.requestManager.metrics
+
+        with metrics.timer("candle_parse_seconds", format=format):
+            if format == "pandas":
+                result = self._to_candle_frame(records, columns)
+            else:
+                result = Candles.from_records(records, duration.period_id, timezone=duration.timezone)
+
+        metrics.count("candles_parsed_total", len(records), format=format)
+
+        return result
+
+
+    @staticmethod
+    def _to_candle_frame(records: List[dict], columns: List[str]=CANDLE_COLUMNS) -> pd.DataFrame:
+        '''
+        coinapi 캔들 목록을 데이터프레임으로 변환합니다.
+        시간 데이터(키에 "time"이 들어간 열)는 한 번에 UTC+00:00 -> Asia/Seoul(datetime64[ns, Asia/Seoul])로 변환합니다.
+
+        Parameters
+        ----------
+            records: List[dict], 캔들 데이터 목록, 없는 키는 NaN/NaT로 채워집니다.
+            columns: List[str]=CANDLE_COLUMNS, 데이터프레임의 열 이름
+
+        Returns
+        -------
+            pd.DataFrame: 캔들 데이터를 담고 있는 데이터프레임
+        '''
+
+        result = pd.DataFrame.from_records(records, columns=columns)
+
+        for key in result.columns:
+            if key.find("time") != -1:
+                result[key] = pd.to_datetime(result[key], utc=True, format="ISO8601").dt.tz_convert("Asia/Seoul").dt.as_unit("ns")
+
+        return result
+
 
     def get_bitcoin_cme(self, duration: Duration) -> pd.DataFrame:
         '''
@@ -140,43 +694,115 @@ class DataFetcher():
         Raises
         ------
             ValueError: 조건에 맞지 않는 매개변수가 감지된 경우
-            
+            PartialFetchError: 일부 배치를 가져오지 못한 경우, 그동안 가져온 데이터는 data 속성에 담겨 있습니다.
+
         Returns
         -------
             pd.DataFrame: 선물 데이터를 담고 있는 데이터프레임
         '''
 
-        result = pd.DataFrame()
+        self._check_cme_duration(duration)
+
+        # 배치들을 모아 마지막에 한 번만 행 방향으로 연결
+        frames: List[pd.DataFrame] = []
+        for batch_start, batch_end in duration:
+            try:
+                frames.append(self._fetch_cme_batch(batch_start, batch_end))
+            except Exception as e:
+                raise PartialFetchError(self._concat_cme(frames), [(batch_start, batch_end, e)])
+
+        return self._concat_cme(frames)
 
+
+    def iter_bitcoin_cme(self, duration: Duration) -> Iterator[pd.DataFrame]:
+        '''
+        get_bitcoin_cme의 generator 버전입니다. 배치를 받는 대로 하나씩 돌려줍니다.
+
+        Raises
+        ------
+            ValueError: 조건에 맞지 않는 매개변수가 감지된 경우
+            RuntimeError: 빈 데이터를 받은 경우, 직전 배치까지는 이미 반환되어 있습니다.
+
+        Yields
+        ------
+            pd.DataFrame: 배치 하나의 선물 데이터
+        '''
+
+        self._check_cme_duration(duration)
+
+        for batch_start, batch_end in duration:
+            yield self._fetch_cme_batch(batch_start, batch_end)
+
+
+    @staticmethod
+    def _check_cme_duration(duration: Duration) -> None:
         if duration.period_id != "1DAY":
             raise ValueError("fetching bitcoin CME using FinanceDataReader is currently supports DAY interval only.")
-        
+
         if duration.return_str_in_iter == True:
             raise ValueError("this method needs turn off return_str_in_iter on Duration.")
 
-        try:
-            for batch_start, batch_end in duration:
-                data = fdr.DataReader(symbol="BTC", start=batch_start.strftime("%Y-%m-%dT%H%M%S"), end=batch_end.strftime("%Y-%m-%dT%H%M%S")) # type: ignore
 
-                if data is None:
-                    raise RuntimeError("Empty data received.")
+    @staticmethod
+    def _fetch_cme_batch(batch_start: datetime, batch_end: datetime) -> pd.DataFrame:
+        data = fdr.DataReader(symbol="BTC", start=batch_start.strftime("%Y-%m-%dT%H%M%S"), end=batch_end.strftime("%Y-%m-%dT%H%M%S")) # type: ignore
 
-                result = pd.concat([result, data], axis=1)
+        if data is None:
+            raise RuntimeError("Empty data received.")
 
-        except:
-            # 예외 발생시 그동안 처리했던 데이터는 반환
-            print("An error occured while processing data.")
-            return pd.DataFrame(result)
-        
-        return result
+        return data
 
 
-    def get_account_info(self):
-        pass
+    @staticmethod
+    def _concat_cme(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        if len(frames) == 0:
+            return pd.DataFrame()
 
+        result = pd.concat(frames, axis=0)
 
-    def get_market_code(self):
-        pass
+        # 배치 경계의 날짜가 두 배치에 모두 들어 있을 수 있음
+        return result[~result.index.duplicated(keep="last")].sort_index()
+
+
+    def get_account_info(self) -> List[Dict[str, str]]:
+        '''
+        upbit 계좌의 보유 자산 목록(v1/accounts)을 가져옵니다.
+
+        Raises
+        ------
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+
+        Returns
+        -------
+            List[Dict[str, str]]: 자산별 currency, balance, locked, avg_buy_price 등을 담은 딕셔너리의 리스트
+        '''
+
+        url = self.requestManager.generate_url(source="upbit", api_url="v1/accounts")
+        header = self.requestManager.generate_header(source="upbit")
+
+        return self.requestManager.get(url, headers=header).json()
+
+
+    def get_market_code(self, details: bool=True) -> List[Dict[str, str]]:
+        '''
+        upbit에서 거래 가능한 마켓 코드 목록(v1/market/all)을 가져옵니다.
+
+        Parameters
+        ----------
+            details: bool=True, 유의 종목 등 상세 정보를 함께 가져올지 여부
+
+        Raises
+        ------
+            RuntimeError: API로부터 정상적인 응답이 오지 않은 경우
+
+        Returns
+        -------
+            List[Dict[str, str]]: 마켓별 market, korean_name, english_name 등을 담은 딕셔너리의 리스트
+        '''
+
+        url = self.requestManager.generate_url(source="upbit", api_url="v1/market/all", query={"isDetails": str(details).lower()})
+
+        return self.requestManager.get(url, headers={}).json()
 
 
     def get_api_rate_info(self):
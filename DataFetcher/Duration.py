@@ -1,7 +1,237 @@
+from copy import copy
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
-from typing import Dict, Literal
+from typing import Dict, Iterable, Iterator, List, Literal, Tuple
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# coinapi가 지원하는 캔들 간격(period_id)과 그 길이
+PERIODS: Dict[str, timedelta | relativedelta] = {
+    **{f"{n}SEC": timedelta(seconds=n) for n in (1, 2, 3, 4, 5, 6, 10, 15, 20, 30)},
+    **{f"{n}MIN": timedelta(minutes=n) for n in (1, 2, 3, 4, 5, 6, 10, 15, 20, 30)},
+    **{f"{n}HRS": timedelta(hours=n) for n in (1, 2, 3, 4, 6, 8, 12)},
+    **{f"{n}DAY": timedelta(days=n) for n in (1, 2, 3, 5, 7, 10)},
+    **{f"{n}MTH": relativedelta(months=n) for n in (1, 2, 3, 4, 6)},
+    **{f"{n}YRS": relativedelta(years=n) for n in (1, 2, 3, 4, 5)},
+}
+
+# 기존 interval 이름
+INTERVAL_ALIASES: Dict[str, str] = {
+    "MINUTE": "1MIN",
+    "HOUR": "1HRS",
+    "DAY": "1DAY",
+    "MONTH": "1MTH",
+}
+
+
+class BatchPlan():
+    '''
+    Duration을 배치 크기로 나눈 (시작, 끝) 구간들의 변경할 수 없는 목록입니다. Duration.plan()으로 만듭니다.
+
+    반복 상태를 갖지 않으므로 여러 번, 여러 스레드에서 동시에 반복해도 되고,
+    작업자별로 나누거나(split, shard) JSON으로 저장해 두었다가 다시 불러올 수 있습니다.
+    구간의 시각은 timezone 기준의 timezone 정보가 없는 datetime이며, 앞 구간의 끝이 다음 구간의 시작과 같습니다.
+
+
+    예제
+    ----
+
+    >> plan = Duration(start="2023-01-01T00:00", end="2023-02-01T00:00", batch_size=7).plan()
+    >> len(plan), plan[0]
+    (4, (datetime.datetime(2023, 1, 1, 0, 0), datetime.datetime(2023, 1, 8, 0, 0)))
+    >> first, second = plan.split(2)
+    >> BatchPlan.from_json(plan.to_json()) == plan
+    True
+    '''
+
+    __slots__ = ("_windows", "_period_id", "_timezone")
+
+
+    def __init__(self, windows: Iterable[Tuple[datetime, datetime]], period_id: str, timezone: str="Asia/Seoul") -> None:
+        '''
+        Args
+        ----
+        windows: Iterable[Tuple[datetime, datetime]], 시간 순서대로 정렬된 (시작, 끝) 구간들
+        period_id: str, 캔들 간격(e.g. "1DAY")
+        timezone: str="Asia/Seoul", 구간 시각의 timezone
+        '''
+
+        object.__setattr__(self, "_windows", tuple((start, end) for start, end in windows))
+        object.__setattr__(self, "_period_id", period_id)
+        object.__setattr__(self, "_timezone", timezone)
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BatchPlan is immutable.")
+
+
+    @property
+    def windows(self) -> Tuple[Tuple[datetime, datetime], ...]:
+        return self._windows
+
+
+    @property
+    def period_id(self) -> str:
+        return self._period_id
+
+
+    @property
+    def timezone(self) -> str:
+        return self._timezone
+
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+    def __iter__(self) -> Iterator[Tuple[datetime, datetime]]:
+        return iter(self._windows)
+
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return BatchPlan(self._windows[index], self._period_id, self._timezone)
+
+        return self._windows[index]
+
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, BatchPlan)
+            and self._windows == other._windows
+            and self._period_id == other._period_id
+            and self._timezone == other._timezone
+        )
+
+
+    def __hash__(self) -> int:
+        return hash((self._windows, self._period_id, self._timezone))
+
+
+    def __repr__(self) -> str:
+        if len(self._windows) == 0:
+            return f"BatchPlan(period_id={self._period_id}, windows=0)"
+
+        return f"BatchPlan(period_id={self._period_id}, windows={len(self._windows)}, {self._windows[0][0]} ~ {self._windows[-1][1]})"
+
+
+    def split(self, count: int) -> List["BatchPlan"]:
+        '''
+        구간들을 순서를 유지한 채 count개의 연속된 묶음으로 나눕니다. 묶음의 크기 차이는 최대 1입니다.
+
+        Raises
+        ------
+        ValueError: count가 1보다 작은 경우 발생합니다.
+        '''
+
+        if count < 1:
+            raise ValueError("count must be 1 or upper.")
+
+        size, remainder = divmod(len(self._windows), count)
+        result, begin = [], 0
+
+        for i in range(count):
+            end = begin + size + (1 if i < remainder else 0)
+            result.append(self[begin:end])
+            begin = end
+
+        return result
+
+
+    def shard(self, index: int, count: int) -> "BatchPlan":
+        '''
+        count개의 작업자 중 index번째 작업자가 맡을 구간들(index, index + count, ...)을 반환합니다.
+
+        Raises
+        ------
+        ValueError: index가 [0, count) 범위가 아닌 경우 발생합니다.
+        '''
+
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"index must be in [0, {count}). input is {index}")
+
+        return self[index::count]
+
+
+    def bounds(self, utc: bool=False) -> Tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+        '''
+        구간들의 시작 시각과 끝 시각을 timezone이 있는 DatetimeIndex 두 개로 반환합니다.
+
+        Args
+        ----
+        utc: bool=False, True인 경우 UTC로 변환합니다.
+        '''
+
+        starts = pd.DatetimeIndex([start for start, _ in self._windows]).tz_localize(self._timezone)
+        ends = pd.DatetimeIndex([end for _, end in self._windows]).tz_localize(self._timezone)
+
+        if utc:
+            starts, ends = starts.tz_convert("UTC"), ends.tz_convert("UTC")
+
+        return starts, ends
+
+
+    def strftime(self, utc: bool=False) -> List[Tuple[str, str]]:
+        '''
+        구간들을 ISO 8601 문자열로 한 번에 변환합니다.
+
+        Args
+        ----
+        utc: bool=False, True인 경우 UTC 시각("2023-01-01T15:00:00Z"), False인 경우 timezone의 시각("2023-01-02T00:00:00+09:00")
+        '''
+
+        if len(self._windows) == 0:
+            return []
+
+        starts, ends = self.bounds(utc=utc)
+        return list(zip(self._isoformat(starts).tolist(), self._isoformat(ends).tolist()))
+
+
+    @staticmethod
+    def _isoformat(times: pd.DatetimeIndex) -> np.ndarray:
+        # DatetimeIndex.strftime은 원소마다 변환하므로 numpy로 한 번에 변환
+        local = times.tz_localize(None).values
+        text = np.datetime_as_string(local, unit="s")
+
+        if str(times.tz) == "UTC":
+            return np.char.add(text, "Z")
+
+        # UTC와의 차이(분)를 "+09:00" 형식으로 변환
+        offsets = ((local - times.tz_convert("UTC").tz_localize(None).values) // np.timedelta64(1, "m")).astype(np.int64)
+        signs = np.where(offsets < 0, "-", "+")
+        hours = np.char.zfill((np.abs(offsets) // 60).astype(str), 2)
+        minutes = np.char.zfill((np.abs(offsets) % 60).astype(str), 2)
+
+        return np.char.add(np.char.add(np.char.add(np.char.add(text, signs), hours), ":"), minutes)
+
+
+    def to_json(self) -> str:
+        '''
+        JSON 문자열로 직렬화합니다.
+        '''
+
+        return json.dumps({
+            "period_id": self._period_id,
+            "timezone": self._timezone,
+            "windows": [[start.isoformat(), end.isoformat()] for start, end in self._windows],
+        })
+
+
+    @classmethod
+    def from_json(cls, text: str) -> "BatchPlan":
+        '''
+        to_json()으로 만든 문자열에서 BatchPlan을 복원합니다.
+        '''
+
+        data = json.loads(text)
+        windows = [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in data["windows"]]
+
+        return cls(windows, data["period_id"], data.get("timezone", "Asia/Seoul"))
 
 
 class Duration():
@@ -9,6 +239,7 @@ class Duration():
     BTEM의 날짜 및 시간 클래스입니다.
     
     생성자로 전달되는 interval 정보가 반영된 iterator가 내장되어 있습니다.
+    반복할 때마다 plan()으로 구간 목록을 새로 만들기 때문에 Duration 자체는 반복 상태를 갖지 않습니다.
 
     
     예제
@@ -18,13 +249,19 @@ class Duration():
     >> for batch_start, batch_end in duration:
     ...     print(batch_start, batch_end)
     ...
-    2020-01-01 00:00:00 2020-02-01 00:00:00
-    2020-03-01 00:00:00 2020-04-01 00:00:00
-    2020-05-01 00:00:00 2020-06-01 00:00:00
-    2020-07-01 00:00:00 2020-08-01 00:00:00
-    2020-09-01 00:00:00 2020-10-01 00:00:00
-    2020-11-01 00:00:00 2020-12-01 00:00:00
-    2021-01-01 00:00:00 2021-01-02 00:00:00
+    2020-01-01T00:00:00+09:00 2020-02-01T00:00:00+09:00
+    2020-02-01T00:00:00+09:00 2020-03-01T00:00:00+09:00
+    2020-03-01T00:00:00+09:00 2020-04-01T00:00:00+09:00
+    2020-04-01T00:00:00+09:00 2020-05-01T00:00:00+09:00
+    2020-05-01T00:00:00+09:00 2020-06-01T00:00:00+09:00
+    2020-06-01T00:00:00+09:00 2020-07-01T00:00:00+09:00
+    2020-07-01T00:00:00+09:00 2020-08-01T00:00:00+09:00
+    2020-08-01T00:00:00+09:00 2020-09-01T00:00:00+09:00
+    2020-09-01T00:00:00+09:00 2020-10-01T00:00:00+09:00
+    2020-10-01T00:00:00+09:00 2020-11-01T00:00:00+09:00
+    2020-11-01T00:00:00+09:00 2020-12-01T00:00:00+09:00
+    2020-12-01T00:00:00+09:00 2021-01-01T00:00:00+09:00
+    2021-01-01T00:00:00+09:00 2021-01-02T00:00:00+09:00
     '''
 
 
@@ -33,10 +270,11 @@ class Duration():
             start: str,
             end: str,
             batch_size: int=1,
-            interval: Literal["DAY", "HOUR", "MONTH"]="DAY",
+            interval: Literal["MINUTE", "HOUR", "DAY", "MONTH"] | str="DAY",
             _format: str="%Y-%m-%dT%H:%M",
             return_str_in_iter: bool=True,
             return_utc_in_iter: bool=False,
+            timezone: str="Asia/Seoul",
         ) -> None:
         '''
         Args
@@ -44,8 +282,10 @@ class Duration():
         start: str, 시작 일시를 표현한 문자열
         end: str, 종료 일시를 표현한 문자열
         batch_size: int=1, (iterable 객체로 사용 시) 배치 크기
-        interval: Literal["DAY", "HOUR", "MONTH"]="DAY", 시점과 종점 간 간격을 지정
+        interval: Literal["MINUTE", "HOUR", "DAY", "MONTH"] | str="DAY", 시점과 종점 간 간격을 지정
+            - coinapi의 period_id(e.g. "5MIN", "4HRS", "1DAY")도 사용할 수 있습니다.
         _format: str="%Y%m%d", start와 end의 표현 형식
+        timezone: str="Asia/Seoul", start와 end의 timezone
 
         Examples
         --------
@@ -57,8 +297,10 @@ class Duration():
         if batch_size <= 0:
             raise ValueError("batch size must over 0.")
 
-        if interval not in ("DAY", "HOUR", "MONTH"):
-            raise ValueError("invaild interval vallue found.")
+        period_id = INTERVAL_ALIASES.get(interval, interval)
+
+        if period_id not in PERIODS:
+            raise ValueError(f"invaild interval vallue found: {interval}, use one of {list(INTERVAL_ALIASES)} or {list(PERIODS)}.")
 
 
         # datetime 객체로 변환
@@ -75,34 +317,25 @@ class Duration():
             raise ValueError(f"start date must earier than end date, got start: {start}, end: {end}")
 
 
-        # 간격 지정
-        if interval == "MONTH":
-            self.period_id = "1MTH"
-            interval_dt = relativedelta(months=1)
-        elif interval == "HOUR":
-            self.period_id = "1HRS"
-            interval_dt = timedelta(hours=1)
-        else:
-            self.period_id = "1DAY"
-            interval_dt = timedelta(days=1)
-
         # 객체 멤버에 저장
+        self.period_id = period_id
         self.start = start_dt
         self.end = end_dt
-        self.interval = interval_dt
-        self.current = start_dt
+        self.interval = PERIODS[period_id]
+        self.timezone = timezone
         self.batch_size = batch_size
         self.return_str_in_iter = return_str_in_iter
         self.return_utc_in_iter = return_utc_in_iter
 
 
-    def strftime(self, timezone=False) -> Dict[str, str]:
+    def strftime(self, timezone=False, utc=False) -> Dict[str, str]:
         '''
         저장된 날짜 데이터를 문자열로 변환하여 반환합니다.
         
         Args
         ----
-        timezone: bool=False, 반환할 날짜 데이터에 timezone을 포함할지 여부를 결정합니다.
+        timezone: bool=False, 반환할 날짜 데이터에 timezone(e.g. "+09:00")을 포함할지 여부를 결정합니다.
+        utc: bool=False, True인 경우 UTC 시각("2023-01-01T15:00:00Z")으로 변환합니다.
 
         
         Raises
@@ -115,43 +348,98 @@ class Duration():
         '''
 
 
-        start, end = self.start.isoformat().split('.')[0], self.end.isoformat().split('.')[0],
-
-        if timezone:
-            start += "+09:00"
-            end += "+09:00"        
+        if utc or timezone:
+            start, end = BatchPlan([(self.start, self.end)], self.period_id, self.timezone).strftime(utc=utc)[0]
+        else:
+            start, end = self.start.isoformat().split('.')[0], self.end.isoformat().split('.')[0]
 
         result = {"start": start, "end": end}
         return result
 
 
-    # iteration 구현 코드
-    def __iter__(self):
-        return self
+    def copy(self, start: datetime | None=None, end: datetime | None=None) -> "Duration":
+        '''
+        같은 간격과 배치 설정을 가진 Duration을 새로 만듭니다.
+
+        Args
+        ----
+        start: datetime | None=None, 새 시작 일시, None인 경우 기존 값을 사용합니다.
+        end: datetime | None=None, 새 종료 일시, None인 경우 기존 값을 사용합니다.
+
+        Raises
+        ------
+        ValueError: 시작 일시가 종료 일시보다 늦은 경우 발생합니다.
+
+        Returns
+        -------
+        Duration, 새 Duration 객체
+        '''
+
+        duration = copy(self)
+        duration.start = self.start if start is None else start
+        duration.end = self.end if end is None else end
+
+        if duration.end < duration.start:
+            raise ValueError(f"start date must earier than end date, got start: {duration.start}, end: {duration.end}")
+
+        return duration
+
 
+    def plan(self) -> BatchPlan:
+        '''
+        [start, end)를 batch_size개의 간격씩 나눈 구간 목록을 미리 계산하여 반환합니다.
+        구간들은 빈틈과 겹침 없이 이어지며(앞 구간의 끝 = 다음 구간의 시작), 마지막 구간은 end에서 잘립니다.
+
+        Returns
+        -------
+        BatchPlan, (시작, 끝) 구간들의 변경할 수 없는 목록
+        '''
+
+        start = pd.Timestamp(self.start).tz_localize(self.timezone)
+        end = pd.Timestamp(self.end).tz_localize(self.timezone)
+
+        if start >= end:
+            return BatchPlan([], self.period_id, self.timezone)
+
+        # 구간 경계를 한 번에 계산, 초/분/시 단위는 절대 시간, 일/월/년 단위는 달력 기준으로 더함
+        bounds = pd.date_range(start=start, end=end, freq=self._offset(self.batch_size))
+
+        if bounds[-1] < end:
+            bounds = bounds.append(pd.DatetimeIndex([end]))
 
-    # iteration 구현 코드
-    def __next__(self):
-        # 각 반복마다 각 배치 크기만큼 반환
-        if self.current < self.end:
-            batch_start = self.current
-            self.current += (self.interval * (self.batch_size + 1))
+        bounds = bounds.tz_localize(None).to_pydatetime()
 
-            batch_end = batch_start + self.interval * self.batch_size
+        return BatchPlan(zip(bounds[:-1], bounds[1:]), self.period_id, self.timezone)
+
+
+    def _offset(self, count: int) -> pd.Timedelta | pd.DateOffset:
+        # 간격 count개의 길이
+        interval = self.interval
+
+        if isinstance(interval, relativedelta):
+            return pd.DateOffset(years=interval.years * count, months=interval.months * count)
+
+        if interval.days != 0 and interval.seconds == 0:
+            return pd.DateOffset(days=interval.days * count)
+
+        return pd.Timedelta(interval * count)
+
+
+    # iteration 구현 코드, 반복할 때마다 plan()으로 새로 시작하므로 Duration 자체는 반복 상태를 갖지 않음
+    def __iter__(self):
+        plan = self.plan()
 
-            if batch_end > self.end:
-                batch_end = self.end
+        if self.return_str_in_iter:
+            yield from plan.strftime(utc=self.return_utc_in_iter)
+            return
 
-            if self.return_utc_in_iter:
-                batch_start, batch_end = batch_start - timedelta(hours=9), batch_end - timedelta(hours=9)
-            
-            if self.return_str_in_iter:
-                return (batch_start.isoformat().split('.')[0] + "+09:00", batch_end.isoformat().split('.')[0] + "+09:00")
-            
-            return (batch_start, batch_end)
+        if not self.return_utc_in_iter:
+            yield from plan
+            return
 
-        self.current = self.start
-        raise StopIteration
+        # timezone 정보가 없는 UTC 시각
+        starts, ends = plan.bounds(utc=True)
+        yield from zip(starts.tz_localize(None).to_pydatetime(), ends.tz_localize(None).to_pydatetime())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+from typing import Callable, Dict, Iterable, List, Literal, Tuple
+
+import asyncio
+import json
+import uuid
+
+import aiohttp
+
+from .CandleAggregator import CandleAggregator
+
+
+# upbit 실시간 시세 websocket 주소
+UPBIT_WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+
+
+class RealtimeFeed():
+    '''
+    upbit websocket의 체결(trade) 또는 현재가(ticker) 스트림을 받아 캔들로 모으고, 구독자들에게 전달합니다.
+
+    REST 폴링과 달리 체결이 도착하는 즉시 처리하므로, 캔들이 완성된 뒤 구독자가 받기까지 걸리는 시간은
+    네트워크 지연과 메시지 하나의 처리 시간(수 ms 이내)뿐입니다.
+    구독자는 (마켓 코드, 캔들, 완성 여부)를 받는 함수이며, 캔들은 CandleAggregator가 만든 것과 같습니다.
+    연결이 끊어지면 reconnect=True인 경우 retry_delay부터 두 배씩 늘려 가며 다시 연결합니다.
+
+
+    예제
+    ----
+
+    >> feed = RealtimeFeed(["KRW-BTC"], period_id="1MIN")
+    >> feed.subscribe(lambda code, candle, final: print(model.update(candle)))
+    >> await feed.run()
+
+    로컬에서 테스트할 때는 ReplayServer의 주소를 url로 지정합니다.
+
+    >> async with ReplayServer(ticks) as server:
+    ...     await RealtimeFeed(["KRW-BTC"], url=server.url, reconnect=False).run()
+    '''
+
+
+    def __init__(
+            self,
+            codes: Iterable[str]=("KRW-BTC",),
+            period_id: str="1MIN",
+            type: Literal["trade", "ticker"]="trade",
+            url: str=UPBIT_WEBSOCKET_URL,
+            fill_gaps: bool=True,
+            reconnect: bool=True,
+            retry_delay: float=1.0,
+            max_retry_delay: float=30.0,
+            timezone: str="Asia/Seoul",
+            ) -> None:
+        '''
+        Args
+        ----
+        codes: Iterable[str]=("KRW-BTC",), 구독할 마켓 코드들
+        period_id: str="1MIN", 캔들 간격, 길이가 일정한 간격(1SEC ~ 10DAY)만 사용할 수 있습니다.
+        type: Literal["trade", "ticker"]="trade", 구독할 스트림, 둘 다 체결 가격/체결량/체결 시각을 사용합니다.
+        url: str=UPBIT_WEBSOCKET_URL, websocket 주소
+        fill_gaps: bool=True, 체결이 없던 구간을 직전 종가로 채운 캔들로 전달할지 여부
+        reconnect: bool=True, 연결이 끊어진 경우 다시 연결할지 여부, False인 경우 서버가 연결을 닫으면 run()이 끝납니다.
+        retry_delay: float=1.0, 다시 연결하기 전 처음 기다릴 시간(초)
+        max_retry_delay: float=30.0, 다시 연결하기 전 기다릴 최대 시간(초)
+        timezone: str="Asia/Seoul", 캔들 시간 데이터의 timezone
+
+        Raises
+        ------
+        ValueError: 마켓 코드가 없거나 type이 올바르지 않은 경우 발생합니다.
+        '''
+
+        self.codes = list(codes)
+
+        if len(self.codes) == 0:
+            raise ValueError("at least one market code is required.")
+
+        if type not in ("trade", "ticker"):
+            raise ValueError(f'type must be "trade" or "ticker". input is {type}')
+
+        self.type = type
+        self.url = url
+        self.reconnect = reconnect
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.aggregators: Dict[str, CandleAggregator] = {
+            code: CandleAggregator(period_id, fill_gaps=fill_gaps, timezone=timezone) for code in self.codes
+        }
+        self.subscribers: List[Tuple[Callable[[str, Dict, bool], object], bool]] = []
+
+        # 마지막으로 처리한 메시지의 서버 시각(UTC epoch ms), 지연 확인용
+        self.last_message_time: int | None = None
+        self.messages = 0
+
+        self._stop = asyncio.Event()
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+
+
+    def subscribe(self, callback: Callable[[str, Dict, bool], object], partial: bool=False) -> None:
+        '''
+        구독자를 추가합니다.
+
+        Args
+        ----
+        callback: Callable[[str, Dict, bool], object], (마켓 코드, 캔들, 완성 여부)를 받는 함수, 코루틴 함수가 아니어야 합니다.
+        partial: bool=False, True인 경우 체결마다 진행 중인 캔들도 받습니다(완성 여부 False).
+        '''
+
+        self.subscribers.append((callback, partial))
+
+
+    def subscription(self) -> List[Dict]:
+        '''
+        websocket 연결 후 보낼 구독 요청을 반환합니다.
+        '''
+
+        return [{"ticket": str(uuid.uuid4())}, {"type": self.type, "codes": self.codes}, {"format": "DEFAULT"}]
+
+
+    async def run(self) -> None:
+        '''
+        stop()이 호출될 때까지(reconnect=False인 경우 연결이 끊어질 때까지) 스트림을 받습니다.
+        진행 중인 캔들은 끝난 뒤에도 남아 있으므로, 다 받은 기록(e.g. ReplayServer)이라면 flush()로 마저 전달합니다.
+
+        Raises
+        ------
+        aiohttp.ClientError: reconnect=False인 상태에서 연결에 실패한 경우 발생합니다.
+        Exception: 구독자에서 발생한 예외는 그대로 전달됩니다.
+        '''
+
+        self._stop.clear()
+        delay = self.retry_delay
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                try:
+                    async with session.ws_connect(self.url, heartbeat=30.0) as ws:
+                        self._ws = ws
+                        await ws.send_str(json.dumps(self.subscription()))
+                        delay = self.retry_delay
+
+                        async for message in ws:
+                            if message.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                                self.handle(message.data)
+                            elif message.type == aiohttp.WSMsgType.ERROR:
+                                break
+
+                except aiohttp.ClientError:
+                    if not self.reconnect:
+                        raise
+
+                finally:
+                    self._ws = None
+
+                if not self.reconnect or self._stop.is_set():
+                    break
+
+                # 연결이 끊어진 경우 점점 오래 기다렸다가 다시 연결
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+                delay = min(delay * 2, self.max_retry_delay)
+
+
+    async def stop(self) -> None:
+        '''
+        run()을 끝냅니다.
+        '''
+
+        self._stop.set()
+
+        if self._ws is not None:
+            await self._ws.close()
+
+
+    def handle(self, data: bytes | str) -> None:
+        '''
+        websocket 메시지 하나를 처리합니다. 구독하지 않은 마켓이나 체결 정보가 없는 메시지는 무시합니다.
+        '''
+
+        message = json.loads(data)
+        aggregator = self.aggregators.get(message.get("code"))
+
+        if aggregator is None or "trade_timestamp" not in message:
+            return
+
+        self.messages += 1
+        self.last_message_time = message.get("timestamp")
+
+        code = message["code"]
+        for candle in aggregator.add(message["trade_timestamp"], message["trade_price"], message["trade_volume"]):
+            self._publish(code, candle, True)
+
+        current = None
+        for callback, partial in self.subscribers:
+            if partial:
+                current = aggregator.partial() if current is None else current
+                callback(code, current, False)
+
+
+    def flush(self) -> None:
+        '''
+        진행 중인 캔들들을 완성된 캔들로 전달합니다.
+        '''
+
+        for code, aggregator in self.aggregators.items():
+            candle = aggregator.flush()
+
+            if candle is not None:
+                self._publish(code, candle, True)
+
+
+    def _publish(self, code: str, candle: Dict, final: bool) -> None:
+        for callback, _ in self.subscribers:
+            callback(code, candle, final)
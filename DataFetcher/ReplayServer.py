@@ -0,0 +1,158 @@
+from datetime import timedelta
+from typing import Dict, List
+
+import asyncio
+import json
+from time import time
+
+import numpy as np
+from aiohttp import web, WSMsgType
+
+from .Candles import Candles
+from .Duration import PERIODS
+
+
+class ReplayServer():
+    '''
+    upbit websocket을 흉내 내는 로컬 서버입니다. 미리 준비한 체결 기록을 구독 요청에 맞추어 다시 보냅니다.
+
+    클라이언트가 구독 요청([{"ticket": ...}, {"type": "trade", "codes": [...]}, ...])을 보내면
+    해당 type과 마켓 코드의 체결만 시간 순서대로 보내고 연결을 닫습니다.
+    speed가 None이면 기다리지 않고 보내며, 숫자라면 체결 시각 차이를 speed배 빠르게 재현합니다.
+    보내는 메시지의 timestamp는 실제로 보낸 시각(UTC epoch ms)이므로 수신 측에서 지연을 잴 수 있습니다.
+
+
+    예제
+    ----
+
+    >> ticks = ReplayServer.ticks_from_candles(dataFetcher.get_bitcoin_candle(duration, format="candles"), "KRW-BTC")
+    >> async with ReplayServer(ticks, speed=60) as server:
+    ...     feed = RealtimeFeed(["KRW-BTC"], url=server.url, reconnect=False)
+    ...     await feed.run()
+    '''
+
+
+    def __init__(self, ticks: List[Dict], host: str="127.0.0.1", port: int=0, speed: float | None=None) -> None:
+        '''
+        Args
+        ----
+        ticks: List[Dict], upbit 체결 메시지 형식(type, code, trade_timestamp, trade_price, trade_volume, ...)의 체결 기록
+        host: str="127.0.0.1", 서버 주소
+        port: int=0, 서버 포트, 0인 경우 임의의 빈 포트를 사용합니다.
+        speed: float | None=None, 재생 속도, None인 경우 기다리지 않습니다.
+
+        Raises
+        ------
+        ValueError: speed가 0 이하인 경우 발생합니다.
+        '''
+
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must over 0.")
+
+        self.ticks = sorted(ticks, key=lambda tick: tick["trade_timestamp"])
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.url: str | None = None
+
+        self._runner: web.AppRunner | None = None
+
+
+    @staticmethod
+    def ticks_from_candles(candles: Candles, code: str="KRW-BTC", type: str="trade") -> List[Dict]:
+        '''
+        캔들마다 시가, 고가, 저가, 종가 순서로 체결 4개를 만들어 체결 기록으로 반환합니다.
+        체결 시각은 캔들 구간을 4등분한 시점이고 거래량은 4등분하므로, 같은 간격으로 다시 모으면 원래 캔들이 됩니다.
+        가격이 없는(NaN) 캔들은 건너뜁니다. 데이터프레임은 Candles.from_frame()으로 먼저 변환합니다.
+
+        Raises
+        ------
+        ValueError: 캔들 간격이 월/년 단위인 경우 발생합니다.
+        '''
+
+        period = PERIODS[candles.period_id]
+
+        if not isinstance(period, timedelta):
+            raise ValueError(f"period_id must be one of fixed length periods(1SEC ~ 10DAY). input is {candles.period_id}")
+
+        start = candles.time // 1_000_000
+        valid = ~np.isnan(candles["price_close"].astype(np.float64))
+
+        prices = np.stack([candles[key].astype(np.float64) for key in ("price_open", "price_high", "price_low", "price_close")], axis=1)
+        offsets = np.arange(4) * (period // timedelta(milliseconds=1) // 4)
+        timestamps = start[:, None] + offsets
+        volumes = candles["volume_traded"].astype(np.float64) / 4
+
+        ticks = []
+        for row in np.flatnonzero(valid).tolist():
+            for i in range(4):
+                ticks.append({
+                    "type": type,
+                    "code": code,
+                    "trade_timestamp": int(timestamps[row, i]),
+                    "trade_price": float(prices[row, i]),
+                    "trade_volume": float(volumes[row]),
+                    "sequential_id": int(timestamps[row, i]) * 10 + i,
+                    "stream_type": "REALTIME",
+                })
+
+        return ticks
+
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/websocket/v1", self._handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = f"ws://{self.host}:{port}/websocket/v1"
+
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        # 첫 메시지는 구독 요청
+        message = await ws.receive()
+
+        if message.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+            return ws
+
+        types = {item["type"]: set(item.get("codes", [])) for item in json.loads(message.data) if "type" in item}
+
+        previous = None
+        for tick in self.ticks:
+            if tick["code"] not in types.get(tick["type"], ()):
+                continue
+
+            # 체결 시각 차이를 speed배 빠르게 재현
+            if self.speed is not None and previous is not None:
+                await asyncio.sleep((tick["trade_timestamp"] - previous) / 1000 / self.speed)
+
+            previous = tick["trade_timestamp"]
+
+            # upbit는 메시지를 binary로 보냄
+            await ws.send_bytes(json.dumps({**tick, "timestamp": int(time() * 1000)}).encode("utf-8"))
+
+        await ws.close()
+        return ws
@@ -0,0 +1,326 @@
+from typing import Dict, Literal, Mapping
+
+import urllib.parse as url_parser
+
+import asyncio
+import json
+from random import random
+from time import perf_counter
+
+import aiohttp
+
+from .RequestManager import RequestManager
+
+
+class AsyncResponse():
+    '''
+    AsyncRequestManager의 응답입니다.
+
+    본문을 미리 읽어 두므로 연결이 반환된 뒤에도 사용할 수 있으며,
+    requests.Response와 같은 이름(status_code, reason, headers, text, content, json())으로 접근합니다.
+    '''
+
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: Mapping[str, str], content: bytes) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncRequestManager():
+    '''
+    RequestManager의 asyncio 버전입니다.
+
+    API KEY, URL/header 생성, 요청 제한기(RateLimiter)는 감싸고 있는 RequestManager의 것을 그대로 사용하므로
+    동기 API와 비동기 API가 같은 요청 제한을 나누어 씁니다.
+    연결은 호스트마다 aiohttp.ClientSession을 하나씩 두고 재사용하며, 스레드 없이 많은 요청을 동시에 보낼 수 있습니다.
+
+    연결 풀은 공유하지 않습니다. 비동기 연결은 aiohttp의 TCPConnector가, 동기 연결은 RequestManager의 requests 세션이 따로 관리하므로
+    같은 호스트에 동시에 열리는 연결 수는 최대 (RequestManager.pool_maxsize + AsyncRequestManager.pool_maxsize)개입니다.
+    서버의 동시 연결 수 제한을 지켜야 한다면 두 pool_maxsize의 합이 그 제한을 넘지 않도록 설정하세요.
+
+
+    예제
+    ----
+
+    >> async with AsyncRequestManager() as requestManager:
+    ...     header = requestManager.generate_header(source="coinapi")
+    ...     responses = await asyncio.gather(*[requestManager.delayed_get(url, header) for url in urls])
+    '''
+
+
+    def __init__(
+            self,
+            requestManager: RequestManager | None=None,
+            pool_maxsize: int=100,
+            keep_alive: bool | None=None,
+            ) -> None:
+        '''
+        Args
+        ----
+        requestManager: RequestManager | None=None, 키와 요청 제한기를 공유할 RequestManager, None인 경우 새로 만듭니다.
+        pool_maxsize: int=100, 호스트 하나에 동시에 열어 둘 최대 비동기 연결 수(동시 요청 수), requestManager의 동기 연결 수는 포함하지 않습니다.
+        keep_alive: bool | None=None, False인 경우 매 요청마다 연결을 닫습니다. None인 경우 requestManager의 설정을 따릅니다.
+
+        Raises
+        ------
+        ValueError: 연결 풀 크기가 1보다 작은 경우 발생합니다.
+        '''
+
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be 1 or upper.")
+
+        self.requestManager = RequestManager() if requestManager is None else requestManager
+        self.rate_limiter = self.requestManager.rate_limiter
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = self.requestManager.keep_alive if keep_alive is None else keep_alive
+        self.__sessions: Dict[str, aiohttp.ClientSession] = dict()
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+    async def close(self) -> None:
+        '''
+        열려 있는 모든 호스트별 세션과 연결 풀을 닫습니다.
+        '''
+
+        sessions = list(self.__sessions.values())
+        self.__sessions.clear()
+
+        for session in sessions:
+            await session.close()
+
+
+    def session(self, url: str) -> aiohttp.ClientSession:
+        '''
+        url의 호스트에 해당하는 세션을 반환합니다. 세션이 없다면 새로 만듭니다.
+        실행 중인 이벤트 루프 안에서 호출해야 합니다.
+        '''
+
+        parsed = url_parser.urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+
+        session = self.__sessions.get(host)
+
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.pool_maxsize, force_close=not self.keep_alive)
+            session = aiohttp.ClientSession(connector=connector)
+            self.__sessions[host] = session
+
+        return session
+
+
+    def generate_url(self, source: Literal["upbit", "coinapi"], api_url: str, query: dict | None=None) -> str:
+        '''
+        RequestManager.generate_url과 같습니다.
+        '''
+
+        return self.requestManager.generate_url(source=source, api_url=api_url, query=query)
+
+
+    def generate_header(self, source: Literal["upbit", "coinapi"], payload: dict | None=None, query: dict | None=None) -> dict:
+        '''
+        RequestManager.generate_header와 같습니다.
+        '''
+
+        return self.requestManager.generate_header(source=source, payload=payload, query=query)
+
+
+    async def send(self, url: str, headers: dict, method: str="GET", cache: bool=False, **kwargs) -> AsyncResponse:
+        '''
+        요청 제한기가 허용할 때까지 기다린 뒤 요청을 보내고, 응답 헤더를 요청 제한기에 반영합니다.
+
+        Parameters
+        ----------
+        url: str, 요청을 보낼 URL
+        headers: dict, 요청을 보낼 떄 사용할 header
+        method: str="GET", HTTP 메서드
+        cache: bool=False, RequestManager.send의 cache와 같습니다. 캐시는 RequestManager의 것을 공유합니다.
+        **kwargs: aiohttp.ClientSession.request에 그대로 전달할 인자
+
+        Raises
+        ------
+        CircuitOpenError: 해당 source의 회로 차단기가 열려 있는 경우 발생합니다.
+        aiohttp.ClientError: 재시도한 뒤에도 연결에 실패한 경우 발생합니다.
+
+        Returns
+        -------
+        AsyncResponse: request의 결과, 재시도한 뒤에도 오류 응답이라면 마지막 응답
+        '''
+
+        cache = cache and self.requestManager.cache is not None
+
+        if cache:
+            cached = await self.cached(url, method)
+
+            if cached is not None:
+                return cached
+
+        return await self._send_and_store(url, headers, method, cache, **kwargs)
+
+
+    async def cached(self, url: str, method: str="GET") -> AsyncResponse | None:
+        '''
+        RequestManager의 캐시에 저장된 응답을 AsyncResponse로 반환합니다. 저장된 응답이 없다면 None입니다.
+        캐시 조회(SQLite 파일 읽기, 스레드 풀과 공유하는 잠금)는 이벤트 루프를 막지 않도록 별도 스레드에서 수행합니다.
+        '''
+
+        cache, metrics = self.requestManager.cache, self.requestManager.metrics
+
+        if cache is None:
+            return None
+
+        hit = await asyncio.to_thread(cache.get, url, method)
+
+        if hit is None:
+            metrics.count("http_cache_misses_total")
+            return None
+
+        (status, headers, content), tier = hit
+        metrics.count("http_cache_hits_total", tier=str(tier))
+
+        return AsyncResponse(url, status, "OK", headers, content)
+
+
+    async def _send_and_store(self, url: str, headers: dict, method: str, cache: bool, **kwargs) -> AsyncResponse:
+        response = await self._send_with_retry(url, headers, method, **kwargs)
+
+        if not cache:
+            return response
+
+        # 캐시 저장(SQLite 파일 쓰기)도 별도 스레드에서 수행
+        stored = await asyncio.to_thread(self.requestManager.cache.put, url, response.status_code, response.headers, response.content, method)
+
+        if stored:
+            self.requestManager.metrics.count("http_cache_stores_total")
+
+        return response
+
+
+    async def _send_with_retry(self, url: str, headers: dict, method: str, **kwargs) -> AsyncResponse:
+        # 재시도 정책과 상태는 RequestManager와 공유
+        policy = self.requestManager.retry_policy
+        metrics = self.requestManager.metrics
+        source = policy.source(url)
+        retryable = policy.retryable(method, headers)
+
+        policy.budget(source).deposit()
+        attempt, error = 0, None
+
+        while True:
+            policy.admit(source, metrics, error)
+
+            try:
+                response = await self._send_once(url, headers, method, **kwargs)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay, error = policy.decide(source, attempt, retryable, error=e, metrics=metrics), e
+
+                if delay is None:
+                    raise
+
+            else:
+                delay = policy.decide(source, attempt, retryable, response.status_code, response.headers.get("Retry-After"), metrics=metrics)
+
+                if delay is None:
+                    return response
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+    async def _send_once(self, url: str, headers: dict, method: str, **kwargs) -> AsyncResponse:
+        waited = await self.rate_limiter.acquire_async(url, method)
+
+        start = perf_counter()
+        async with self.session(url).request(method, url, headers=headers, **kwargs) as response:
+            content = await response.read()
+            result = AsyncResponse(url, response.status, response.reason or "", response.headers, content)
+        elapsed = perf_counter() - start
+
+        self.rate_limiter.update(url, result.status_code, result.headers, method)
+
+        if self.requestManager.metrics.enabled:
+            self.requestManager._record(url, method, result.status_code, elapsed, waited, len(content))
+
+        return result
+
+
+    async def delayed_get(
+            self,
+            url: str,
+            headers: dict,
+            sleep_time: int|float=0,
+            random_range: int=0,
+            _raise_on_error: bool=True,
+            cache: bool=False,
+            ) -> AsyncResponse:
+        '''
+        RequestManager.delayed_get의 asyncio 버전입니다. 기다리는 동안 이벤트 루프를 멈추지 않습니다.
+
+        Parameters
+        ----------
+        url: str, 요청을 보낼 URL
+        headers: dict, 요청을 보낼 떄 사용할 header
+        sleep_time: int|float=0, 추가 딜레이 시간
+        random_range: int=0, sleep_time에 추가할 임의 시간의 범위
+        cache: bool=False, send()의 cache와 같습니다. 캐시된 응답이 있다면 딜레이 없이 바로 반환합니다.
+
+        Returns
+        -------
+        AsyncResponse: get request의 결과
+        '''
+
+        # 잘못된 범위의 값이 들어온 경우
+        if sleep_time < 0 or random_range < 0:
+            raise ValueError("sleep time, random_range must be 0 or upper.")
+
+        cache = cache and self.requestManager.cache is not None
+        response = await self.cached(url) if cache else None
+
+        if response is None:
+            if sleep_time > 0 or random_range > 0:
+                delay = sleep_time + random() * random_range
+                await asyncio.sleep(delay)
+                self.requestManager.metrics.count("sleep_seconds_total", delay, reason="delay")
+
+            response = await self._send_and_store(url, headers, "GET", cache)
+
+        if response.status_code != 200 and _raise_on_error:
+            raise RuntimeError((
+                "server responsed with error code: "
+                f"{response.status_code}, "
+                f"reason is: {response.reason}"
+            ))
+
+        return response
+
+
+    async def get(self, url: str, headers: dict, _raise_on_error: bool=True, **kwargs) -> AsyncResponse:
+        response = await self.send(url, headers=headers, **kwargs)
+
+        if response.status_code != 200 and _raise_on_error:
+            raise RuntimeError((
+                "server responsed with error code: "
+                f"{response.status_code}, "
+                f"reason is: {response.reason}"
+            ))
+
+        return response
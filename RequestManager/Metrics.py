@@ -0,0 +1,436 @@
+from typing import Dict, Iterator, List, Literal, Tuple
+
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from threading import Event, Lock, Thread
+from time import perf_counter
+
+import io
+import json
+import logging
+import os
+
+
+# 지연 시간 히스토그램의 기본 구간(초), Prometheus client의 기본값에 1ms 미만 구간을 더함
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 꺼져 있을 때 timer()가 돌려주는 아무 일도 하지 않는 context manager
+NULL_TIMER = nullcontext()
+
+
+class Histogram():
+    '''
+    관측값의 개수, 합, 최솟값, 최댓값과 구간별 개수를 기록합니다.
+    '''
+
+
+    def __init__(self, buckets: Tuple[float, ...]=DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        '''
+        (구간 상한, 상한 이하인 관측값 수)의 목록을 반환합니다. 마지막 구간은 "+Inf"입니다.
+        '''
+
+        result, total = [], 0
+
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+
+class _Timer():
+    # 켜져 있을 때 timer()가 돌려주는 context manager
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, str]) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.name, perf_counter() - self.start, **self.labels)
+
+
+class Metrics():
+    '''
+    단계별 카운터와 지연 시간 히스토그램을 모으는 계측기입니다.
+
+    RequestManager(요청 수, 응답 바이트, 지연 시간, 요청 제한/딜레이/재시도로 기다린 시간, 재시도, 회로 차단), DataFetcher(JSON 변환 시간, 변환한 캔들 수),
+    MAL_model(이동 평균, 신호 계산 시간)이 Metrics.shared()에 기록합니다.
+    기본적으로 꺼져 있으며, 꺼져 있을 때 각 기록 지점의 비용은 enabled 속성 확인 한 번입니다.
+    환경 변수 BTEM_METRICS=1로 실행하면 shared()가 켜진 상태로 만들어집니다.
+
+    모은 값은 snapshot()으로 읽거나, 등록한 sink들(LoggingSink, JSONLinesSink, PrometheusSink)로 내보냅니다.
+
+
+    예제
+    ----
+
+    >> metrics = Metrics.shared()
+    >> metrics.enable()
+    >> metrics.sinks.append(PrometheusSink("./metrics.prom"))
+    >> with metrics.profile("./backfill.prof"):
+    ...     dataFetcher.backfill(duration, "./data/backfill")
+    >> metrics.export()
+    >> print(metrics.prometheus())
+    '''
+
+    _shared: "Metrics | None" = None
+    _shared_lock = Lock()
+
+
+    def __init__(self, enabled: bool=False, prefix: str="btem_") -> None:
+        '''
+        Args
+        ----
+        enabled: bool=False, 기록 여부
+        prefix: str="btem_", Prometheus 형식으로 내보낼 때 이름 앞에 붙일 문자열
+        '''
+
+        self.enabled = enabled
+        self.prefix = prefix
+        self.sinks: List = []
+
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = dict()
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = dict()
+        self._lock = Lock()
+
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+
+    @classmethod
+    def shared(cls) -> "Metrics":
+        '''
+        프로세스 전체에서 공유하는 Metrics를 반환합니다.
+        '''
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(enabled=os.environ.get("BTEM_METRICS", "") == "1")
+
+            return cls._shared
+
+
+    def enable(self) -> None:
+        self.enabled = True
+
+
+    def disable(self) -> None:
+        self.enabled = False
+
+
+    def count(self, name: str, value: float=1, **labels: str) -> None:
+        '''
+        카운터 name에 value를 더합니다.
+        '''
+
+        if not self.enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        '''
+        히스토그램 name에 값(주로 초 단위 시간)을 기록합니다.
+        '''
+
+        if not self.enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+
+            histogram.observe(value)
+
+
+    def timer(self, name: str, **labels: str):
+        '''
+        with 블록의 실행 시간을 히스토그램 name에 기록하는 context manager를 반환합니다.
+
+        >> with metrics.timer("json_decode_seconds", source="coinapi"):
+        ...     data = response.json()
+        '''
+
+        if not self.enabled:
+            return NULL_TIMER
+
+        return _Timer(self, name, labels)
+
+
+    def reset(self) -> None:
+        '''
+        모은 값을 모두 지웁니다.
+        '''
+
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+    def snapshot(self) -> Dict:
+        '''
+        현재까지 모은 값을 JSON으로 바꿀 수 있는 dict로 반환합니다.
+        '''
+
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "min": histogram.min,
+                    "max": histogram.max,
+                    "buckets": dict(histogram.cumulative()),
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ]
+
+        return {"time": datetime.now(timezone.utc).isoformat(), "counters": counters, "histograms": histograms}
+
+
+    def prometheus(self) -> str:
+        '''
+        모은 값을 Prometheus text exposition 형식으로 반환합니다.
+        '''
+
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for counter in snapshot["counters"]:
+            name = self.prefix + counter["name"]
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+
+        for histogram in snapshot["histograms"]:
+            name = self.prefix + histogram["name"]
+            header(name, "histogram")
+
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels({**histogram['labels'], 'le': bound})} {count}")
+
+            lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+    def export(self) -> None:
+        '''
+        snapshot()을 등록된 모든 sink로 내보냅니다.
+        '''
+
+        snapshot = self.snapshot()
+
+        for sink in self.sinks:
+            sink.write(self, snapshot)
+
+
+    def start(self, interval: float=10.0) -> None:
+        '''
+        interval초마다 export()를 호출하는 백그라운드 스레드를 시작합니다.
+        '''
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = Thread(target=self._export_loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        '''
+        백그라운드 내보내기를 멈추고 마지막으로 한 번 더 내보냅니다.
+        '''
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.export()
+
+
+    def _export_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.export()
+            except Exception:
+                logging.getLogger(__name__).exception("failed to export metrics")
+
+
+    @contextmanager
+    def profile(self, path: str | None=None, engine: Literal["cprofile", "pyinstrument"]="cprofile", sort: str="cumulative") -> Iterator[object]:
+        '''
+        with 블록을 프로파일링합니다. Metrics가 꺼져 있어도 동작합니다.
+
+        Args
+        ----
+        path: str | None=None, 결과를 저장할 경로, None인 경우 상위 30개 함수(pyinstrument는 호출 트리)를 logging으로 출력합니다.
+            - cprofile: pstats 파일(python -m pstats, snakeviz 등으로 열 수 있음)
+            - pyinstrument: .html이면 HTML, 그 외에는 텍스트
+        engine: Literal["cprofile", "pyinstrument"]="cprofile", 프로파일러, pyinstrument는 설치되어 있어야 합니다.
+        sort: str="cumulative", cprofile 결과를 출력할 때의 정렬 기준
+
+        Raises
+        ------
+        ValueError: engine이 올바르지 않은 경우 발생합니다.
+        ImportError: engine="pyinstrument"인데 pyinstrument가 설치되어 있지 않은 경우 발생합니다.
+        '''
+
+        logger = logging.getLogger(__name__)
+
+        if engine == "cprofile":
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+            try:
+                yield profiler
+            finally:
+                profiler.disable()
+
+                if path is not None:
+                    profiler.dump_stats(path)
+                else:
+                    stream = io.StringIO()
+                    pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(30)
+                    logger.info(stream.getvalue())
+
+        elif engine == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError('engine="pyinstrument" needs pyinstrument, install it with `pip install pyinstrument`.')
+
+            profiler = Profiler()
+            profiler.start()
+
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+
+                if path is None:
+                    logger.info(profiler.output_text())
+                else:
+                    with open(path, "w", encoding="utf8") as f:
+                        f.write(profiler.output_html() if path.endswith(".html") else profiler.output_text())
+
+        else:
+            raise ValueError(f'engine must be "cprofile" or "pyinstrument". input is {engine}')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if len(labels) == 0:
+        return ""
+
+    escaped = (
+        f'{key}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class LoggingSink():
+    '''
+    카운터와 히스토그램 요약(개수, 평균, 최대)을 logging으로 내보냅니다.
+    '''
+
+
+    def __init__(self, logger: logging.Logger | None=None, level: int=logging.INFO) -> None:
+        self.logger = logging.getLogger("btem.metrics") if logger is None else logger
+        self.level = level
+
+
+    def write(self, metrics: Metrics, snapshot: Dict) -> None:
+        for counter in snapshot["counters"]:
+            self.logger.log(self.level, "%s%s %s", counter["name"], _format_labels(counter["labels"]), counter["value"])
+
+        for histogram in snapshot["histograms"]:
+            self.logger.log(
+                self.level, "%s%s count=%d mean=%.6f max=%.6f",
+                histogram["name"], _format_labels(histogram["labels"]),
+                histogram["count"], histogram["sum"] / max(histogram["count"], 1), histogram["max"],
+            )
+
+
+class JSONLinesSink():
+    '''
+    snapshot을 파일에 한 줄씩 JSON으로 덧붙입니다.
+    '''
+
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+
+    def write(self, metrics: Metrics, snapshot: Dict) -> None:
+        with open(self.path, "a", encoding="utf8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+
+class PrometheusSink():
+    '''
+    Prometheus text 형식으로 파일에 씁니다. node_exporter의 textfile collector가 읽을 수 있도록 임시 파일에 쓴 뒤 교체합니다.
+    '''
+
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+
+    def write(self, metrics: Metrics, snapshot: Dict) -> None:
+        with open(self.path + ".tmp", "w", encoding="utf8") as f:
+            f.write(metrics.prometheus())
+
+        os.replace(self.path + ".tmp", self.path)
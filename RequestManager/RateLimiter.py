@@ -0,0 +1,329 @@
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Tuple
+
+import urllib.parse as url_parser
+
+import asyncio
+from threading import Lock
+from time import monotonic, sleep
+
+
+# 문서화된 요청 제한(초당 요청 수)
+# upbit: 그룹 단위 제한, Remaining-Req 헤더의 group 값과 같은 이름을 사용합니다.
+# coinapi: 초당 제한은 공개되어 있지 않으므로 보수적으로 시작하고, X-RateLimit-* 헤더로 보정합니다.
+RATE_LIMITS: Dict[Tuple[str, str], float] = {
+    ("upbit", "default"): 30,
+    ("upbit", "order"): 8,
+    ("upbit", "market"): 10,
+    ("upbit", "candles"): 10,
+    ("upbit", "ticker"): 10,
+    ("upbit", "trades"): 10,
+    ("upbit", "orderbook"): 10,
+    ("coinapi", "default"): 10,
+}
+
+HOST_SOURCES: Dict[str, str] = {
+    "api.upbit.com": "upbit",
+    "rest.coinapi.io": "coinapi",
+}
+
+# (경로 접두사, 그룹), 앞에서부터 먼저 일치하는 그룹을 사용합니다.
+UPBIT_PATH_GROUPS: Tuple[Tuple[str, str], ...] = (
+    ("v1/market", "market"),
+    ("v1/candles", "candles"),
+    ("v1/ticker", "ticker"),
+    ("v1/trades", "trades"),
+    ("v1/orderbook", "orderbook"),
+)
+
+
+class TokenBucket():
+    '''
+    초당 rate개의 토큰이 채워지고 최대 capacity개까지 쌓이는 토큰 버킷입니다.
+
+    reserve()는 토큰을 미리 차감하고 기다려야 할 시간만 돌려주므로,
+    여러 스레드와 코루틴이 같은 버킷을 공유해도 요청 순서대로 간격이 벌어집니다.
+    '''
+
+
+    def __init__(self, rate: float, capacity: float | None=None, min_rate: float | None=None) -> None:
+        '''
+        Args
+        ----
+        rate: float, 초당 채워지는 토큰 수
+        capacity: float | None=None, 버킷의 최대 토큰 수, None인 경우 rate와 같습니다.
+        min_rate: float | None=None, 429 응답으로 속도를 줄일 때의 하한, None인 경우 rate의 1/10입니다.
+
+        Raises
+        ------
+        ValueError: rate 또는 capacity가 0 이하인 경우 발생합니다.
+        '''
+
+        capacity = rate if capacity is None else capacity
+
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate, capacity must over 0.")
+
+        self.nominal_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = self.nominal_rate / 10 if min_rate is None else float(min_rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.blocked_until = 0.0
+        self.updated_at = monotonic()
+        self._lock = Lock()
+
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+    def reserve(self, tokens: float=1.0) -> float:
+        '''
+        토큰을 차감하고, 요청을 보내기 전까지 기다려야 하는 시간(초)을 반환합니다.
+        '''
+
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            self.tokens -= tokens
+
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+
+    def set_remaining(self, remaining: float, reset_after: float=1.0) -> None:
+        '''
+        서버가 알려준 남은 요청 수로 토큰 수를 낮춥니다.
+        남은 요청이 없다면 reset_after초 동안 요청을 막습니다.
+        '''
+
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, float(remaining))
+
+            if remaining <= 0:
+                self.blocked_until = max(self.blocked_until, now + reset_after)
+
+
+    def backoff(self, retry_after: float | None=None) -> None:
+        '''
+        429 응답을 받았을 때 속도를 절반으로 줄이고 쌓인 토큰을 비웁니다.
+        '''
+
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+            delay = 1 / self.rate if retry_after is None else retry_after
+            self.blocked_until = max(self.blocked_until, now + delay)
+
+
+    def recover(self, step: float=0.05) -> None:
+        '''
+        정상 응답을 받을 때마다 원래 속도의 step 비율만큼 속도를 되돌립니다.
+        '''
+
+        if self.rate >= self.nominal_rate:
+            return
+
+        with self._lock:
+            self.rate = min(self.nominal_rate, self.rate + self.nominal_rate * step)
+
+
+class RateLimiter():
+    '''
+    API 소스/그룹별 토큰 버킷을 관리하는 요청 제한기입니다.
+
+    문서화된 제한(RATE_LIMITS)으로 시작하여, 응답 헤더(upbit의 Remaining-Req, coinapi의 X-RateLimit-*)와
+    429 응답에 맞춰 속도를 조절합니다. 스레드와 asyncio 양쪽에서 하나의 인스턴스를 공유할 수 있습니다.
+
+
+    예제
+    ----
+
+    >> limiter = RateLimiter.shared()
+    >> limiter.acquire(url)
+    >> response = session.get(url)
+    >> limiter.update(url, response.status_code, response.headers)
+    '''
+
+    _shared: "RateLimiter | None" = None
+    _shared_lock = Lock()
+
+
+    def __init__(self, limits: Mapping[Tuple[str, str], float] | None=None) -> None:
+        '''
+        Args
+        ----
+        limits: Mapping[Tuple[str, str], float] | None=None, (source, group)별 초당 요청 수, None인 경우 RATE_LIMITS를 사용합니다.
+        '''
+
+        self.limits = dict(RATE_LIMITS if limits is None else limits)
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {key: TokenBucket(rate) for key, rate in self.limits.items()}
+        self._lock = Lock()
+
+
+    @classmethod
+    def shared(cls) -> "RateLimiter":
+        '''
+        프로세스 전체에서 공유하는 RateLimiter를 반환합니다.
+        요청 제한은 IP/계정 단위이므로, 별도로 지정하지 않은 RequestManager는 모두 이 인스턴스를 사용합니다.
+        '''
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+
+    def resolve(self, url: str, method: str="GET") -> Tuple[str, str] | None:
+        '''
+        url과 HTTP 메서드로부터 (source, group)을 구합니다. 제한 대상이 아닌 호스트라면 None을 반환합니다.
+        '''
+
+        parsed = url_parser.urlparse(url)
+        source = HOST_SOURCES.get(parsed.netloc)
+
+        if source is None:
+            return None
+
+        group = "default"
+
+        if source == "upbit":
+            path = parsed.path.lstrip("/")
+
+            if method.upper() in ("POST", "DELETE") and path.startswith("v1/order"):
+                group = "order"
+
+            else:
+                for prefix, path_group in UPBIT_PATH_GROUPS:
+                    if path.startswith(prefix):
+                        group = path_group
+                        break
+
+        return (source, group)
+
+
+    def bucket(self, key: Tuple[str, str]) -> TokenBucket:
+        '''
+        (source, group)에 해당하는 버킷을 반환합니다. 처음 보는 그룹이라면 해당 source의 default 제한으로 만듭니다.
+        '''
+
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            with self._lock:
+                bucket = self.buckets.get(key)
+
+                if bucket is None:
+                    rate = self.limits.get(key, self.limits.get((key[0], "default"), 10))
+                    bucket = TokenBucket(rate)
+                    self.buckets[key] = bucket
+
+        return bucket
+
+
+    def reserve(self, url: str, method: str="GET", cost: float=1.0) -> float:
+        '''
+        요청 하나에 대한 토큰을 차감하고 기다려야 하는 시간(초)을 반환합니다.
+        '''
+
+        key = self.resolve(url, method)
+
+        if key is None:
+            return 0.0
+
+        return self.bucket(key).reserve(cost)
+
+
+    def acquire(self, url: str, method: str="GET", cost: float=1.0) -> float:
+        '''
+        요청을 보내도 될 때까지 현재 스레드를 멈춥니다. 기다린 시간(초)을 반환합니다.
+        '''
+
+        wait = self.reserve(url, method, cost)
+
+        if wait > 0:
+            sleep(wait)
+
+        return wait
+
+
+    async def acquire_async(self, url: str, method: str="GET", cost: float=1.0) -> float:
+        '''
+        acquire()의 asyncio 버전입니다. 이벤트 루프를 멈추지 않고 기다립니다.
+        '''
+
+        wait = self.reserve(url, method, cost)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait
+
+
+    def update(self, url: str, status_code: int, headers: Mapping[str, str], method: str="GET") -> None:
+        '''
+        응답 상태 코드와 헤더를 반영하여 버킷 상태를 갱신합니다.
+
+        Args
+        ----
+        url: str, 요청을 보낸 URL
+        status_code: int, 응답 상태 코드
+        headers: Mapping[str, str], 응답 헤더
+        method: str="GET", 요청의 HTTP 메서드
+        '''
+
+        key = self.resolve(url, method)
+
+        if key is None:
+            return
+
+        source = key[0]
+
+        # upbit: "Remaining-Req: group=default; min=1800; sec=29"
+        remaining_req = headers.get("Remaining-Req")
+
+        if source == "upbit" and remaining_req:
+            fields = dict(
+                field.strip().split("=", 1) for field in remaining_req.split(";") if "=" in field
+            )
+
+            if "group" in fields:
+                key = (source, fields["group"])
+
+            if "sec" in fields:
+                self.bucket(key).set_remaining(float(fields["sec"]))
+
+        # coinapi: X-RateLimit-Remaining, X-RateLimit-Reset(ISO 8601)
+        remaining = headers.get("X-RateLimit-Remaining")
+
+        if source == "coinapi" and remaining is not None:
+            self.bucket(key).set_remaining(float(remaining), self._seconds_until(headers.get("X-RateLimit-Reset")))
+
+        # 요청 제한에 걸린 경우 속도를 줄이고, 정상 응답이면 서서히 원래 속도로 되돌림
+        if status_code == 429:
+            retry_after = headers.get("Retry-After")
+            self.bucket(key).backoff(float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+        elif status_code < 400:
+            self.bucket(key).recover()
+
+
+    @staticmethod
+    def _seconds_until(reset: str | None) -> float:
+        if not reset:
+            return 1.0
+
+        try:
+            reset_dt = datetime.strptime(reset.split('.')[0].rstrip("Z"), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return 1.0
+
+        return max(0.0, (reset_dt - datetime.now(timezone.utc)).total_seconds())
@@ -1,42 +1,164 @@
 from collections import namedtuple
-from typing import Iterable, Literal
+from typing import Dict, Iterable, Literal
 
 import urllib.parse as url_parser
 from urllib.parse import urlencode, unquote
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from random import random
-from time import sleep
+from time import perf_counter, sleep
+from threading import Lock
 
 import json
-from jwt import jwk, JWT
 
-import hashlib
+from .Metrics import Metrics
+from .RateLimiter import RateLimiter
+from .ResponseCache import ResponseCache
+from .RetryPolicy import RetryPolicy
+from .JWTSigner import JWTSigner
 
 class RequestManager():
-    def __init__(self):
+    def __init__(
+            self,
+            pool_connections: int=4,
+            pool_maxsize: int=16,
+            keep_alive: bool=True,
+            key_path: str="./keys.json",
+            rate_limiter: RateLimiter | None=None,
+            base_urls: Dict[str, str] | None=None,
+            metrics: Metrics | None=None,
+            retry_policy: RetryPolicy | None=None,
+            cache: ResponseCache | None=None,
+            ):
+        '''
+        RequestManager 인스턴스를 생성합니다.
+
+        호스트(api.upbit.com, rest.coinapi.io 등)마다 requests.Session을 하나씩 두고 재사용하므로,
+        같은 호스트로 가는 요청은 TCP/TLS 연결을 다시 맺지 않습니다.
+
+        Args
+        ----
+        pool_connections: int=4, 세션이 캐시할 연결 풀의 개수
+        pool_maxsize: int=16, 연결 풀 하나가 유지할 최대 연결 수(동시 요청 수)
+        keep_alive: bool=True, False인 경우 매 요청마다 연결을 닫습니다.
+        key_path: str="./keys.json", API KEY 파일의 경로
+        rate_limiter: RateLimiter | None=None, 요청 제한기, None인 경우 프로세스 전체에서 공유하는 RateLimiter.shared()를 사용합니다.
+        base_urls: Dict[str, str] | None=None, source별 API 주소를 바꿀 때 지정합니다. e.g. {"coinapi": "http://127.0.0.1:8080"}
+        metrics: Metrics | None=None, 요청 수, 응답 바이트, 지연 시간, 기다린 시간을 기록할 계측기, None인 경우 Metrics.shared()를 사용합니다.
+        retry_policy: RetryPolicy | None=None, 재시도/회로 차단 정책, None인 경우 프로세스 전체에서 공유하는 RetryPolicy.shared()를 사용합니다.
+        cache: ResponseCache | None=None, cache=True로 보낸 요청의 응답 캐시, None인 경우 캐시하지 않습니다.
+
+        Raises
+        ------
+        ValueError: 연결 풀 크기가 1보다 작은 경우 발생합니다.
+        FileNotFoundError: API KEY 파일을 찾을 수 없는 경우 발생합니다.
+        '''
+
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise ValueError("pool_connections, pool_maxsize must be 1 or upper.")
+
         self.UrlComponents = namedtuple(typename="UrlComponents", field_names=["scheme", "netloc", "url", "params", "query", "fragment"])
 
+        # 호스트별 세션
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.__sessions: Dict[str, requests.Session] = dict()
+        self.__sessions_lock = Lock()
+
+        # source별 API 주소(scheme, netloc)
+        self.base_urls = {
+            source: url_parser.urlparse(url)[:2]
+            for source, url in {"upbit": "https://api.upbit.com", "coinapi": "https://rest.coinapi.io", **(base_urls or {})}.items()
+        }
+
+        # 요청 제한
+        self.rate_limiter = RateLimiter.shared() if rate_limiter is None else rate_limiter
+
+        # 계측
+        self.metrics = Metrics.shared() if metrics is None else metrics
+
+        # 재시도, 회로 차단
+        self.retry_policy = RetryPolicy.shared() if retry_policy is None else retry_policy
+
+        # 응답 캐시
+        self.cache = cache
+
         # API KEY
         file = None
         try:
-            file = open("./keys.json")
+            file = open(key_path)
             keys = json.load(file)
 
-            self.__upbit_access = keys["upbit_access"]
-            self.__upbit_secret = keys["upbit_secret"].encode("utf-8")
-            self.__upbit_jwt = jwk.OctetJWK(key=self.__upbit_secret)
+            # 서명기는 한 번만 만들어 두고 모든 upbit 요청에 재사용
+            self.__upbit_signer = JWTSigner(keys["upbit_access"], keys["upbit_secret"])
 
             self.__coinapi_access = keys["coinapi_access"]
             file.close()
 
         except FileNotFoundError:
-            raise FileNotFoundError("Error: api key file ./keys.json not found.")
+            raise FileNotFoundError(f"Error: api key file {key_path} not found.")
         except Exception as e:
             if file is not None:
                 file.close()
             print(e)
 
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def close(self) -> None:
+        '''
+        열려 있는 모든 호스트별 세션과 연결 풀을 닫습니다.
+        닫은 뒤에 요청을 보내면 세션이 새로 만들어집니다.
+        '''
+
+        with self.__sessions_lock:
+            sessions = list(self.__sessions.values())
+            self.__sessions.clear()
+
+        for session in sessions:
+            session.close()
+
+
+    def session(self, url: str) -> requests.Session:
+        '''
+        url의 호스트에 해당하는 세션을 반환합니다. 세션이 없다면 새로 만듭니다.
+
+        Args
+        ----
+        url: str, 요청을 보낼 URL
+
+        Returns
+        -------
+        requests.Session: 해당 호스트의 연결 풀을 가진 세션
+        '''
+
+        parsed = url_parser.urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+
+        with self.__sessions_lock:
+            session = self.__sessions.get(host)
+
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount(host, adapter)
+
+                if not self.keep_alive:
+                    session.headers["Connection"] = "close"
+
+                self.__sessions[host] = session
+
+        return session
+
     
     def generate_url(self, source: Literal["upbit", "coinapi"], api_url: str, query: dict | None=None):
         """
@@ -68,21 +190,18 @@ class RequestManager():
             생성된 URL 문자열    
         """
 
-        URL_SOURCES = {
-            "upbit": "api.upbit.com",
-            "coinapi": "rest.coinapi.io",
-        }
-
         # 파라미터 검증
-        if source not in URL_SOURCES.keys():
+        if source not in self.base_urls.keys():
             raise ValueError(f'source must be "upbit" or "coinapi". input is {source}')
         
         query_ = "" if query is None else url_parser.urlencode(query)
 
 
+        scheme, netloc = self.base_urls[source]
+
         url_params = self.UrlComponents(
-            scheme = "https",
-            netloc = URL_SOURCES[source],
+            scheme = scheme,
+            netloc = netloc,
             url = api_url,
             params = "",
             query = query_,
@@ -93,7 +212,7 @@ class RequestManager():
         return result_url
     
 
-    def generate_header(self, source: Literal["upbit", "coinapi"], payload: dict|None=None):
+    def generate_header(self, source: Literal["upbit", "coinapi"], payload: dict|None=None, query: dict|None=None):
         """
         API 호출을 위한 header를 생성하는 메서드입니다.
 
@@ -106,6 +225,10 @@ class RequestManager():
 
         payload: dict|None=None
             헤더에 탑재할 추가 파라미터를 지정합니다.
+            upbit의 경우 nonce가 없다면 새로 만들어 추가합니다.
+
+        query: dict|None=None
+            upbit 요청 파라미터를 지정합니다. 지정된 경우 query_hash를 함께 탑재합니다.
              
         Returns
         -------
@@ -113,21 +236,10 @@ class RequestManager():
             요청 정보가 담겨 있는 dictionary입니다.
         """
 
-
         header = {}
-        payload_ = dict()
-
-        if payload is not None:
-            for key in payload.keys():
-                payload_[key] = payload[key]
 
         if source == "upbit":
-            payload_["access_key"] = self.__upbit_access
-
-            jwt_token = JWT().encode(payload_, key=self.__upbit_jwt)
-
-            authorization = 'Bearer {}'.format(jwt_token)
-            header = { 'Authorization': authorization }
+            header = self.__upbit_signer.header(payload, query=query)
 
         elif source == "coinapi":
             header = {'X-CoinAPI-Key' : self.__coinapi_access}
@@ -135,23 +247,160 @@ class RequestManager():
         return header
 
 
+    def send(self, url: str, headers: dict, method: str="GET", cache: bool=False, **kwargs) -> requests.Response:
+        '''
+        요청 제한기가 허용할 때까지 기다린 뒤 요청을 보내고, 응답 헤더를 요청 제한기에 반영합니다.
+        연결 실패, 시간 초과, 429, 5xx 응답은 retry_policy에 따라 기다렸다가 다시 보냅니다(GET 등 안전한 요청만).
+
+        Parameters
+        ----------
+        url: str, 요청을 보낼 URL
+        headers: dict, 요청을 보낼 떄 사용할 header
+        method: str="GET", HTTP 메서드
+        cache: bool=False, True인 경우 self.cache에 저장된 응답이 있다면 요청을 보내지 않고 돌려주며, 받은 200 응답을 저장합니다.
+            응답이 다시 요청해도 바뀌지 않는 경우(e.g. 끝난 과거 구간의 캔들)에만 지정해야 합니다.
+        **kwargs: requests.Session.request에 그대로 전달할 인자
+
+        Raises
+        ------
+        CircuitOpenError: 해당 source의 회로 차단기가 열려 있는 경우 발생합니다.
+        requests.RequestException: 재시도한 뒤에도 연결에 실패한 경우 발생합니다.
+
+        Returns
+        -------
+        requests.Response: request의 결과, 재시도한 뒤에도 오류 응답이라면 마지막 응답
+        '''
+
+        cache = cache and self.cache is not None and not kwargs.get("stream")
+
+        if cache:
+            cached = self.cached(url, method)
+
+            if cached is not None:
+                return cached
+
+        return self._send_and_store(url, headers, method, cache, **kwargs)
+
+
+    def _send_and_store(self, url: str, headers: dict, method: str, cache: bool, **kwargs) -> requests.Response:
+        response = self._send_with_retry(url, headers, method, **kwargs)
+
+        if cache and self.cache.put(url, response.status_code, response.headers, response.content, method):
+            self.metrics.count("http_cache_stores_total")
+
+        return response
+
+
+    def cached(self, url: str, method: str="GET") -> requests.Response | None:
+        '''
+        self.cache에 저장된 응답을 requests.Response로 반환합니다. 캐시가 없거나 저장된 응답이 없다면 None입니다.
+        '''
+
+        if self.cache is None:
+            return None
+
+        hit = self.cache.get(url, method)
+
+        if hit is None:
+            self.metrics.count("http_cache_misses_total")
+            return None
+
+        (status, headers, content), tier = hit
+        self.metrics.count("http_cache_hits_total", tier=str(tier))
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = url
+
+        return response
+
+
+    def _send_with_retry(self, url: str, headers: dict, method: str, **kwargs) -> requests.Response:
+        # 재시도 여부와 대기 시간은 RetryPolicy가 정하며, AsyncRequestManager도 같은 방식으로 사용
+        policy = self.retry_policy
+        source = policy.source(url)
+        retryable = policy.retryable(method, headers)
+
+        policy.budget(source).deposit()
+        attempt, error = 0, None
+
+        while True:
+            policy.admit(source, self.metrics, error)
+
+            try:
+                response = self._send_once(url, headers, method, **kwargs)
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay, error = policy.decide(source, attempt, retryable, error=e, metrics=self.metrics), e
+
+                if delay is None:
+                    raise
+
+            else:
+                delay = policy.decide(source, attempt, retryable, response.status_code, response.headers.get("Retry-After"), metrics=self.metrics)
+
+                if delay is None:
+                    return response
+
+                response.close()
+
+            attempt += 1
+            sleep(delay)
+
+
+    def _send_once(self, url: str, headers: dict, method: str, **kwargs) -> requests.Response:
+        waited = self.rate_limiter.acquire(url, method)
+
+        start = perf_counter()
+        response = self.session(url).request(method, url, headers=headers, **kwargs)
+        elapsed = perf_counter() - start
+
+        self.rate_limiter.update(url, response.status_code, response.headers, method)
+
+        if self.metrics.enabled:
+            self._record(url, method, response.status_code, elapsed, waited, None if kwargs.get("stream") else len(response.content))
+
+        return response
+
+
+    def _record(self, url: str, method: str, status: int, elapsed: float, waited: float, size: int | None) -> None:
+        # 요청 하나에 대한 계측 값 기록, RequestManager와 AsyncRequestManager가 함께 사용
+        host = url_parser.urlparse(url).netloc
+
+        self.metrics.count("http_requests_total", host=host, method=method, status=str(status))
+        self.metrics.observe("http_request_seconds", elapsed, host=host)
+
+        if size is not None:
+            self.metrics.count("http_response_bytes_total", size, host=host)
+
+        if waited > 0:
+            self.metrics.count("sleep_seconds_total", waited, reason="rate_limit")
+
+
     def delayed_get(
             self,
             url: str,
             headers: dict,
-            sleep_time: int|float=0.1,
-            random_range: int=1,
+            sleep_time: int|float=0,
+            random_range: int=0,
             _raise_on_error: bool=True,
+            cache: bool=False,
             ) -> requests.Response:
         '''
-        서버의 과부하와 이용 차단을 막기 위해, (지정된 시간 + 임의 시간)동안 딜레이하여 get 요청을 보냅니다.
+        서버의 과부하와 이용 차단을 막기 위해, 요청 제한기(RateLimiter)가 허용하는 속도로 get 요청을 보냅니다.
+        sleep_time, random_range가 지정된 경우 (지정된 시간 + 임의 시간)만큼 추가로 딜레이합니다.
 
         Parameters
         ----------
         url: str, 요청을 보낼 URL
         headers: dict, 요청을 보낼 떄 사용할 header
-        sleep_time: int|float=0.1, 최소 딜레이 시간
-        random_range: int=1, sleep_time에 추가할 임의 시간의 범위
+        sleep_time: int|float=0, 추가 딜레이 시간
+        random_range: int=0, sleep_time에 추가할 임의 시간의 범위
+        cache: bool=False, send()의 cache와 같습니다. 캐시된 응답이 있다면 딜레이 없이 바로 반환합니다.
 
         Returns
         -------
@@ -162,13 +411,16 @@ class RequestManager():
         if sleep_time < 0 or random_range < 0:
             raise ValueError("sleep time, random_range must be 0 or upper.")
 
-        # 딜레이 시간이 지정되지 않은 경우        
-        if sleep_time == 0 and random_range == 0:
-            print("warning: request will sent with no delay time.")
+        cache = cache and self.cache is not None
+        response = self.cached(url) if cache else None
 
-        sleep(sleep_time + random() * random_range)
+        if response is None:
+            if sleep_time > 0 or random_range > 0:
+                delay = sleep_time + random() * random_range
+                sleep(delay)
+                self.metrics.count("sleep_seconds_total", delay, reason="delay")
 
-        response = requests.get(url, headers=headers)
+            response = self._send_and_store(url, headers, "GET", cache)
 
         if response.status_code != 200 and _raise_on_error:
             raise RuntimeError((
@@ -180,8 +432,8 @@ class RequestManager():
         return response
 
 
-    def get(self, url: str, headers: dict, _raise_on_error: bool=True, *kwargs) -> requests.Response:
-        response = requests.get(url, headers=headers, *kwargs)
+    def get(self, url: str, headers: dict, _raise_on_error: bool=True, **kwargs) -> requests.Response:
+        response = self.send(url, headers=headers, **kwargs)
 
         if response.status_code != 200 and _raise_on_error:
             raise RuntimeError((
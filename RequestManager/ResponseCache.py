@@ -0,0 +1,274 @@
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Tuple
+
+import urllib.parse as url_parser
+
+import hashlib
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+
+
+# (상태 코드, 응답 헤더, 본문)
+Entry = Tuple[int, Dict[str, str], bytes]
+
+
+def cache_key(url: str, method: str="GET") -> str:
+    '''
+    요청의 캐시 키를 반환합니다. scheme/호스트는 소문자로, 질의 인자는 이름순으로 정렬한 URL의 SHA-256입니다.
+    같은 요청이라면 질의 인자의 순서나 인코딩이 달라도 같은 키가 됩니다.
+    '''
+
+    parsed = url_parser.urlparse(url)
+    query = url_parser.urlencode(sorted(url_parser.parse_qsl(parsed.query, keep_blank_values=True)))
+    normalized = url_parser.urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", "", query, ""))
+
+    return hashlib.sha256(f"{method.upper()} {normalized}".encode("utf-8")).hexdigest()
+
+
+class MemoryStorage():
+    '''
+    본문 크기의 합이 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지우는(LRU) 메모리 저장소입니다.
+    '''
+
+
+    def __init__(self, max_bytes: int=64 * 2**20) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must over 0.")
+
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+
+    def put(self, key: str, entry: Entry) -> None:
+        size = len(entry[2])
+
+        # 저장소보다 큰 항목은 저장하지 않음
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+
+            if previous is not None:
+                self.size -= len(previous[2])
+
+            self._entries[key] = entry
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[2])
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class SQLiteStorage():
+    '''
+    SQLite 파일에 응답을 저장하는 디스크 저장소입니다.
+
+    본문 크기의 합이 max_bytes를 넘으면 마지막으로 읽은 시각이 가장 오래된 항목부터 지웁니다.
+    프로세스를 다시 시작해도 유지되므로, 같은 연구 코드를 다시 실행할 때 API를 호출하지 않습니다.
+    '''
+
+
+    def __init__(self, path: str="./data/http_cache.sqlite", max_bytes: int=2 * 2**30) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must over 0.")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+
+        # 스레드 풀과 이벤트 루프에서 함께 쓰므로 연결 하나를 잠금으로 보호
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, status INTEGER, headers TEXT, content BLOB, size INTEGER, accessed REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+        self.size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            row = self._connection.execute("SELECT status, headers, content FROM responses WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                return None
+
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time(), key))
+
+        return row[0], json.loads(row[1]), bytes(row[2])
+
+
+    def put(self, key: str, entry: Entry) -> None:
+        status, headers, content = entry
+
+        if len(content) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(dict(headers)), content, len(content), time()),
+            )
+            self.size += len(content) - (0 if previous is None else previous[0])
+
+            if self.size > self.max_bytes:
+                self._evict()
+
+
+    def _evict(self) -> None:
+        # 오래된 항목부터 max_bytes의 90%가 될 때까지 지움, 잠금을 가진 상태에서 호출
+        target = self.max_bytes * 0.9
+        rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+
+        evicted: List[Tuple[str]] = []
+        for key, size in rows:
+            if self.size <= target:
+                break
+
+            evicted.append((key,))
+            self.size -= size
+
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self.size = 0
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache():
+    '''
+    RequestManager의 HTTP 응답 캐시입니다.
+
+    응답은 정규화한 URL의 해시(cache_key)로 찾으며, 앞의 저장소부터 차례로 확인합니다.
+    뒤쪽 저장소(디스크)에서 찾은 항목은 앞쪽 저장소(메모리)에도 넣어 다음에는 더 빨리 찾습니다.
+
+    캐시는 요청하는 쪽이 cache=True로 지정한 GET 요청의 200 응답만 저장합니다.
+    바뀔 수 있는 데이터(진행 중인 캔들, 시세, 잔고, 주문)는 cache=True로 요청하지 않아야 하며,
+    DataFetcher는 모든 캔들이 끝난 과거 구간의 요청에만 cache=True를 지정합니다.
+
+
+    예제
+    ----
+
+    >> cache = ResponseCache.sqlite("./data/http_cache.sqlite")
+    >> dataFetcher = DataFetcher(RequestManager(cache=cache))
+    >> dataFetcher.get_bitcoin_candle(duration)     # 두 번째 실행부터는 API를 호출하지 않음
+    '''
+
+
+    def __init__(self, storages: List[MemoryStorage | SQLiteStorage] | None=None) -> None:
+        '''
+        Args
+        ----
+        storages: List[MemoryStorage | SQLiteStorage] | None=None, 빠른 것부터 나열한 저장소들, None인 경우 MemoryStorage() 하나만 사용합니다.
+        '''
+
+        self.storages = [MemoryStorage()] if storages is None else list(storages)
+
+        if len(self.storages) == 0:
+            raise ValueError("at least one storage is required.")
+
+
+    @classmethod
+    def sqlite(cls, path: str="./data/http_cache.sqlite", max_bytes: int=2 * 2**30, memory_bytes: int=64 * 2**20) -> "ResponseCache":
+        '''
+        메모리 LRU(memory_bytes) 뒤에 SQLite 파일(max_bytes)을 둔 캐시를 만듭니다.
+        '''
+
+        return cls([MemoryStorage(memory_bytes), SQLiteStorage(path, max_bytes)])
+
+
+    def get(self, url: str, method: str="GET") -> Tuple[Entry, int] | None:
+        '''
+        저장된 응답과 찾은 저장소의 순번(0이 가장 빠른 저장소)을 반환합니다. 없다면 None입니다.
+        '''
+
+        key = cache_key(url, method)
+
+        for tier, storage in enumerate(self.storages):
+            entry = storage.get(key)
+
+            if entry is not None:
+                for faster in self.storages[:tier]:
+                    faster.put(key, entry)
+
+                return entry, tier
+
+        return None
+
+
+    def put(self, url: str, status: int, headers: Mapping[str, str], content: bytes, method: str="GET") -> bool:
+        '''
+        응답을 모든 저장소에 저장합니다. GET 요청의 200 응답이 아니라면 저장하지 않고 False를 반환합니다.
+        '''
+
+        if method.upper() != "GET" or status != 200:
+            return False
+
+        # 본문은 이미 압축이 풀린 상태이므로 연결/전송 관련 헤더는 저장하지 않음
+        kept = {name: value for name, value in headers.items() if name.lower() in ("content-type", "etag", "last-modified")}
+        entry: Entry = (status, kept, bytes(content))
+        key = cache_key(url, method)
+
+        for storage in self.storages:
+            storage.put(key, entry)
+
+        return True
+
+
+    def clear(self) -> None:
+        for storage in self.storages:
+            storage.clear()
+
+
+    def close(self) -> None:
+        for storage in self.storages:
+            if isinstance(storage, SQLiteStorage):
+                storage.close()
@@ -0,0 +1,403 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Mapping
+
+import urllib.parse as url_parser
+
+from random import random
+from threading import Lock
+from time import monotonic
+
+from .Metrics import Metrics
+from .RateLimiter import HOST_SOURCES
+
+
+# 다시 보내도 결과가 같은 HTTP 메서드, 주문(POST)은 포함하지 않음
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# 일시적인 장애로 보고 다시 보낼 상태 코드
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(RuntimeError):
+    '''
+    회로 차단기가 열려 있어 요청을 보내지 않았을 때 발생하는 예외입니다.
+
+    Attributes
+    ----------
+    source: str, 차단된 API 소스(또는 호스트)
+    retry_in: float, 차단기가 다시 시험 요청을 허용하기까지 남은 시간(초)
+    '''
+
+    def __init__(self, source: str, retry_in: float):
+        self.source = source
+        self.retry_in = retry_in
+
+        super().__init__(f"circuit for {source} is open, retry in {retry_in:.1f}s")
+
+
+class RetryBudget():
+    '''
+    재시도 횟수를 원래 요청 수의 일정 비율로 제한합니다.
+
+    요청마다 ratio개, 초마다 min_per_second개의 토큰이 쌓이고(최대 capacity개) 재시도마다 1개를 씁니다.
+    장애가 길어져도 재시도가 요청량을 (1 + ratio)배 넘게 늘리지 않으므로, 복구 중인 서버에 부하를 더하지 않습니다.
+    '''
+
+
+    def __init__(self, ratio: float=0.2, min_per_second: float=1.0, capacity: float=10.0) -> None:
+        if ratio < 0 or min_per_second < 0 or capacity <= 0:
+            raise ValueError("ratio, min_per_second must be 0 or upper and capacity must over 0.")
+
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = monotonic()
+        self._lock = Lock()
+
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.min_per_second)
+        self.updated_at = now
+
+
+    def deposit(self) -> None:
+        '''
+        원래 요청 하나를 보낼 때 호출합니다.
+        '''
+
+        with self._lock:
+            self._refill(monotonic())
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+
+    def withdraw(self) -> bool:
+        '''
+        재시도 하나에 쓸 토큰을 차감합니다. 남은 토큰이 없다면 False를 반환합니다.
+        '''
+
+        with self._lock:
+            self._refill(monotonic())
+
+            if self.tokens < 1:
+                return False
+
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker():
+    '''
+    연속으로 failure_threshold번 실패하면 reset_timeout초 동안 요청을 막는(열림) 회로 차단기입니다.
+
+    reset_timeout초가 지나면 시험 요청을 half_open_max개까지만 허용하고 나머지는 계속 막습니다(반열림).
+    시험 요청이 한 번이라도 실패하면 바로 다시 열리고, 성공하면 닫혀 모든 요청을 허용합니다.
+    따라서 아직 복구되지 않은 서버에 스레드 풀의 배치들이 한꺼번에 요청을 보내지 않습니다.
+    시험 요청이 결과를 남기지 못한 경우(e.g. 다른 예외)에 대비해, 반열림 후 reset_timeout초가 지나면 시험 요청을 다시 허용합니다.
+    '''
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+    def __init__(self, failure_threshold: int=5, reset_timeout: float=30.0, half_open_max: int=1) -> None:
+        if failure_threshold < 1 or reset_timeout < 0 or half_open_max < 1:
+            raise ValueError("failure_threshold, half_open_max must be 1 or upper and reset_timeout must be 0 or upper.")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0             # 반열림 상태에서 허용한 시험 요청 수
+        self._lock = Lock()
+
+
+    def allow(self) -> bool:
+        '''
+        요청을 보내도 되는지 반환합니다. 열린 지 reset_timeout초가 지났다면 반열림 상태로 바꾸고 시험 요청으로 허용합니다.
+        '''
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            now = monotonic()
+
+            if now - self.opened_at < self.reset_timeout:
+                if self.state == self.OPEN or self.probes >= self.half_open_max:
+                    return False
+
+            # 처음 반열림 상태가 되었거나, 시험 요청들이 reset_timeout초 동안 결과를 남기지 않은 경우
+            else:
+                self.state = self.HALF_OPEN
+                self.opened_at = now
+                self.probes = 0
+
+            self.probes += 1
+            return True
+
+
+    def retry_in(self) -> float:
+        '''
+        다시 시험 요청을 허용하기까지 남은 시간(초)을 반환합니다.
+        '''
+
+        return max(0.0, self.opened_at + self.reset_timeout - monotonic())
+
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probes = 0
+
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = monotonic()
+                self.probes = 0
+
+
+class RetryPolicy():
+    '''
+    RequestManager의 재시도 정책입니다. 일시적인 오류(연결 실패, 시간 초과, 429, 5xx)를 받은 요청을
+    지수적으로 늘어나는 임의 시간(full jitter)만큼 기다린 뒤 다시 보내며, Retry-After 헤더가 있다면 그보다 일찍 보내지 않습니다.
+
+    - 다시 보내도 결과가 같은 메서드(IDEMPOTENT_METHODS)만 재시도합니다. 주문(POST)은 재시도하지 않습니다.
+    - Authorization 헤더가 있는 요청(upbit 서명 요청)은 nonce를 한 번만 쓸 수 있으므로 재시도하지 않습니다.
+    - 재시도 횟수는 source(upbit, coinapi, 그 외에는 호스트)별 RetryBudget으로 제한합니다.
+    - source별 CircuitBreaker가 열려 있다면 요청을 보내지 않고 CircuitOpenError를 발생시킵니다.
+
+    상태(재시도 예산, 차단기)는 요청 제한과 마찬가지로 프로세스 전체에서 공유하는 것이 자연스러우므로,
+    별도로 지정하지 않은 RequestManager는 모두 RetryPolicy.shared()를 사용합니다.
+
+
+    예제
+    ----
+
+    >> requestManager = RequestManager(retry_policy=RetryPolicy(max_retries=8, max_backoff=60))
+    >> requestManager = RequestManager(retry_policy=RetryPolicy(max_retries=0))  # 재시도하지 않음
+    '''
+
+    _shared: "RetryPolicy | None" = None
+    _shared_lock = Lock()
+
+
+    def __init__(
+            self,
+            max_retries: int=4,
+            backoff: float=0.5,
+            max_backoff: float=30.0,
+            retry_statuses: Iterable[int]=RETRY_STATUSES,
+            retry_methods: Iterable[str]=IDEMPOTENT_METHODS,
+            budget_ratio: float=0.2,
+            budget_min_per_second: float=1.0,
+            failure_threshold: int=5,
+            reset_timeout: float=30.0,
+            half_open_max: int=1,
+            ) -> None:
+        '''
+        Args
+        ----
+        max_retries: int=4, 요청 하나를 다시 보낼 최대 횟수, 0인 경우 재시도하지 않습니다.
+        backoff: float=0.5, 첫 재시도 대기 시간의 상한(초), 재시도마다 두 배씩 늘어납니다.
+        max_backoff: float=30.0, 재시도 대기 시간의 상한(초), Retry-After는 이 값보다 길어도 따릅니다.
+        retry_statuses: Iterable[int]=RETRY_STATUSES, 재시도할 응답 상태 코드
+        retry_methods: Iterable[str]=IDEMPOTENT_METHODS, 재시도할 HTTP 메서드
+        budget_ratio: float=0.2, 원래 요청 수 대비 허용할 재시도 비율
+        budget_min_per_second: float=1.0, 요청이 적을 때에도 허용할 초당 재시도 수
+        failure_threshold: int=5, 차단기를 열 연속 실패(연결 실패, 시간 초과, 5xx) 횟수
+        reset_timeout: float=30.0, 차단기가 열린 뒤 시험 요청을 허용하기까지의 시간(초)
+        half_open_max: int=1, 반열림 상태에서 동시에 허용할 시험 요청 수
+
+        Raises
+        ------
+        ValueError: max_retries가 음수이거나 대기 시간이 올바르지 않은 경우 발생합니다.
+        '''
+
+        if max_retries < 0:
+            raise ValueError("max_retries must be 0 or upper.")
+
+        if backoff < 0 or max_backoff < backoff:
+            raise ValueError("backoff must be 0 or upper and max_backoff must be backoff or upper.")
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+
+        self.budget_ratio = budget_ratio
+        self.budget_min_per_second = budget_min_per_second
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+
+        self.budgets: Dict[str, RetryBudget] = dict()
+        self.breakers: Dict[str, CircuitBreaker] = dict()
+        self._lock = Lock()
+
+
+    @classmethod
+    def shared(cls) -> "RetryPolicy":
+        '''
+        프로세스 전체에서 공유하는 RetryPolicy를 반환합니다.
+        '''
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+
+            return cls._shared
+
+
+    @staticmethod
+    def source(url: str) -> str:
+        '''
+        재시도 예산과 차단기를 나누는 단위(upbit, coinapi, 그 외에는 호스트)를 반환합니다.
+        '''
+
+        netloc = url_parser.urlparse(url).netloc
+        return HOST_SOURCES.get(netloc, netloc)
+
+
+    def budget(self, source: str) -> RetryBudget:
+        with self._lock:
+            budget = self.budgets.get(source)
+
+            if budget is None:
+                budget = self.budgets[source] = RetryBudget(self.budget_ratio, self.budget_min_per_second)
+
+            return budget
+
+
+    def breaker(self, source: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self.breakers.get(source)
+
+            if breaker is None:
+                breaker = self.breakers[source] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.half_open_max)
+
+            return breaker
+
+
+    def retryable(self, method: str, headers: Mapping[str, str]) -> bool:
+        '''
+        요청을 다시 보내도 안전한지 반환합니다.
+        '''
+
+        return self.max_retries > 0 and method.upper() in self.retry_methods and "Authorization" not in headers
+
+
+    def should_retry(self, source: str, attempt: int) -> bool:
+        '''
+        attempt번째 재시도(0부터)를 해도 되는지 반환합니다. 허용하는 경우 재시도 예산을 차감합니다.
+        '''
+
+        return attempt < self.max_retries and self.budget(source).withdraw()
+
+
+    def admit(self, source: str, metrics: Metrics | None=None, error: BaseException | None=None) -> None:
+        '''
+        source의 차단기가 요청을 허용하는지 확인합니다. 요청(재시도 포함)을 보내기 직전마다 호출합니다.
+
+        Raises
+        ------
+        CircuitOpenError: 차단기가 요청을 막은 경우 발생하며, error가 있다면 그 원인으로 연결합니다.
+        '''
+
+        breaker = self.breaker(source)
+
+        if not breaker.allow():
+            if metrics is not None:
+                metrics.count("circuit_rejected_total", source=source)
+
+            raise CircuitOpenError(source, breaker.retry_in()) from error
+
+
+    def decide(
+            self,
+            source: str,
+            attempt: int,
+            retryable: bool,
+            status: int | None=None,
+            retry_after: str | None=None,
+            error: BaseException | None=None,
+            metrics: Metrics | None=None,
+            ) -> float | None:
+        '''
+        attempt번째 재시도(0부터)를 할지 정합니다. RequestManager와 AsyncRequestManager가 요청 하나의 결과마다 호출합니다.
+
+        결과(연결 실패, 시간 초과, 5xx는 실패, 그 외는 성공)를 차단기에 기록하고, 재시도할 상태 코드이거나 오류인 경우
+        재시도 예산을 차감하여 기다릴 시간(초)을 반환합니다. 재시도하지 않는 경우 None을 반환합니다.
+
+        Args
+        ----
+        source: str, source(url)의 결과
+        attempt: int, 지금까지의 재시도 횟수
+        retryable: bool, retryable(method, headers)의 결과
+        status: int | None=None, 응답 상태 코드, 응답을 받지 못한 경우 None
+        retry_after: str | None=None, 응답의 Retry-After 헤더
+        error: BaseException | None=None, 응답을 받지 못한 원인(연결 실패, 시간 초과)
+        metrics: Metrics | None=None, 재시도 횟수(http_retries_total)와 대기 시간(sleep_seconds_total)을 기록할 계측기
+        '''
+
+        breaker = self.breaker(source)
+
+        if error is not None or status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if error is None and status not in self.retry_statuses:
+            return None
+
+        if not retryable or not self.should_retry(source, attempt):
+            return None
+
+        reason = type(error).__name__ if error is not None else str(status)
+        delay = self.delay(attempt, retry_after)
+
+        if metrics is not None:
+            metrics.count("http_retries_total", source=source, reason=reason)
+            metrics.count("sleep_seconds_total", delay, reason="retry")
+
+        return delay
+
+
+    def delay(self, attempt: int, retry_after: str | None=None) -> float:
+        '''
+        attempt번째 재시도(0부터) 전에 기다릴 시간(초)을 반환합니다.
+        [0, min(max_backoff, backoff * 2^attempt)) 사이의 임의 시간이며, Retry-After가 더 길다면 Retry-After를 따릅니다.
+        '''
+
+        delay = random() * min(self.max_backoff, self.backoff * 2 ** attempt)
+        return max(delay, self.parse_retry_after(retry_after))
+
+
+    @staticmethod
+    def parse_retry_after(retry_after: str | None) -> float:
+        '''
+        Retry-After 헤더(초 또는 HTTP 날짜)를 기다릴 시간(초)으로 바꿉니다. 없거나 읽을 수 없다면 0입니다.
+        '''
+
+        if not retry_after:
+            return 0.0
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
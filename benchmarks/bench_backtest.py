@@ -0,0 +1,30 @@
+'''
+10년치 시간봉 합성 데이터로 MAL_model.predict_all()과 BackTest.run()의 소요 시간을 측정합니다.
+
+    python -m benchmarks.bench_backtest
+'''
+from time import perf_counter
+
+from BackTest.BackTest import BackTest
+from benchmarks.bench_mal_signals import make_model
+
+
+def main() -> None:
+    model = make_model(start="2013-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+
+    start = perf_counter()
+    signal = model.predict_all(MAL_short="MAL_5DAY", MAL_long="MAL_20DAY", cross_duration=3)
+    predict = perf_counter() - start
+
+    start = perf_counter()
+    result = BackTest(model.data, signal).run()
+    backtest = perf_counter() - start
+
+    print(f"rows: {len(model.data)}")
+    print(f"predict_all()   {predict * 1e3:8.2f} ms")
+    print(f"BackTest.run()  {backtest * 1e3:8.2f} ms")
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+분봉 1년치(525,600개) 캔들의 메모리 사용량을 형식별로 비교합니다.
+
+coinapi 응답 형식의 합성 캔들에 대해 응답 JSON(dict 목록), 시간 열이 문자열인 데이터프레임,
+DataFetcher._to_candle_frame의 데이터프레임, Candles(float64/float32)의 캔들당 바이트 수와 변환 시간을 측정합니다.
+
+    python -m benchmarks.bench_candle_memory
+'''
+from time import perf_counter
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from DataFetcher.Candles import Candles
+from DataFetcher.DataFetcher import DataFetcher
+
+
+def make_records(rows: int) -> list[dict]:
+    times = pd.date_range("2022-01-01", periods=rows + 1, freq="min", tz="UTC").strftime("%Y-%m-%dT%H:%M:%S.0000000Z").tolist()
+    rng = np.random.default_rng(0)
+    close = 40_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, rows)))
+
+    return [
+        {
+            "time_period_start": times[i], "time_period_end": times[i + 1], "time_open": times[i], "time_close": times[i],
+            "price_open": float(close[i]), "price_high": float(close[i]) + 1.0, "price_low": float(close[i]) - 1.0, "price_close": float(close[i]),
+            "volume_traded": float(rng.random()), "trades_count": int(i % 50),
+        }
+        for i in range(rows)
+    ]
+
+
+def main(rows: int=525_600) -> None:
+    tracemalloc.start()
+    start = perf_counter()
+    records = make_records(rows)
+    results = {"records (json)": (tracemalloc.get_traced_memory()[0], perf_counter() - start)}
+    tracemalloc.stop()
+
+    columns = list(records[0].keys())
+
+    start = perf_counter()
+    strings = pd.DataFrame.from_records(records, columns=columns)
+    results["frame of strings"] = (strings.memory_usage(deep=True).sum(), perf_counter() - start)
+
+    start = perf_counter()
+    frame = DataFetcher._to_candle_frame(records, columns)
+    results["parsed frame"] = (frame.memory_usage(deep=True).sum(), perf_counter() - start)
+
+    for dtype in (np.float64, np.float32):
+        start = perf_counter()
+        candles = Candles.from_records(records, "1MIN", dtype=dtype)
+        results[f"Candles {np.dtype(dtype).name}"] = (candles.nbytes, perf_counter() - start)
+
+    baseline = results["frame of strings"][0]
+    for name, (nbytes, elapsed) in results.items():
+        print(f"{name:18s} {nbytes / rows:8.1f} B/candle {nbytes / 2 ** 20:9.1f} MiB {baseline / nbytes:6.1f}x  {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+'''
+get_bitcoin_candle의 응답 변환 비용을 측정합니다.
+
+coinapi 응답 형식의 합성 캔들 데이터에 대해, 캔들마다 strptime/strftime을 호출하고
+dict of lists로 모으던 기존 방식과 DataFetcher._to_candle_frame의 벡터화된 변환을 비교합니다.
+
+    python -m benchmarks.bench_candle_parsing
+'''
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import pandas as pd
+
+from DataFetcher.DataFetcher import DataFetcher
+
+
+def make_pages(rows: int, page_size: int=1000) -> list[list[dict]]:
+    start = datetime(2015, 1, 1)
+    records = []
+
+    for i in range(rows):
+        t = (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+        records.append({
+            "time_period_start": t, "time_period_end": t, "time_open": t, "time_close": t,
+            "price_open": 1.0, "price_high": 2.0, "price_low": 0.5, "price_close": 1.5,
+            "volume_traded": 3.0, "trades_count": 4,
+        })
+
+    return [records[i:i + page_size] for i in range(0, rows, page_size)]
+
+
+def legacy(pages: list[list[dict]], columns: list[str]) -> pd.DataFrame:
+    result_json = {i: [] for i in columns}
+
+    for resp_json in pages:
+        for idx, data in enumerate(resp_json):
+            for key in data.keys():
+                if key.find("time") != -1:
+                    data_modified = datetime.strptime(data[key].split('.')[0], "%Y-%m-%dT%H:%M:%S") + timedelta(hours=9)
+                    resp_json[idx][key] = data_modified.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+
+        for i in resp_json:
+            for key in result_json.keys():
+                if key in i.keys():
+                    result_json[key].append(i[key])
+                    continue
+
+                result_json[key].append(None)
+
+    return pd.DataFrame(result_json)
+
+
+def vectorized(pages: list[list[dict]], columns: list[str]) -> pd.DataFrame:
+    records = [row for page in pages for row in page]
+    return DataFetcher._to_candle_frame(records, columns)
+
+
+def main(rows: int=75_000) -> None:
+    columns = list(make_pages(1)[0][0].keys())
+
+    timings = {}
+    for name, fn in (("legacy loop", legacy), ("vectorized", vectorized)):
+        pages = make_pages(rows)
+        start = perf_counter()
+        fn(pages, columns)
+        timings[name] = perf_counter() - start
+        print(f"{name:12s} {timings[name] * 1e3:8.1f} ms for {rows} rows")
+
+    print(f"speedup: {timings['legacy loop'] / timings['vectorized']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
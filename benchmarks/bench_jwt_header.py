@@ -0,0 +1,76 @@
+'''
+upbit 인증 헤더 생성 속도를 측정합니다.
+
+매번 JWT()를 만들어 서명하던 기존 방식과, 미리 초기화한 JWTSigner로 서명하는
+RequestManager.generate_header의 초당 헤더 생성 수를 비교합니다.
+두 방식이 만든 토큰이 바이트 단위로 같은지도 함께 확인합니다.
+
+    python -m benchmarks.bench_jwt_header
+'''
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from urllib.parse import unquote, urlencode
+
+import hashlib
+import json
+import os
+import uuid
+
+from jwt import jwk, JWT
+
+from RequestManager.JWTSigner import JWTSigner
+from RequestManager.RequestManager import RequestManager
+
+
+def headers_per_second(fn, repeat: int) -> float:
+    start = perf_counter()
+    for _ in range(repeat):
+        fn()
+    return repeat / (perf_counter() - start)
+
+
+def main(repeat: int=20_000) -> None:
+    access, secret = "access", "secret"
+    query = {"market": "KRW-BTC", "side": "bid", "ord_type": "price", "price": "10000"}
+
+    # 기존 방식: 요청마다 query 인코딩, payload 복사, JWT() 생성, 서명
+    key = jwk.OctetJWK(key=secret.encode("utf-8"))
+    def legacy() -> dict:
+        payload = {
+            "nonce": str(uuid.uuid4()),
+            "query_hash": hashlib.sha512(unquote(urlencode(query, doseq=True)).encode("utf-8")).hexdigest(),
+            "query_hash_alg": "SHA512",
+        }
+        payload_ = dict()
+        for k in payload.keys():
+            payload_[k] = payload[k]
+        payload_["access_key"] = access
+        return {"Authorization": f"Bearer {JWT().encode(payload_, key=key)}"}
+
+    # 같은 payload에 대해 같은 토큰을 만드는지 확인
+    signer = JWTSigner(access, secret)
+    sample = {"nonce": "fixed", "access_key": access}
+    assert signer.sign(sample) == JWT().encode(sample, key=key)
+
+    with TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, "keys.json")
+        with open(key_path, "w") as f:
+            json.dump({"upbit_access": access, "upbit_secret": secret, "coinapi_access": access}, f)
+
+        requestManager = RequestManager(key_path=key_path)
+
+        results = {
+            "JWT().encode per call": headers_per_second(legacy, repeat),
+            "RequestManager.generate_header": headers_per_second(lambda: requestManager.generate_header("upbit", query=query), repeat),
+            "JWTSigner.sign (fixed payload)": headers_per_second(lambda: signer.sign(sample), repeat),
+        }
+
+    for name, rate in results.items():
+        print(f"{name:32s} {rate:10.0f} headers/s  {1e6 / rate:7.2f} us/header")
+
+    print(f"speedup: {results['RequestManager.generate_header'] / results['JWT().encode per call']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
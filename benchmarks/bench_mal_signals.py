@@ -0,0 +1,54 @@
+'''
+MAL_model의 시점별 predict() 반복 호출과 predict_all()의 전체 구간 계산을 비교합니다.
+
+2015-01-01 ~ 2023-08-01 일봉 합성 데이터를 사용하며, 두 결과가 같은지도 함께 확인합니다.
+
+    python -m benchmarks.bench_mal_signals
+'''
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from DataFetcher.Duration import Duration
+from models.MAL import MAL_model
+
+
+def make_model(start: str="2015-01-01T00:00", end: str="2023-08-01T00:00", interval: str="DAY", seed: int=0) -> MAL_model:
+    duration = Duration(start=start, end=end, interval=interval)
+    times = pd.date_range(duration.start, duration.end, freq="D" if interval == "DAY" else "h", tz="Asia/Seoul")
+
+    rng = np.random.default_rng(seed)
+    volatility = 0.03 if interval == "DAY" else 0.03 / np.sqrt(24)
+    close = 300 * np.exp(np.cumsum(rng.normal(0, volatility, len(times))))
+    data = pd.DataFrame({"time_period_start": times, "price_close": close})
+
+    model = MAL_model(data, duration, target_label="price_close", timestamp_label="time_period_start")
+    model.add_mal(inplace=True)
+    return model
+
+
+def main() -> None:
+    model = make_model()
+    cross_duration = 3
+    times = model.data["time_period_start"]
+
+    start = perf_counter()
+    expected = []
+    for i in range(cross_duration, len(times)):
+        expected.append(bool(model.predict(target_time=times.iloc[i], cross_duration=cross_duration)))
+    loop = perf_counter() - start
+
+    start = perf_counter()
+    prediction = model.predict_all(cross_duration=cross_duration)
+    batch = perf_counter() - start
+
+    assert prediction[cross_duration:].tolist() == expected, "predict_all() differs from predict()"
+
+    print(f"predict() x {len(expected):5d}   {loop * 1e3:10.2f} ms")
+    print(f"predict_all()          {batch * 1e3:10.2f} ms")
+    print(f"speedup: {loop / batch:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+'''
+로컬 stub 서버로 주문 파이프라인의 단계별 지연 시간(신호 -> 전송 -> 응답)을 측정합니다.
+
+Order.hooks로 OrderTiming을 모아 동기 Order.submit과 AsyncOrder의 중앙값/p99를 출력합니다.
+stub 서버는 upbit 호스트가 아니므로 요청 제한기의 order 그룹 제한은 적용되지 않습니다.
+
+    python -m benchmarks.bench_order_latency
+'''
+from statistics import median, quantiles
+from tempfile import TemporaryDirectory
+
+import asyncio
+import json
+import os
+
+from RequestManager.RequestManager import RequestManager
+from models.AsyncOrder import AsyncOrder
+from models.Order import Order
+from benchmarks.stub_server import StubServer
+
+
+def report(name: str, timings: list[dict]) -> None:
+    for key in ("prepare_ms", "submit_ms", "ack_ms", "total_ms"):
+        values = [timing[key] for timing in timings]
+        print(f"{name:24s} {key:10s} median {median(values):8.3f} ms  p99 {quantiles(values, n=100)[-1]:8.3f} ms")
+
+
+async def run_async(order: Order, repeat: int, max_in_flight: int) -> None:
+    async with AsyncOrder(order, max_in_flight=max_in_flight) as asyncOrder:
+        for _ in range(repeat):
+            await asyncOrder.submit(asyncOrder.prepare("ask", volume=0.01))
+
+
+def main(repeat: int=300) -> None:
+    with TemporaryDirectory() as tmp, StubServer(lambda path: {"uuid": "stub", "state": "wait"}) as server:
+        key_path = os.path.join(tmp, "keys.json")
+        with open(key_path, "w") as f:
+            json.dump({"upbit_access": "access", "upbit_secret": "secret", "coinapi_access": "access"}, f)
+
+        timings: list[dict] = []
+        order = Order(RequestManager(key_path=key_path))
+        order.url = server.url + "/v1/orders"
+        order.hooks.append(lambda request, result: timings.append(request.timing.as_dict()))
+
+        for _ in range(repeat):
+            order.submit(order.prepare("ask", volume=0.01))
+
+        report("Order.submit", timings)
+
+        timings.clear()
+        asyncio.run(run_async(order, repeat, max_in_flight=4))
+        report("AsyncOrder.submit", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+'''
+10년치 시간봉 합성 데이터로 ParameterSweep의 소요 시간을 측정합니다.
+
+    python -m benchmarks.bench_parameter_sweep
+'''
+from time import perf_counter
+
+import os
+
+from BackTest.ParameterSweep import ParameterSweep
+from DataFetcher.Duration import Duration
+from benchmarks.bench_mal_signals import make_model
+
+
+def main() -> None:
+    start, end = "2013-08-01T00:00", "2023-08-01T00:00"
+    data = make_model(start=start, end=end, interval="HOUR").data[["time_period_start", "price_close"]]
+    sweep = ParameterSweep(data, Duration(start=start, end=end, interval="HOUR"))
+
+    MAL_days = [3, 5, 10, 20, 40, 60, 120, 240]
+    cross_durations = range(1, 26)
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        started = perf_counter()
+        table = sweep.run(MAL_days=MAL_days, cross_durations=cross_durations, workers=workers)
+        elapsed = perf_counter() - started
+
+        print(f"workers={workers:2d}  {len(table)} configurations in {elapsed:6.2f} s ({elapsed / len(table) * 1e3:.1f} ms each)")
+
+    print(table.head())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+'''
+RealtimeFeed가 체결을 받아 캔들을 완성하고 MAL_model.update까지 마치는 데 걸리는 시간을 측정합니다.
+
+합성 분봉을 ReplayServer의 체결 기록으로 바꾸어 로컬 websocket으로 재생합니다.
+speed를 지정한 재생에서는 서버가 메시지를 보낸 시각부터 구독자가 매수 여부를 구하기까지의 지연을,
+speed=None(기다리지 않음) 재생에서는 초당 처리할 수 있는 체결 수를 측정합니다.
+
+    python -m benchmarks.bench_realtime_feed
+'''
+import asyncio
+from time import perf_counter, time
+
+import numpy as np
+import pandas as pd
+
+from DataFetcher.Candles import Candles
+from DataFetcher.Duration import Duration
+from DataFetcher.RealtimeFeed import RealtimeFeed
+from DataFetcher.ReplayServer import ReplayServer
+from models.MAL import MAL_model
+
+
+def make_candles(rows: int, seed: int=0) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, rows)))
+    start = pd.Timestamp("2023-01-01", tz="UTC").value
+
+    return Candles(
+        "1MIN",
+        start + np.arange(rows, dtype=np.int64) * 60_000_000_000,
+        {"price_open": close * 0.999, "price_high": close * 1.002, "price_low": close * 0.997, "price_close": close, "volume_traded": rng.random(rows)},
+        np.full(rows, 4),
+    )
+
+
+async def replay(ticks: list, model: MAL_model, speed: float | None) -> tuple:
+    latency = []
+
+    async with ReplayServer(ticks, speed=speed) as server:
+        feed = RealtimeFeed(["KRW-BTC"], period_id="1MIN", url=server.url, reconnect=False)
+
+        def on_candle(code: str, candle: dict, final: bool) -> None:
+            model.update(candle, MAL_short="MAL_1DAY", MAL_long="MAL_2DAY", cross_duration=1)
+            latency.append(time() * 1000 - feed.last_message_time)
+
+        feed.subscribe(on_candle)
+
+        start = perf_counter()
+        await feed.run()
+        elapsed = perf_counter() - start
+
+    return feed.messages, elapsed, np.array(latency)
+
+
+def main(history: int=4_320, live: int=600) -> None:
+    candles = make_candles(history + live * 2)
+    duration = Duration(start="2023-01-01T09:00", end="2023-01-04T09:00", interval="1MIN")
+
+    # 분봉 600개를 60초에 재생(체결 간격 25ms)
+    model = MAL_model(candles[:history].to_frame(), duration, moving_avr_interval_days=[1, 2])
+    ticks = ReplayServer.ticks_from_candles(candles[history:history + live])
+    _, _, latency = asyncio.run(replay(ticks, model, speed=600))
+    print(f"paced replay   candle -> signal latency  median {np.median(latency):6.2f} ms  p99 {np.percentile(latency, 99):6.2f} ms")
+
+    model = MAL_model(candles[:history].to_frame(), duration, moving_avr_interval_days=[1, 2])
+    ticks = ReplayServer.ticks_from_candles(candles[history + live:])
+    messages, elapsed, _ = asyncio.run(replay(ticks, model, speed=None))
+    print(f"unpaced replay {messages} ticks in {elapsed * 1e3:.1f} ms  ({messages / elapsed:,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+'''
+RequestManager의 연결 재사용 효과를 측정합니다.
+
+로컬 stub 서버에 같은 요청을 반복해서 보내고, 매번 연결을 새로 맺는 requests.get과
+호스트별 세션을 재사용하는 RequestManager.get의 요청당 지연 시간을 비교합니다.
+
+    python -m benchmarks.bench_request_manager
+'''
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import json
+import os
+import requests
+
+from RequestManager.RequestManager import RequestManager
+from benchmarks.stub_server import StubServer
+
+
+def measure(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return timings
+
+
+def main(repeat: int=500) -> None:
+    with TemporaryDirectory() as tmp, StubServer() as server:
+        key_path = os.path.join(tmp, "keys.json")
+        with open(key_path, "w") as f:
+            json.dump({"upbit_access": "access", "upbit_secret": "secret", "coinapi_access": "access"}, f)
+
+        url = server.url + "/v1/ohlcv/BITSTAMP_SPOT_BTC_USD/history"
+
+        fresh = measure(lambda: requests.get(url), repeat)
+
+        with RequestManager(key_path=key_path) as requestManager:
+            pooled = measure(lambda: requestManager.get(url, headers={}), repeat)
+
+    for name, timings in (("requests.get (new connection)", fresh), ("RequestManager.get (pooled)", pooled)):
+        print(f"{name:32s} median {median(timings) * 1e6:8.1f} us/request")
+
+    print(f"speedup: {median(fresh) / median(pooled):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
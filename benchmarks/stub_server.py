@@ -0,0 +1,71 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable
+
+import json
+
+
+class StubServer():
+    '''
+    벤치마크용 로컬 HTTP 서버입니다.
+
+    HTTP/1.1 keep-alive를 지원하며, 모든 GET 요청에는 200으로, POST 요청에는 본문을 읽은 뒤 201로
+    handler가 돌려준 JSON을 응답합니다.
+
+
+    예제
+    ----
+
+    >> with StubServer() as server:
+    ...     requests.get(server.url + "/v1/ping")
+    '''
+
+
+    def __init__(self, handler: Callable[[str], object] | None=None, host: str="127.0.0.1", port: int=0) -> None:
+        '''
+        Args
+        ----
+        handler: Callable[[str], object] | None=None, 요청 경로를 받아 응답할 객체를 돌려주는 함수
+        host: str="127.0.0.1", 서버 주소
+        port: int=0, 서버 포트, 0인 경우 임의의 빈 포트를 사용합니다.
+        '''
+
+        respond = handler if handler is not None else (lambda path: {"path": path})
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self.reply(200)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply(201)
+
+            def reply(self, status: int):
+                body = json.dumps(respond(self.path)).encode("utf-8")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
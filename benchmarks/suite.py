@@ -0,0 +1,453 @@
+'''
+데이터 수집, 지표, 신호, 백테스트의 핫 패스를 한 번에 측정하고 결과를 JSON으로 남기는 벤치마크 모음입니다.
+
+각 항목은 준비(setup) 후 측정할 함수를 여러 번 실행하여 min/median/mean 등의 통계를 구하며,
+JSON은 pytest-benchmark의 --benchmark-json과 같은 구조(machine_info, commit_info, benchmarks[].stats)입니다.
+--compare로 이전 결과를 지정하면 중앙값이 threshold보다 더 느려진 항목이 있을 때 종료 코드 1로 끝나므로
+CI나 배포 전 확인 단계에서 성능 저하를 잡을 수 있습니다.
+
+측정 전에는 최적화한 경로가 기준 구현과 같은 결과를 내는지 확인하는 항목(@check)을 먼저 실행하며,
+하나라도 다르면 측정하지 않고 종료 코드 1로 끝납니다. --check는 확인 항목만 실행합니다.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --check
+    python -m benchmarks.suite --json results.json
+    python -m benchmarks.suite -k mal --compare baseline.json --threshold 0.2
+'''
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from statistics import mean, median, quantiles, stdev
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from BackTest.BackTest import BackTest
+from BackTest.ParameterSweep import ParameterSweep
+from DataFetcher.Candles import Candles
+from DataFetcher.DataFetcher import DataFetcher
+from DataFetcher.Duration import Duration
+from RequestManager.JWTSigner import JWTSigner
+from RequestManager.Metrics import Metrics
+from RequestManager.RateLimiter import RateLimiter
+from RequestManager.ResponseCache import ResponseCache, SQLiteStorage
+from RequestManager.RequestManager import RequestManager
+from benchmarks.bench_mal_signals import make_model
+from models.MAL import MAL_model, MAL_panel
+from benchmarks.stub_server import StubServer
+
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "coinapi_ohlcv_1hrs.json")
+
+# (그룹, 이름, setup), setup은 ExitStack을 받아 측정할 함수를 반환
+CASES: List[Tuple[str, str, Callable[[ExitStack], Callable[[], object]]]] = []
+
+
+def case(group: str):
+    def register(setup: Callable[[ExitStack], Callable[[], object]]):
+        CASES.append((group, setup.__name__, setup))
+        return setup
+
+    return register
+
+
+# (그룹, 이름, 확인 함수), 확인 함수는 결과가 기준 구현과 다르면 AssertionError를 발생
+CHECKS: List[Tuple[str, str, Callable[[], None]]] = []
+
+
+def check(group: str):
+    def register(fn: Callable[[], None]):
+        CHECKS.append((group, fn.__name__, fn))
+        return fn
+
+    return register
+
+
+def load_fixture() -> List[dict]:
+    with open(FIXTURE_PATH, encoding="utf8") as f:
+        return json.load(f)
+
+
+@case("duration")
+def plan_1min_10y(stack: ExitStack) -> Callable[[], object]:
+    duration = Duration(start="2013-08-01T00:00", end="2023-08-01T00:00", batch_size=100, interval="1MIN")
+    return lambda: duration.plan().strftime(utc=True)
+
+
+@case("duration")
+def iter_1hrs_10y(stack: ExitStack) -> Callable[[], object]:
+    duration = Duration(start="2013-08-01T00:00", end="2023-08-01T00:00", batch_size=24, interval="HOUR")
+    return lambda: list(duration)
+
+
+@case("fetch")
+def parse_fixture_frame(stack: ExitStack) -> Callable[[], object]:
+    records = load_fixture() * 100
+    columns = list(records[0].keys())
+    return lambda: DataFetcher._to_candle_frame(records, columns)
+
+
+@case("fetch")
+def parse_fixture_candles(stack: ExitStack) -> Callable[[], object]:
+    records = load_fixture() * 100
+    return lambda: Candles.from_records(records, "1HRS")
+
+
+def stub_fetch(stack: ExitStack, metrics: Metrics, cache: ResponseCache | None=None) -> Callable[[], object]:
+    # 배치마다 기록된 응답(100개)을 돌려주는 로컬 서버, 한 달치 시간봉은 8개 배치
+    page = load_fixture()
+    server = stack.enter_context(StubServer(lambda path: page))
+    tmp = stack.enter_context(TemporaryDirectory())
+
+    key_path = os.path.join(tmp, "keys.json")
+    with open(key_path, "w") as f:
+        json.dump({"upbit_access": "access", "upbit_secret": "secret", "coinapi_access": "access"}, f)
+
+    requestManager = RequestManager(key_path=key_path, rate_limiter=RateLimiter(), base_urls={"coinapi": server.url}, metrics=metrics, cache=cache)
+    stack.callback(requestManager.close)
+
+    dataFetcher = DataFetcher(requestManager)
+    duration = Duration(start="2023-07-01T00:00", end="2023-08-01T00:00", batch_size=100, interval="HOUR")
+
+    return lambda: dataFetcher.get_bitcoin_candle(duration, workers=4)
+
+
+@case("fetch")
+def get_bitcoin_candle_stub(stack: ExitStack) -> Callable[[], object]:
+    return stub_fetch(stack, Metrics(enabled=False))
+
+
+@case("fetch")
+def get_bitcoin_candle_stub_metrics(stack: ExitStack) -> Callable[[], object]:
+    # 계측기를 켰을 때의 비용, get_bitcoin_candle_stub과 비교
+    return stub_fetch(stack, Metrics(enabled=True))
+
+
+@case("fetch")
+def get_bitcoin_candle_disk_cache(stack: ExitStack) -> Callable[[], object]:
+    # 모든 배치가 SQLite 캐시에 있는 경우(메모리 캐시 없음), measure()의 준비 실행에서 캐시가 채워짐
+    tmp = stack.enter_context(TemporaryDirectory())
+    cache = ResponseCache([SQLiteStorage(os.path.join(tmp, "http_cache.sqlite"))])
+    stack.callback(cache.close)
+
+    return stub_fetch(stack, Metrics(enabled=False), cache)
+
+
+@case("mal")
+def add_mal_10y_hourly(stack: ExitStack) -> Callable[[], object]:
+    model = make_model(start="2013-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    return lambda: model.add_mal()
+
+
+@case("mal")
+def predict_single(stack: ExitStack) -> Callable[[], object]:
+    model = make_model(start="2013-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    target = model.data["time_period_start"].iloc[len(model.data) // 2]
+    return lambda: model.predict(target_time=target, cross_duration=3)
+
+
+@case("mal")
+def predict_batch(stack: ExitStack) -> Callable[[], object]:
+    model = make_model(start="2013-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    return lambda: model.predict_all(cross_duration=3)
+
+
+@case("mal")
+def panel_predict_100x1y_hourly(stack: ExitStack) -> Callable[[], object]:
+    # 심볼 100개의 1년치 시간봉, 이동 평균과 시간 × 심볼 신호를 한 번에 계산
+    duration = Duration(start="2022-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    times = pd.date_range(duration.start, duration.end, freq="h", inclusive="left")
+
+    rng = np.random.default_rng(0)
+    closes = 300 * np.exp(np.cumsum(rng.normal(0, 0.03 / np.sqrt(24), (len(times), 100)), axis=0))
+
+    def run():
+        model = MAL_panel(closes, duration)
+        model.add_mal()
+        return model.predict_all(cross_duration=3)
+
+    return run
+
+
+@case("backtest")
+def backtest_10y_hourly(stack: ExitStack) -> Callable[[], object]:
+    model = make_model(start="2013-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    return lambda: BackTest(model.data, model.predict_all(cross_duration=3)).run()
+
+
+@check("duration")
+def plan_contiguous() -> None:
+    # 구간들이 start부터 end까지 겹치거나 빠지는 곳 없이 이어지는지, split()이 순서를 유지하는지 확인
+    for interval, batch_size in (("1MIN", 100), ("HOUR", 24), ("DAY", 7), ("MONTH", 1)):
+        duration = Duration(start="2019-12-31T13:00", end="2021-03-02T07:00", batch_size=batch_size, interval=interval)
+        plan = duration.plan()
+        windows = plan.windows
+
+        assert windows[0][0] == duration.start and windows[-1][1] == duration.end, f"{interval}: plan does not cover start ~ end"
+        assert all(start < end for start, end in windows), f"{interval}: empty or reversed window"
+        assert all(previous[1] == current[0] for previous, current in zip(windows, windows[1:])), f"{interval}: windows overlap or leave a gap"
+        assert [window for part in plan.split(3) for window in part] == list(windows), f"{interval}: split() changed the windows"
+
+
+@check("mal")
+def predict_all_matches_predict() -> None:
+    model = make_model(start="2022-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    times = model.data["time_period_start"]
+
+    for cross_duration in (1, 3):
+        signal = model.predict_all(cross_duration=cross_duration)
+
+        for i in range(model.days_weight * cross_duration, len(times), 7):
+            assert signal[i] == model.predict(target_time=times.iloc[i], cross_duration=cross_duration), f"cross_duration={cross_duration}: differs at row {i}"
+
+
+@check("mal")
+def update_matches_add_mal() -> None:
+    # 앞부분으로 만든 모델에 나머지 캔들을 update()로 하나씩 넣은 결과가 전체 데이터의 add_mal(), predict()와 비트 단위로 같은지 확인
+    full = make_model(start="2022-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    data, duration = full.data, Duration(start="2022-08-01T00:00", end="2023-08-01T00:00", interval="HOUR")
+    split = len(data) * 2 // 3
+
+    model = MAL_model(data.iloc[:split][["time_period_start", "price_close"]], duration)
+    keys = [("MAL_5DAY", "MAL_20DAY", 3), ("MAL_20DAY", "MAL_60DAY", 1)]
+    signals = {key: full.predict_all(*key) for key in keys}
+
+    for i in range(split, len(data)):
+        key = keys[(i - split) * len(keys) // (len(data) - split)]
+        values, prediction = model.update(data.iloc[i], *key)
+
+        for name, value in values.items():
+            expected = data[name].iloc[i]
+            assert value == expected or (np.isnan(value) and np.isnan(expected)), f"{name} differs at row {i}: {value!r} != {expected!r}"
+
+        # i번째 캔들까지 포함한 predict(target_time=None)은 predict_all의 i + 1번째 값
+        expected = signals[key][i + 1] if i + 1 < len(data) else full.predict(None, *key)
+        assert prediction == expected, f"{key}: prediction differs at row {i}"
+
+
+@check("request")
+def jwt_signer_matches_jwt() -> None:
+    from jwt import jwk, JWT
+
+    access, secret = "access", "secret"
+    signer = JWTSigner(access, secret)
+    key = jwk.OctetJWK(key=secret.encode("utf-8"))
+
+    payloads = [
+        {"access_key": access, "nonce": "fixed"},
+        {"access_key": access, "nonce": "0b5d3c1e-7f5e-4c0a-9a4e-2f1f0c7d8e9a", "query_hash": "ab" * 64, "query_hash_alg": "SHA512"},
+    ]
+
+    for payload in payloads:
+        assert signer.sign(payload) == JWT().encode(payload, key=key), f"token differs for {payload}"
+
+
+@check("backtest")
+def parameter_sweep_workers() -> None:
+    # 현재 프로세스에서 실행한 결과와 여러 프로세스로 나눈 결과가 같은지 확인
+    start, end = "2021-08-01T00:00", "2023-08-01T00:00"
+    data = make_model(start=start, end=end, interval="HOUR").data[["time_period_start", "price_close"]]
+    sweep = ParameterSweep(data, Duration(start=start, end=end, interval="HOUR"))
+
+    single = sweep.run(MAL_days=[5, 20, 60], cross_durations=[1, 3], workers=1)
+    multi = sweep.run(MAL_days=[5, 20, 60], cross_durations=[1, 3], workers=max(2, os.cpu_count() or 1))
+
+    pd.testing.assert_frame_equal(single, multi, check_exact=True)
+
+
+def measure(fn: Callable[[], object], min_time: float, min_rounds: int, max_rounds: int) -> Dict[str, float]:
+    '''
+    fn을 한 번 실행하여 준비한 뒤, min_time초가 지나거나 max_rounds번이 될 때까지(최소 min_rounds번) 실행 시간을 잽니다.
+    '''
+
+    fn()
+
+    timings: List[float] = []
+    total = 0.0
+
+    while len(timings) < max_rounds and (len(timings) < min_rounds or total < min_time):
+        start = perf_counter()
+        fn()
+        elapsed = perf_counter() - start
+
+        timings.append(elapsed)
+        total += elapsed
+
+    q1, _, q3 = quantiles(timings, n=4) if len(timings) > 1 else (timings[0], None, timings[0])
+
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": mean(timings),
+        "stddev": stdev(timings) if len(timings) > 1 else 0.0,
+        "median": median(timings),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "rounds": len(timings),
+        "total": total,
+        "ops": 1 / mean(timings),
+    }
+
+
+def machine_info() -> Dict:
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def commit_info() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout != ""
+    except (OSError, subprocess.CalledProcessError):
+        return {"id": None, "dirty": None}
+
+    return {"id": commit, "dirty": dirty}
+
+
+def run_checks(keyword: str | None=None) -> List[str]:
+    '''
+    등록된 확인 항목들을 실행하고, 결과가 기준 구현과 달랐던 항목들의 이름을 반환합니다.
+
+    Args
+    ----
+    keyword: str | None=None, 지정된 경우 "그룹/이름"에 keyword가 들어간 항목만 실행합니다.
+    '''
+
+    failures = []
+
+    for group, name, fn in CHECKS:
+        fullname = f"{group}/{name}"
+
+        if keyword is not None and keyword not in fullname:
+            continue
+
+        try:
+            fn()
+        except AssertionError as e:
+            failures.append(fullname)
+            print(f"{fullname:40s} FAILED  {e}", file=sys.stderr)
+        else:
+            print(f"{fullname:40s} ok", file=sys.stderr)
+
+    return failures
+
+
+def run(keyword: str | None=None, min_time: float=1.0, min_rounds: int=3, max_rounds: int=1000) -> Dict:
+    '''
+    등록된 항목들을 실행하고 결과를 JSON으로 쓸 수 있는 dict로 반환합니다.
+
+    Args
+    ----
+    keyword: str | None=None, 지정된 경우 "그룹/이름"에 keyword가 들어간 항목만 실행합니다.
+    min_time: float=1.0, 항목마다 측정할 최소 시간(초)
+    min_rounds: int=3, 항목마다 측정할 최소 횟수
+    max_rounds: int=1000, 항목마다 측정할 최대 횟수
+    '''
+
+    benchmarks = []
+
+    for group, name, setup in CASES:
+        fullname = f"{group}/{name}"
+
+        if keyword is not None and keyword not in fullname:
+            continue
+
+        with ExitStack() as stack:
+            stats = measure(setup(stack), min_time, min_rounds, max_rounds)
+
+        benchmarks.append({"group": group, "name": name, "fullname": fullname, "stats": stats})
+        print(f"{fullname:40s} median {stats['median'] * 1e3:10.3f} ms  min {stats['min'] * 1e3:10.3f} ms  rounds {stats['rounds']:5d}", file=sys.stderr)
+
+    return {
+        "machine_info": machine_info(),
+        "commit_info": commit_info(),
+        "datetime": datetime.now(timezone.utc).isoformat(),
+        "version": 1,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    '''
+    baseline보다 중앙값이 (1 + threshold)배 넘게 느려진 항목들의 이름을 반환합니다.
+    '''
+
+    previous = {benchmark["fullname"]: benchmark["stats"]["median"] for benchmark in baseline["benchmarks"]}
+    regressions = []
+
+    for benchmark in result["benchmarks"]:
+        before = previous.get(benchmark["fullname"])
+
+        if before is None:
+            continue
+
+        ratio = benchmark["stats"]["median"] / before
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{benchmark['fullname']:40s} {before * 1e3:10.3f} ms -> {benchmark['stats']['median'] * 1e3:10.3f} ms  {ratio:6.2f}x {flag}", file=sys.stderr)
+
+        if flag:
+            regressions.append(benchmark["fullname"])
+
+    return regressions
+
+
+def main(argv: List[str] | None=None) -> int:
+    parser = argparse.ArgumentParser(description="BTEM hot path benchmarks")
+    parser.add_argument("-k", "--keyword", default=None, help='"그룹/이름"에 이 문자열이 들어간 항목만 실행')
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 경로, '-'이면 표준 출력")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.2, help="성능 저하로 판단할 중앙값 증가율(기본 0.2 = 20%%)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="항목마다 측정할 최소 시간(초)")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    parser.add_argument("--check", action="store_true", help="측정하지 않고 확인 항목만 실행")
+    args = parser.parse_args(argv)
+
+    failures = run_checks(args.keyword)
+
+    if len(failures) != 0:
+        print(f"{len(failures)} check(s) failed: {', '.join(failures)}", file=sys.stderr)
+        return 1
+
+    if args.check:
+        return 0
+
+    result = run(args.keyword, args.min_time, args.min_rounds, args.max_rounds)
+
+    if args.json == "-":
+        json.dump(result, sys.stdout, indent=2)
+    elif args.json is not None:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+
+        if len(regressions) != 0:
+            print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
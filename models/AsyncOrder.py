@@ -0,0 +1,202 @@
+from typing import Dict, List, Literal, Tuple
+
+import asyncio
+from time import perf_counter
+
+import aiohttp
+
+from RequestManager.AsyncRequestManager import AsyncRequestManager
+from .Order import Order, OrderRequest
+
+
+class AsyncOrder():
+    '''
+    Order의 asyncio 버전입니다.
+
+    주문은 크기가 정해진 큐에 들어가고, max_in_flight개의 작업자가 큐에서 꺼내 동시에 전송합니다.
+    큐가 가득 차면 submit()이 자리가 날 때까지 기다리므로 서버로 보내는 주문이 한없이 쌓이지 않습니다.
+    검증/직렬화, 헤더 생성, hooks는 감싸고 있는 Order의 것을 그대로 사용합니다.
+
+
+    예제
+    ----
+
+    >> async with AsyncOrder(max_in_flight=4) as order:
+    ...     request = order.prepare("bid", funds=10_000, signal_time=signal_time)
+    ...     result = await order.submit(request)
+    '''
+
+
+    def __init__(self, order: Order | None=None, max_in_flight: int=4, queue_size: int=64) -> None:
+        '''
+        Args
+        ----
+        order: Order | None=None, 검증/헤더 생성/hooks를 공유할 Order, None인 경우 새로 만듭니다.
+        max_in_flight: int=4, 동시에 전송 중일 수 있는 최대 주문 수
+        queue_size: int=64, 전송을 기다릴 수 있는 최대 주문 수
+
+        Raises
+        ------
+        ValueError: max_in_flight 또는 queue_size가 1보다 작은 경우 발생합니다.
+        '''
+
+        if max_in_flight < 1 or queue_size < 1:
+            raise ValueError("max_in_flight, queue_size must be 1 or upper.")
+
+        self.order = Order() if order is None else order
+        self.requestManager = AsyncRequestManager(self.order.requestManager, pool_maxsize=max_in_flight)
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+
+        self.__queue: asyncio.Queue | None = None
+        self.__workers: List[asyncio.Task] = []
+
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+    @property
+    def hooks(self):
+        return self.order.hooks
+
+
+    def start(self) -> None:
+        '''
+        전송 작업자들을 시작합니다. 실행 중인 이벤트 루프 안에서 호출해야 합니다.
+        '''
+
+        if self.__queue is not None:
+            return
+
+        self.__queue = asyncio.Queue(maxsize=self.queue_size)
+        self.__workers = [asyncio.create_task(self._worker()) for _ in range(self.max_in_flight)]
+
+
+    async def close(self) -> None:
+        '''
+        큐에 남은 주문을 모두 전송한 뒤 작업자와 연결을 정리합니다.
+        '''
+
+        if self.__queue is not None:
+            await self.__queue.join()
+
+            for worker in self.__workers:
+                worker.cancel()
+
+            await asyncio.gather(*self.__workers, return_exceptions=True)
+
+            self.__queue = None
+            self.__workers = []
+
+        await self.requestManager.close()
+
+
+    def prepare(self, order_type: Literal["bid", "ask"], **kwargs) -> OrderRequest:
+        '''
+        Order.prepare와 같습니다.
+        '''
+
+        return self.order.prepare(order_type, **kwargs)
+
+
+    async def enqueue(self, request: OrderRequest) -> asyncio.Future:
+        '''
+        주문을 큐에 넣고, 서버의 응답(주문 정보)이 담길 Future를 반환합니다.
+        큐가 가득 찬 경우 자리가 날 때까지 기다립니다.
+        '''
+
+        if self.__queue is None:
+            raise RuntimeError("AsyncOrder is not started, use start() or async with.")
+
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((request, future))
+
+        return future
+
+
+    async def submit(self, request: OrderRequest) -> Dict:
+        '''
+        주문을 큐에 넣고 서버의 응답을 기다립니다. Order.submit과 같이 실패하더라도 다시 보내지 않습니다.
+
+        Raises
+        ------
+        CircuitOpenError: upbit의 회로 차단기가 열려 있는 경우 발생합니다.
+        aiohttp.ClientError, asyncio.TimeoutError: 연결에 실패했거나 Order.timeout초 안에 응답이 없는 경우 발생합니다. 주문이 들어갔을 수 있으므로 주문 내역을 확인해야 합니다.
+        RuntimeError: 서버가 주문을 받아들이지 않은 경우 발생합니다.
+
+        Returns
+        -------
+        Dict, 서버가 돌려준 주문 정보
+        '''
+
+        return await (await self.enqueue(request))
+
+
+    async def order_now(
+            self,
+            order_type: Literal["bid", "ask"],
+            volume: float=0.01,
+            method: Literal["market_price"]|float="market_price",
+            funds: float | None=None,
+            market: str="KRW-BTC",
+            ) -> Dict:
+        '''
+        Order.order의 asyncio 버전입니다.
+        '''
+
+        return await self.submit(self.prepare(order_type, volume=volume, method=method, funds=funds, market=market))
+
+
+    async def _worker(self) -> None:
+        while True:
+            request, future = await self.__queue.get()
+
+            try:
+                result = await self._send(request)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.__queue.task_done()
+
+
+    async def _send(self, request: OrderRequest) -> Dict:
+        # Order.submit과 같이 회로 차단기를 확인하고 결과를 기록하되 재시도하지 않음
+        url = self.order.url
+        policy = self.order.requestManager.retry_policy
+        metrics = self.order.requestManager.metrics
+        source = policy.source(url)
+
+        policy.admit(source, metrics)
+        waited = await self.requestManager.rate_limiter.acquire_async(url, "POST")
+
+        headers = self.order.headers(request)
+        request.timing.submitted = perf_counter()
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.order.timeout)
+
+            async with self.requestManager.session(url).post(url, data=request.body, headers=headers, timeout=timeout) as response:
+                content = await response.read()
+                request.timing.acked = perf_counter()
+
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            policy.decide(source, 0, False, error=e, metrics=metrics)
+            raise
+
+        self.requestManager.rate_limiter.update(url, response.status, response.headers, "POST")
+        policy.decide(source, 0, False, response.status, metrics=metrics)
+
+        if metrics.enabled:
+            self.order.requestManager._record(url, "POST", response.status, request.timing.acked - request.timing.submitted, waited, len(content))
+
+        return self.order._finish(request, response.status, response.reason or "", content)
@@ -1,13 +1,182 @@
 from DataFetcher.DataFetcher import DataFetcher
 from DataFetcher.Duration import Duration
+from DataFetcher.Candles import Candles
+from RequestManager.Metrics import Metrics
 
-from typing import Iterable
+from typing import Dict, Iterable, Tuple
+from collections import deque
+import math
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 from dateutil.parser import isoparse
 
 from .AbstractModel import BasicModel
 
+
+class RollingMean():
+    '''
+    pandas의 Series.rolling(window).mean()과 같은 값을, 값이 하나 들어올 때마다 O(1)로 구합니다.
+
+    pandas와 같은 Kahan 합산(더하기/빼기 보정값을 따로 유지), 같은 값 반복 처리, 부호 보정을 그대로 따르므로
+    같은 값들을 넣으면 비트 단위까지 같은 결과가 나옵니다.
+    '''
+
+
+    def __init__(self, window: int) -> None:
+        if window < 1:
+            raise ValueError("window must be 1 or upper.")
+
+        self.window = window
+        self.values: deque = deque()
+        self._reset()
+
+
+    def _reset(self) -> None:
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_count = 0
+        self.prev_value: float | None = None
+
+
+    def update(self, value: float) -> float:
+        '''
+        값을 하나 추가하고, 추가된 값으로 끝나는 구간의 평균을 반환합니다. 구간이 다 차지 않았다면 NaN입니다.
+        '''
+
+        value = float(value)
+        self.values.append(value)
+
+        # 구간 크기가 1이면 pandas는 매번 새로 계산함
+        if self.window == 1:
+            self._reset()
+            if len(self.values) > 1:
+                self.values.popleft()
+
+        # 구간을 벗어난 값 빼기
+        elif len(self.values) > self.window:
+            old = self.values.popleft()
+
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum_x + y
+                self.compensation_remove = t - self.sum_x - y
+                self.sum_x = t
+
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        # 새 값 더하기, NaN은 무시
+        if self.prev_value is None:
+            self.prev_value = value
+
+        if value == value:
+            self.nobs += 1
+            y = value - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+
+            self.same_count = self.same_count + 1 if value == self.prev_value else 1
+            self.prev_value = value
+
+        if self.nobs < self.window:
+            return math.nan
+
+        result = self.sum_x / self.nobs
+
+        if self.same_count >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+
+        return result
+
+
+def rolling_means(values: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    '''
+    pd.DataFrame(values).rolling(window).mean()을 여러 구간 크기에 대해 구합니다.
+
+    구간 크기마다 모든 열(심볼)을 pandas의 rolling 한 번으로 계산하며, add_mal()과 같은 계산이므로
+    심볼 하나의 결과는 같은 종가로 구한 add_mal()의 이동 평균과 비트 단위까지 같습니다.
+
+    Args
+    ----
+    values: np.ndarray, 시간 순서대로 정렬된 (시간,) 또는 (시간 × 심볼) 배열, NaN이 들어간 구간의 평균은 NaN입니다.
+    windows: Iterable[int], 구간 크기들
+
+    Raises
+    ------
+    ValueError: 구간 크기가 1보다 작은 경우 발생합니다.
+
+    Returns
+    -------
+    means: np.ndarray, (구간 크기 수,) + values.shape 배열, 구간이 다 차지 않은 시점은 NaN입니다.
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    windows = list(windows)
+
+    if any(window < 1 for window in windows):
+        raise ValueError("window must be 1 or upper.")
+
+    frame = pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+    result = np.empty((len(windows),) + values.shape)
+
+    for i, window in enumerate(windows):
+        result[i] = frame.rolling(window=window).mean().to_numpy()
+
+    return result
+
+
+def cross_signal(short: np.ndarray, long: np.ndarray, duration_index: int) -> np.ndarray:
+    '''
+    MAL_model.predict_all()의 계산을 배열에 대해 수행합니다. 2차원 배열(시간 × 심볼)은 열마다 시간 축(axis 0)을 따라 계산합니다.
+
+    시점 i의 결과는 [i - duration_index, i) 구간에서 short > long인 횟수가 과반인지 여부이며,
+    구간이 비었거나 직전 데이터가 duration_index개보다 적은 시점은 False입니다.
+
+    Args
+    ----
+    short: np.ndarray, 단기 이동 평균
+    long: np.ndarray, 장기 이동 평균
+    duration_index: int, 판단 구간의 길이(days_weight * cross_duration - 1)
+
+    Returns
+    -------
+    prediction: np.ndarray[bool], short와 같은 모양의 시점별 매수 여부
+    '''
+
+    # NaN과의 비교는 False
+    above = short > long
+
+    # 구간이 비어 있다면 항상 False
+    if duration_index <= 0:
+        return np.zeros(above.shape, dtype=bool)
+
+    above_count = np.concatenate((np.zeros((1,) + above.shape[1:], dtype=np.int64), np.cumsum(above, axis=0, dtype=np.int64)))
+
+    index = np.arange(len(above))
+    start = index - duration_index
+    valid = start >= 0
+    start = np.maximum(start, 0)
+
+    # 구간 안에서 True가 과반인 경우에만 매수, 같은 빈도라면 False
+    result = 2 * (above_count[index] - above_count[start]) > duration_index
+    result[~valid] = False
+
+    return result
+
+
 class MAL_model(BasicModel):
     '''
     이동평균선을 기반으로 한 예측 모델입니다.
@@ -16,39 +185,39 @@ class MAL_model(BasicModel):
     '''
     def __init__(
             self,
-            data: pd.DataFrame,
+            data: pd.DataFrame | Candles,
             duration: Duration,
             moving_avr_interval_days: Iterable[int]=[5, 20, 60, 120, 240],
             target_label: str="price_close",
             timestamp_label: str="time_period_start",
+            metrics: Metrics | None=None,
             ) -> None:
         '''
         MAL_model 인스턴스를 생성합니다.
 
         Args
         ----
-        data: pd.DataFrame, 데이터
-        duration: Duration, 데이터의 시간 간격을 담은 Duration 객체
+        data: pd.DataFrame | Candles, 데이터, Candles인 경우 데이터프레임으로 변환합니다.
+        duration: Duration, 데이터의 시간 간격을 담은 Duration 객체, 간격은 하루를 나누어떨어지게 해야 합니다(1MIN ~ 12HRS, 1DAY).
         moving_avr_interval_days: Iterable[int]=[5, 10, 60, 120, 240], 구할 이동평균의 간격들
         target_label: str="price_close", 이동평균을 구할 라벨
         timestamp_label: str="time_period_start", 데이터의 타임스탬프 라벨
+        metrics: Metrics | None=None, 이동 평균과 신호 계산 시간을 기록할 계측기, None인 경우 Metrics.shared()를 사용합니다.
 
         Raises
         ------
-        ValueError: 데이터셋에 라벨이 존재하지 않거나 충분하지 않은 길이의 데이터셋인 경우 발생합니다.
+        ValueError: 데이터셋에 라벨이 존재하지 않거나, 충분하지 않은 길이의 데이터셋이거나, 지원하지 않는 시간 간격인 경우 발생합니다.
 
         Returns
         -------
         None
         '''
 
-        # 데이터셋의 시간 간격 파악
-        if duration.interval == timedelta(hours=1):
-            self.days_weight = 24
-        elif duration.interval == timedelta(days=1):
-            self.days_weight = 1
-        else:
-            raise ValueError("데이터셋의 시간 단위가 1HOUR, 1DAY인 경우에만 사용할 수 있습니다.")
+        # 데이터셋의 시간 간격 파악, 하루에 들어가는 캔들 수를 이동 평균 구간의 단위로 사용
+        self.days_weight = self.periods_per_day(duration)
+
+        if isinstance(data, Candles):
+            data = data.to_frame()
 
 
         # 데이터셋의 최대 시간 간격 파악
@@ -66,14 +235,111 @@ class MAL_model(BasicModel):
         if timestamp_label not in data.keys():
             raise ValueError(f"{timestamp_label}이 데이터셋에 없습니다.")
 
+        # 데이터의 timezone, timezone이 없는 값(데이터, target_time)은 이 timezone의 시각으로 간주
+        self.timezone = self._timezone(data[timestamp_label])
+
+        # 타임스탬프를 UTC 기준 정수(ns)로 바꾸어 시간순 오름차순 정렬, 인덱스는 0부터 다시 매김
+        timestamps = self._to_ns(data[timestamp_label], self.timezone)
+        order = np.argsort(timestamps, kind="stable")
+
         self.moving_avr_interval_days = moving_avr_interval_days
-        self.data = data.sort_values(by=timestamp_label)    # 시간순 오름차순 정렬
+        self.data = data.iloc[order].reset_index(drop=True)
+        self.timestamps = timestamps[order]     # 정렬된 타임스탬프, 이진 탐색에 사용
         self.target_label = target_label
         self.timestamp_label = timestamp_label
+        self.metrics = Metrics.shared() if metrics is None else metrics
+
+        # update()로 받은 캔들의 상태, 이동 평균 상태와 최근 이동 평균 값만 유지
+        self._rolling: Dict[str, RollingMean] | None = None
+        self._stream_history: Dict[str, deque] = {}
+        self._stream_last = int(self.timestamps[-1]) if len(self.timestamps) != 0 else None
+        self._stream_key: Tuple[str, str, int] | None = None
 
         return
 
 
+    @staticmethod
+    def periods_per_day(duration: Duration) -> int:
+        '''
+        하루에 들어가는 캔들 수를 반환합니다. e.g. 1DAY -> 1, 1HRS -> 24, 5MIN -> 288
+
+        Raises
+        ------
+        ValueError: 간격이 하루를 나누어떨어지게 하지 않는 경우(e.g. 2DAY, 1MTH) 발생합니다.
+        '''
+
+        interval = duration.interval
+
+        if not isinstance(interval, timedelta) or interval > timedelta(days=1) or timedelta(days=1) % interval != timedelta(0):
+            raise ValueError(f"데이터셋의 시간 단위가 하루를 나누어떨어지게 하는 경우(1MIN ~ 12HRS, 1DAY)에만 사용할 수 있습니다. 입력: {duration.period_id}")
+
+        return timedelta(days=1) // interval
+
+
+    @staticmethod
+    def _timezone(time):
+        # timezone이 있는 datetime 열이라면 그 timezone, 그 외(문자열, timezone이 없는 datetime)에는 UTC
+        timezone = getattr(pd.Series(time).dtype, "tz", None)
+        return "UTC" if timezone is None else timezone
+
+
+    @staticmethod
+    def _to_ns(time, timezone="UTC") -> np.ndarray:
+        # 문자열/datetime 모두 UTC 기준 정수(ns)로 변환, timezone이 없는 값은 timezone의 시각으로 간주
+        times = pd.Series(time).reset_index(drop=True)
+
+        try:
+            times = pd.to_datetime(times, format="ISO8601")
+        except ValueError:
+            # UTC 오프셋이 서로 다른 문자열이 섞인 경우
+            times = pd.to_datetime(times, utc=True, format="ISO8601")
+
+        if times.dt.tz is None:
+            times = times.dt.tz_localize(timezone)
+
+        return times.dt.tz_convert("UTC").dt.as_unit("ns").to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+    def _to_timestamp(self, time) -> int:
+        # 시점 하나를 UTC 기준 정수(ns)로 변환, timezone이 없는 값은 데이터의 timezone으로 간주
+        timestamp = pd.Timestamp(time)
+        return (timestamp if timestamp.tzinfo is not None else timestamp.tz_localize(self.timezone)).value
+
+
+    def locate(self, target_time, asof: bool=False) -> int:
+        '''
+        target_time에 해당하는 행의 위치를 이진 탐색으로 찾습니다.
+
+        Args
+        ----
+        target_time: str | datetime | pd.Timestamp, 찾을 시점, timezone이 없다면 데이터의 timezone(e.g. Asia/Seoul) 기준 시각으로 간주합니다.
+        asof: bool=False, True인 경우 target_time과 같거나 이전인 가장 최근 행의 위치를 반환합니다.
+
+        Raises
+        ------
+        ValueError: 해당하는 행이 없는 경우 발생합니다.
+
+        Returns
+        -------
+        index: int, self.data에서의 행 위치
+        '''
+
+        target = self._to_timestamp(target_time)
+
+        if asof:
+            index = int(np.searchsorted(self.timestamps, target, side="right")) - 1
+
+            if index < 0:
+                raise ValueError(f"{target_time} 이전의 데이터가 타임스탬프 라벨 {self.timestamp_label}에 없습니다.")
+
+            return index
+
+        index = int(np.searchsorted(self.timestamps, target, side="left"))
+
+        if index == len(self.timestamps) or self.timestamps[index] != target:
+            raise ValueError(f"{target_time}이 타임스탬프 라벨 {self.timestamp_label}에 없습니다.")
+
+        return index
 
 
     def add_mal(self, inplace: bool=False) -> pd.DataFrame:
@@ -102,13 +368,14 @@ class MAL_model(BasicModel):
 
 
         for day in self.moving_avr_interval_days:
-            moving_avr = data[self.target_label].rolling(window=day * self.days_weight).mean()
-            data[f"MAL_{day}DAY"] = moving_avr
+            with self.metrics.timer("indicator_seconds", indicator=f"MAL_{day}DAY"):
+                moving_avr = data[self.target_label].rolling(window=day * self.days_weight).mean()
+                data[f"MAL_{day}DAY"] = moving_avr
 
         return data
     
 
-    def predict(self, target_time: str|None=None, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3) -> bool:
+    def predict(self, target_time: str|None=None, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3, asof: bool=False) -> bool:
         '''
         장기 이동 평균과 단기 이동 평균의 교차 여부를 기반으로 매수 여부를 추측합니다.
 
@@ -118,6 +385,7 @@ class MAL_model(BasicModel):
         MAL_short: str="MAL_5DAY", 단기 이동 평균을 선택합니다.
         MAL_short: str="MAL_20DAY", 장기 이동 평균을 선택합니다.
         cross_duration: int=3, 매수 여부 추측을 위해, 단기 이동 평균이 장기 이동 평균보다 몇일동안 더 커야 하는지를 결정합니다.
+        asof: bool=False, True인 경우 target_time이 캔들 사이에 있다면 직전 캔들을 기준으로 예측합니다.
 
         Raises
         ------
@@ -136,10 +404,7 @@ class MAL_model(BasicModel):
         
         # 예측 시점의 인덱스 구하기
         if target_time is not None:
-            if not (self.data[self.timestamp_label] == target_time).any():
-                raise ValueError(f"{target_time}이 타임스탬프 라벨 {self.timestamp_label}에 없습니다.")
-
-            index = self.data[self.data[self.timestamp_label] == target_time].index[0]
+            index = self.locate(target_time, asof=asof)
 
             if index - cross_duration < 0:
                 raise ValueError(f"{target_time} 이전 데이터가 {cross_duration}개보다 적습니다.")
@@ -149,11 +414,319 @@ class MAL_model(BasicModel):
             index = len(self.data)
 
         duration_index = self.days_weight * cross_duration - 1
-        prediction = (self.data[MAL_short][index - duration_index : index] > self.data[MAL_long][index - duration_index : index]).mode()
+        above = self.data[MAL_short].to_numpy()[index - duration_index : index] > self.data[MAL_long].to_numpy()[index - duration_index : index]
 
-        # 같은 빈도를 가진다면 False로 예측
-        if len(prediction) != 1:
-            return False
-        
+        # 더 많이 나온 쪽으로 예측, 같은 빈도를 가진다면 False로 예측
+        return bool(2 * np.count_nonzero(above) > len(above))
+
+
+    def predict_all(self, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3) -> np.ndarray:
+        '''
+        데이터셋의 모든 시점에 대해 predict()의 매수 여부를 한 번에 구합니다.
+
+        시점 i의 결과는 predict(target_time=i번째 타임스탬프)와 같으며,
+        단기 이동 평균이 장기 이동 평균보다 큰 횟수의 누적합으로 모든 구간을 한 번에 계산합니다.
+        직전 데이터가 구간 길이(days_weight * cross_duration - 1)보다 적은 시점은 False입니다.
+
+        Args
+        ----
+        MAL_short: str="MAL_5DAY", 단기 이동 평균을 선택합니다.
+        MAL_long: str="MAL_20DAY", 장기 이동 평균을 선택합니다.
+        cross_duration: int=3, 매수 여부 추측을 위해, 단기 이동 평균이 장기 이동 평균보다 몇일동안 더 커야 하는지를 결정합니다.
+
+        Raises
+        ------
+        ValueError: 데이터셋에 라벨이 존재하지 않는 경우 발생합니다.
+
+        Returns
+        -------
+        prediction: np.ndarray[bool], self.data의 행 순서와 같은 순서의 매수 여부 배열입니다.
+        '''
+
+
+        # 라벨 검증
+        if MAL_short not in self.data.keys() or MAL_long not in self.data.keys():
+            raise ValueError(f"{MAL_short} 또는 {MAL_long}이 데이터셋에 없습니다. add_mal(inplace=True)로 데이터를 먼저 추가하세요.")
+
+        with self.metrics.timer("signal_seconds", method="predict_all"):
+            return cross_signal(
+                self.data[MAL_short].to_numpy(dtype=np.float64),
+                self.data[MAL_long].to_numpy(dtype=np.float64),
+                self.days_weight * cross_duration - 1,
+            )
+
+
+    def update(self, candle, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3) -> Tuple[Dict[str, float], bool]:
+        '''
+        새 캔들 하나를 받아 이동 평균과 매수 여부를 갱신합니다.
+
+        이동 평균마다 RollingMean을 유지하므로 캔들 하나당 O(이동 평균 개수)로 계산되며,
+        결과는 add_mal()과 predict(target_time=None)을 새 캔들까지 포함한 데이터에 적용한 것과 같습니다.
+        첫 호출에만 기존 데이터로 이동 평균 상태를 만들고, 이후에는 라벨별로 최근 max(이동 평균 구간)개의 값만 유지합니다.
+        MAL_short, MAL_long, cross_duration이 바뀐 경우 유지 중인 최근 값으로 교차 구간만 다시 만듭니다.
+        받은 캔들은 self.data에 추가되지 않습니다.
+
+        Args
+        ----
+        candle: dict | pd.Series, target_label과 timestamp_label을 가진 새 캔들
+        MAL_short: str="MAL_5DAY", 단기 이동 평균을 선택합니다.
+        MAL_long: str="MAL_20DAY", 장기 이동 평균을 선택합니다.
+        cross_duration: int=3, 매수 여부 추측을 위해, 단기 이동 평균이 장기 이동 평균보다 몇일동안 더 커야 하는지를 결정합니다.
+
+        Raises
+        ------
+        ValueError: 이동 평균 라벨이 설정에 없거나, 교차 구간(days_weight * cross_duration - 1)이 가장 긴 이동 평균 구간보다 길거나,
+                    캔들이 마지막 캔들과 같거나 이전 시점인 경우 발생합니다.
+
+        Returns
+        -------
+        (values, prediction): Tuple[Dict[str, float], bool], 라벨별 이동 평균 값과 매수 여부
+        '''
+
+        # timezone이 없는 값은 데이터의 timezone으로 간주
+        timestamp = self._to_timestamp(candle[self.timestamp_label])
+
+        if self._stream_last is not None and timestamp <= self._stream_last:
+            raise ValueError(f"{candle[self.timestamp_label]}은 마지막 캔들과 같거나 이전 시점입니다.")
+
+        key = (MAL_short, MAL_long, cross_duration)
+
+        if self._stream_key != key:
+            self._init_stream(key)
+
+        value = float(candle[self.target_label])
+        self._stream_last = timestamp
+
+        with self.metrics.timer("signal_seconds", method="update"):
+            return self._push(value)
+
+
+    def _init_rolling(self) -> None:
+        # 이동 평균 상태는 MAL_short, MAL_long, cross_duration과 무관하므로 기존 데이터로 한 번만 만듦
+        self._rolling = {f"MAL_{day}DAY": RollingMean(day * self.days_weight) for day in self.moving_avr_interval_days}
+
+        # 교차 구간을 다시 만들 때 쓰는 라벨별 최근 이동 평균 값
+        history = max(rolling.window for rolling in self._rolling.values())
+        self._stream_history = {name: deque(maxlen=history) for name in self._rolling}
+
+        for value in self.data[self.target_label].to_numpy(dtype=np.float64).tolist():
+            self._roll(value)
+
+
+    def _init_stream(self, key: Tuple[str, str, int]) -> None:
+        MAL_short, MAL_long, cross_duration = key
+
+        if self._rolling is None:
+            self._init_rolling()
+
+        if MAL_short not in self._rolling or MAL_long not in self._rolling:     # type: ignore
+            raise ValueError(f"{MAL_short} 또는 {MAL_long}이 이동 평균 설정({list(self._rolling.keys())})에 없습니다.")  # type: ignore
+
+        window = max(self.days_weight * cross_duration - 1, 0)
+        history = self._stream_history[MAL_short].maxlen
+
+        if window > history:    # type: ignore
+            raise ValueError(f"교차 구간({window})이 유지 중인 이동 평균 값의 수({history})보다 깁니다. cross_duration을 줄이세요.")
+
+        # 최근 window개 캔들의 (단기 > 장기) 여부와 그 개수, NaN과의 비교는 False
+        start = max(len(self._stream_history[MAL_short]) - window, 0)
+        shorts = list(self._stream_history[MAL_short])[start:]
+        longs = list(self._stream_history[MAL_long])[start:]
+
+        self._stream_key = key
+        self._stream_window = window
+        self._stream_above: deque = deque(short > long for short, long in zip(shorts, longs))
+        self._stream_above_count = sum(self._stream_above)
+
+
+    def _roll(self, value: float) -> Dict[str, float]:
+        values = {name: rolling.update(value) for name, rolling in self._rolling.items()}  # type: ignore
+
+        for name, mean in values.items():
+            self._stream_history[name].append(mean)
+
+        return values
+
+
+    def _push(self, value: float) -> Tuple[Dict[str, float], bool]:
+        MAL_short, MAL_long, _ = self._stream_key   # type: ignore
+
+        values = self._roll(value)
+
+        if self._stream_window == 0:
+            return values, False
+
+        # NaN과의 비교는 False
+        above = values[MAL_short] > values[MAL_long]
+        self._stream_above.append(above)
+        self._stream_above_count += above
+
+        if len(self._stream_above) > self._stream_window:
+            self._stream_above_count -= self._stream_above.popleft()
+
+        # 구간이 다 차지 않았다면 False, 같은 빈도를 가진다면 False
+        if len(self._stream_above) < self._stream_window:
+            return values, False
+
+        return values, 2 * self._stream_above_count > self._stream_window
+
+
+
+class MAL_panel():
+    '''
+    여러 심볼의 종가(시간 × 심볼)에 대해 MAL_model과 같은 이동 평균과 매수 신호를 한 번에 구합니다.
+
+    MAL_model을 심볼마다 만들면 심볼마다 정렬, 복사, 데이터프레임 생성을 반복하지만,
+    MAL_panel은 이동 평균마다 모든 심볼을 rolling_means로 한 번에 구하고 cross_signal을 시간 축을 따라 적용합니다.
+    이동 평균은 add_mal()과 같은 pandas 계산이므로, 심볼 하나의 결과는 같은 종가로 만든 MAL_model의
+    add_mal(), predict_all(), predict()와 같습니다.
+
+
+    예제
+    ----
+
+    >> panel = dataFetcher.get_candle_panel(["KRW-BTC", "KRW-ETH", "KRW-XRP"], duration)
+    >> model = MAL_panel(panel["price_close"], duration)
+    >> model.add_mal()
+    >> signals = model.predict_all(cross_duration=3)    # 시간 × 심볼 매수 여부
+    >> model.predict(cross_duration=3)                   # 심볼별 최근 매수 여부
+    '''
+
+
+    def __init__(
+            self,
+            closes: np.ndarray | pd.DataFrame,
+            duration: Duration,
+            moving_avr_interval_days: Iterable[int]=[5, 20, 60, 120, 240],
+            metrics: Metrics | None=None,
+            ) -> None:
+        '''
+        Args
+        ----
+        closes: np.ndarray | pd.DataFrame, 시간 × 심볼 종가
+            - pd.DataFrame(e.g. get_candle_panel(...)["price_close"])인 경우 인덱스를 시간순으로 정렬하고, 결과에 인덱스와 열 이름을 붙입니다.
+            - np.ndarray인 경우 행이 시간 순서대로 정렬되어 있어야 합니다.
+        duration: Duration, 데이터의 시간 간격을 담은 Duration 객체, 간격은 하루를 나누어떨어지게 해야 합니다(1MIN ~ 12HRS, 1DAY).
+        moving_avr_interval_days: Iterable[int]=[5, 20, 60, 120, 240], 구할 이동평균의 간격들
+        metrics: Metrics | None=None, 이동 평균과 신호 계산 시간을 기록할 계측기, None인 경우 Metrics.shared()를 사용합니다.
+
+        Raises
+        ------
+        ValueError: 종가가 2차원이 아니거나, 충분하지 않은 길이의 데이터셋이거나, 지원하지 않는 시간 간격인 경우 발생합니다.
+        '''
+
+        self.days_weight = MAL_model.periods_per_day(duration)
+
+        # 데이터셋의 최대 시간 간격 파악
+        max_interval = duration.end - duration.start
+        moving_avr_interval_days = [day for day in moving_avr_interval_days if timedelta(days=day) < max_interval]
+
+        if len(moving_avr_interval_days) == 0:
+            raise ValueError("최소 5일 동안의 데이터가 있어야 이동평균선을 구할 수 있습니다.")
+
+        if isinstance(closes, pd.DataFrame):
+            closes = closes.sort_index(kind="stable")
+            self.index, self.symbols = closes.index, closes.columns
+            closes = closes.to_numpy(dtype=np.float64, na_value=np.nan)
         else:
-            return prediction[0]
+            self.index, self.symbols = None, None
+            closes = np.asarray(closes, dtype=np.float64)
+
+        if closes.ndim != 2:
+            raise ValueError(f"closes must be 2-D (time × symbol). input shape is {closes.shape}")
+
+        self.moving_avr_interval_days = moving_avr_interval_days
+        self.closes = closes
+        self.metrics = Metrics.shared() if metrics is None else metrics
+
+        # 라벨(e.g. "MAL_5DAY")별 시간 × 심볼 이동 평균, add_mal()로 채움
+        self.mal: Dict[str, np.ndarray] = dict()
+
+        return
+
+
+    def add_mal(self) -> Dict[str, np.ndarray]:
+        '''
+        모든 심볼의 이동 평균을 한 번에 구해 self.mal에 저장합니다.
+
+        Returns
+        -------
+        mal: Dict[str, np.ndarray], 라벨(e.g. "MAL_5DAY")별 시간 × 심볼 이동 평균
+        '''
+
+        days = self.moving_avr_interval_days
+
+        with self.metrics.timer("indicator_seconds", indicator="MAL_panel"):
+            means = rolling_means(self.closes, [day * self.days_weight for day in days])
+
+        self.mal = {f"MAL_{day}DAY": mean for day, mean in zip(days, means)}
+        return self.mal
+
+
+    def _check_labels(self, MAL_short: str, MAL_long: str) -> None:
+        if MAL_short not in self.mal or MAL_long not in self.mal:
+            raise ValueError(f"{MAL_short} 또는 {MAL_long}이 없습니다. add_mal()로 이동 평균을 먼저 구하세요.")
+
+
+    def predict_all(self, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3) -> np.ndarray | pd.DataFrame:
+        '''
+        모든 시점, 모든 심볼에 대해 MAL_model.predict_all()의 매수 여부를 한 번에 구합니다.
+
+        Args
+        ----
+        MAL_short: str="MAL_5DAY", 단기 이동 평균을 선택합니다.
+        MAL_long: str="MAL_20DAY", 장기 이동 평균을 선택합니다.
+        cross_duration: int=3, 매수 여부 추측을 위해, 단기 이동 평균이 장기 이동 평균보다 몇일동안 더 커야 하는지를 결정합니다.
+
+        Raises
+        ------
+        ValueError: 이동 평균을 구하지 않은 경우 발생합니다.
+
+        Returns
+        -------
+        prediction: np.ndarray[bool] | pd.DataFrame, 시간 × 심볼 매수 여부, closes가 데이터프레임이었다면 같은 인덱스와 열 이름을 가진 데이터프레임입니다.
+        '''
+
+        self._check_labels(MAL_short, MAL_long)
+
+        with self.metrics.timer("signal_seconds", method="panel_predict_all"):
+            prediction = cross_signal(self.mal[MAL_short], self.mal[MAL_long], self.days_weight * cross_duration - 1)
+
+        if self.index is None:
+            return prediction
+
+        return pd.DataFrame(prediction, index=self.index, columns=self.symbols)
+
+
+    def predict(self, MAL_short: str="MAL_5DAY", MAL_long: str="MAL_20DAY", cross_duration: int=3) -> np.ndarray | pd.Series:
+        '''
+        심볼마다 가장 최근 데이터까지를 기준으로 한 매수 여부(MAL_model.predict(target_time=None))를 구합니다. 종목 선별에 사용합니다.
+
+        Args
+        ----
+        MAL_short: str="MAL_5DAY", 단기 이동 평균을 선택합니다.
+        MAL_long: str="MAL_20DAY", 장기 이동 평균을 선택합니다.
+        cross_duration: int=3, 매수 여부 추측을 위해, 단기 이동 평균이 장기 이동 평균보다 몇일동안 더 커야 하는지를 결정합니다.
+
+        Raises
+        ------
+        ValueError: 이동 평균을 구하지 않은 경우 발생합니다.
+
+        Returns
+        -------
+        prediction: np.ndarray[bool] | pd.Series, 심볼별 매수 여부, closes가 데이터프레임이었다면 열 이름을 인덱스로 가진 시리즈입니다.
+        '''
+
+        self._check_labels(MAL_short, MAL_long)
+
+        duration_index = self.days_weight * cross_duration - 1
+        start = max(len(self.closes) - duration_index, 0)
+
+        # 최근 duration_index개 시점에서 더 많이 나온 쪽으로 예측, 같은 빈도를 가진다면 False로 예측
+        above = self.mal[MAL_short][start:] > self.mal[MAL_long][start:]
+        prediction = 2 * np.count_nonzero(above, axis=0) > len(above)
+
+        if self.symbols is None:
+            return prediction
+
+        return pd.Series(prediction, index=self.symbols)
@@ -0,0 +1,376 @@
+from typing import Any, Callable, Dict, List
+
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from DataFetcher.DataFetcher import DataFetcher
+from .Order import Order, OrderRequest
+
+
+class CacheEntry():
+    '''
+    TTLCache의 항목 하나입니다.
+    '''
+
+
+    def __init__(self, loader: Callable[[], Any], ttl: float) -> None:
+        self.loader = loader
+        self.ttl = ttl
+        self.value: Any = None
+        self.loaded_at: float | None = None
+        self.expires_at = 0.0
+        self.error: Exception | None = None
+        self.lock = Lock()
+
+
+class TTLCache():
+    '''
+    항목마다 유효 시간(TTL)을 두는 캐시입니다.
+
+    항목은 값을 불러오는 함수(loader)와 TTL로 등록하며, get()은 값이 유효하면 네트워크 없이 바로 돌려주고
+    만료된 경우에만 loader를 호출합니다. 같은 항목을 여러 스레드가 동시에 요청해도 loader는 한 번만 호출됩니다.
+    start()로 백그라운드 갱신을 켜면 한 번 이상 사용된 항목을 만료되기 전에 미리 다시 불러옵니다.
+    '''
+
+
+    def __init__(self) -> None:
+        self.__entries: Dict[str, CacheEntry] = dict()
+        self.__lock = Lock()
+        self.__stop = Event()
+        self.__thread: Thread | None = None
+
+
+    def register(self, key: str, loader: Callable[[], Any], ttl: float) -> None:
+        '''
+        항목을 등록합니다. 이미 등록된 항목이라면 loader와 TTL을 바꾸고 값을 무효화합니다.
+
+        Raises
+        ------
+        ValueError: ttl이 0 이하인 경우 발생합니다.
+        '''
+
+        if ttl <= 0:
+            raise ValueError("ttl must over 0.")
+
+        with self.__lock:
+            self.__entries[key] = CacheEntry(loader, ttl)
+
+
+    def register_default(self, key: str, loader: Callable[[], Any], ttl: float) -> bool:
+        '''
+        등록되지 않은 항목인 경우에만 등록합니다. 확인과 등록을 한 번에 하므로, 여러 스레드가 동시에 호출해도 항목은 한 번만 등록됩니다.
+
+        Raises
+        ------
+        ValueError: ttl이 0 이하인 경우 발생합니다.
+
+        Returns
+        -------
+        bool, 새로 등록한 경우 True
+        '''
+
+        if ttl <= 0:
+            raise ValueError("ttl must over 0.")
+
+        with self.__lock:
+            if key in self.__entries:
+                return False
+
+            self.__entries[key] = CacheEntry(loader, ttl)
+            return True
+
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+
+    def _entry(self, key: str) -> CacheEntry:
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            raise KeyError(f"{key} is not registered.")
+
+        return entry
+
+
+    def get(self, key: str) -> Any:
+        '''
+        항목의 값을 반환합니다. 값이 없거나 만료된 경우 loader로 다시 불러옵니다.
+
+        Raises
+        ------
+        KeyError: 등록되지 않은 항목인 경우 발생합니다.
+        '''
+
+        entry = self._entry(key)
+
+        if entry.loaded_at is not None and monotonic() < entry.expires_at:
+            return entry.value
+
+        with entry.lock:
+            # 기다리는 동안 다른 스레드가 불러왔다면 그 값을 사용
+            if entry.loaded_at is not None and monotonic() < entry.expires_at:
+                return entry.value
+
+            return self._load(entry)
+
+
+    def refresh(self, key: str) -> Any:
+        '''
+        유효 시간과 관계없이 항목을 다시 불러옵니다.
+        '''
+
+        entry = self._entry(key)
+
+        with entry.lock:
+            return self._load(entry)
+
+
+    def invalidate(self, *keys: str) -> None:
+        '''
+        항목들을 만료시켜 다음 get()에서 다시 불러오게 합니다. 아무 항목도 지정하지 않으면 모든 항목을 만료시킵니다.
+        '''
+
+        with self.__lock:
+            entries = list(self.__entries.values()) if len(keys) == 0 else [self.__entries[key] for key in keys if key in self.__entries]
+
+        for entry in entries:
+            entry.expires_at = 0.0
+
+
+    def age(self, key: str) -> float | None:
+        '''
+        항목을 마지막으로 불러온 뒤 지난 시간(초)을 반환합니다. 불러온 적이 없다면 None입니다.
+        '''
+
+        loaded_at = self._entry(key).loaded_at
+        return None if loaded_at is None else monotonic() - loaded_at
+
+
+    def _load(self, entry: CacheEntry) -> Any:
+        value = entry.loader()
+
+        now = monotonic()
+        entry.value = value
+        entry.loaded_at = now
+        entry.expires_at = now + entry.ttl
+        entry.error = None
+
+        return value
+
+
+    def start(self, interval: float=1.0, ahead: float=0.2) -> None:
+        '''
+        백그라운드 갱신을 시작합니다.
+
+        Args
+        ----
+        interval: float=1.0, 만료가 가까운 항목을 확인하는 간격(초)
+        ahead: float=0.2, TTL 중 이 비율만큼 남았을 때 미리 갱신합니다.
+        '''
+
+        if self.__thread is not None:
+            return
+
+        self.__stop.clear()
+        self.__thread = Thread(target=self._refresh_loop, args=(interval, ahead), daemon=True)
+        self.__thread.start()
+
+
+    def stop(self) -> None:
+        '''
+        백그라운드 갱신을 멈춥니다.
+        '''
+
+        if self.__thread is None:
+            return
+
+        self.__stop.set()
+        self.__thread.join()
+        self.__thread = None
+
+
+    def _refresh_loop(self, interval: float, ahead: float) -> None:
+        while not self.__stop.wait(interval):
+            with self.__lock:
+                entries = list(self.__entries.values())
+
+            for entry in entries:
+                # 사용된 적 없는 항목은 미리 불러오지 않음
+                if entry.loaded_at is None or monotonic() < entry.expires_at - entry.ttl * ahead:
+                    continue
+
+                # 다른 스레드가 불러오는 중이면 건너뜀
+                if not entry.lock.acquire(blocking=False):
+                    continue
+
+                try:
+                    self._load(entry)
+                except Exception as e:
+                    # 갱신에 실패하면 기존 값을 유지하고 다음 get()이나 다음 주기에 다시 시도
+                    entry.error = e
+                finally:
+                    entry.lock.release()
+
+
+class MetadataCache():
+    '''
+    주문 전 확인에 필요한 upbit 메타데이터(수수료, 최소 주문 금액, 마켓 코드, 잔고)의 캐시입니다.
+
+    주문 가능 정보(v1/orders/chance)와 잔고(v1/accounts)는 짧은 TTL로, 마켓 코드는 긴 TTL로 보관합니다.
+    attach=True인 경우 Order.hooks에 등록되어 주문이 접수될 때마다 해당 마켓의 잔고 관련 항목을 무효화합니다.
+    체결은 따로 받지 않으므로, 접수 뒤 나중에 체결되는 지정가 주문의 잔고 변화는 TTL이 지나야 반영됩니다.
+    주문 상태를 조회하거나 내 체결 스트림을 받는 쪽에서 체결을 확인했다면 invalidate(market)을 호출하여 바로 반영하세요.
+    백그라운드 갱신을 켜 두면 check()와 fee()는 네트워크 왕복 없이 캐시만 읽습니다.
+
+
+    예제
+    ----
+
+    >> metadata = MetadataCache(order)
+    >> metadata.start()
+    >> request = order.prepare("bid", funds=10_000)
+    >> metadata.check(request)
+    >> order.submit(request)
+    >> BackTest(data, signal, fee=metadata.fee("KRW-BTC")).run()
+    '''
+
+
+    def __init__(
+            self,
+            order: Order | None=None,
+            dataFetcher: DataFetcher | None=None,
+            chance_ttl: float=10.0,
+            accounts_ttl: float=5.0,
+            markets_ttl: float=3600.0,
+            attach: bool=True,
+            ) -> None:
+        '''
+        Args
+        ----
+        order: Order | None=None, 주문 가능 정보를 가져올 Order, None인 경우 새로 만듭니다.
+        dataFetcher: DataFetcher | None=None, 마켓 코드와 잔고를 가져올 DataFetcher, None인 경우 새로 만듭니다.
+        chance_ttl: float=10.0, 주문 가능 정보(수수료, 최소 주문 금액, 주문 가능 잔고)의 유효 시간(초)
+        accounts_ttl: float=5.0, 잔고의 유효 시간(초)
+        markets_ttl: float=3600.0, 마켓 코드의 유효 시간(초)
+        attach: bool=True, order.hooks에 무효화 함수를 등록할지 여부
+        '''
+
+        self.order = Order() if order is None else order
+        self.dataFetcher = DataFetcher() if dataFetcher is None else dataFetcher
+        self.chance_ttl = chance_ttl
+
+        self.cache = TTLCache()
+        self.cache.register("accounts", self.dataFetcher.get_account_info, accounts_ttl)
+        self.cache.register("markets", self.dataFetcher.get_market_code, markets_ttl)
+
+        if attach:
+            self.order.hooks.append(self._on_order)
+
+
+    def start(self, interval: float=1.0) -> None:
+        '''
+        TTLCache.start와 같습니다.
+        '''
+
+        self.cache.start(interval=interval)
+
+
+    def stop(self) -> None:
+        self.cache.stop()
+
+
+    def chance(self, market: str="KRW-BTC") -> Dict:
+        '''
+        마켓의 주문 가능 정보(Order.order_available의 결과)를 반환합니다.
+        '''
+
+        key = f"chance:{market}"
+
+        self.cache.register_default(key, lambda: self.order.order_available(market), self.chance_ttl)
+
+        return self.cache.get(key)
+
+
+    def fee(self, market: str="KRW-BTC", side: str="bid") -> float:
+        '''
+        마켓의 수수료율을 반환합니다. e.g. 0.0005
+        '''
+
+        return float(self.chance(market)[f"{side}_fee"])
+
+
+    def min_total(self, market: str="KRW-BTC", side: str="bid") -> float:
+        '''
+        마켓의 최소 주문 금액을 반환합니다.
+        '''
+
+        return float(self.chance(market)["market"][side]["min_total"])
+
+
+    def market_codes(self) -> List[str]:
+        '''
+        거래 가능한 마켓 코드 목록을 반환합니다.
+        '''
+
+        return [market["market"] for market in self.cache.get("markets")]
+
+
+    def balances(self) -> Dict[str, float]:
+        '''
+        화폐별 주문 가능 잔고(balance)를 반환합니다. 주문에 묶인 금액(locked)은 제외됩니다.
+        '''
+
+        return {account["currency"]: float(account["balance"]) for account in self.cache.get("accounts")}
+
+
+    def check(self, request: OrderRequest) -> None:
+        '''
+        준비된 주문이 최소 주문 금액과 주문 가능 잔고를 만족하는지 캐시된 정보로 확인합니다.
+
+        Raises
+        ------
+        ValueError: 마켓이 없거나, 주문 금액이 최소 주문 금액보다 작거나, 잔고가 부족한 경우 발생합니다.
+        '''
+
+        params = request.params
+        market, side = params["market"], params["side"]
+
+        if market not in self.market_codes():
+            raise ValueError(f"market {market} is not available.")
+
+        chance = self.chance(market)
+        balance = float(chance[f"{side}_account"]["balance"])
+
+        if params["ord_type"] == "price":
+            total = float(params["price"])
+        elif params["ord_type"] == "limit":
+            total = float(params["volume"]) * float(params["price"])
+        else:
+            total = None
+
+        if total is not None and total < self.min_total(market, side):
+            raise ValueError(f"order total {total} is less than min_total {self.min_total(market, side)} of {market}.")
+
+        # 매수는 수수료를 포함한 금액, 매도는 주문량을 잔고와 비교
+        required = total * (1 + self.fee(market, side)) if side == "bid" else float(params["volume"])
+
+        if required > balance:
+            raise ValueError(f"insufficient {side} balance for {market}: required {required}, available {balance}.")
+
+
+    def invalidate(self, market: str | None=None) -> None:
+        '''
+        체결 후 잔고 관련 항목(잔고, 해당 마켓의 주문 가능 정보)을 무효화합니다. market이 None인 경우 모든 항목을 무효화합니다.
+        주문 접수는 _on_order가 처리하지만 체결 알림은 받지 않으므로, 체결을 확인한 쪽(주문 상태 조회 등)에서 호출해야 합니다.
+        '''
+
+        if market is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate("accounts", f"chance:{market}")
+
+
+    def _on_order(self, request: OrderRequest, result: Dict) -> None:
+        # 접수된 주문은 잔고를 묶으므로 해당 마켓의 잔고 정보를 무효화, 이후의 체결은 invalidate()를 호출하는 쪽이 반영
+        self.invalidate(request.params["market"])
@@ -1,24 +1,157 @@
-from typing import Literal, Dict
+from typing import Callable, Literal, Dict, List
 from RequestManager.RequestManager import RequestManager
+from RequestManager.JWTSigner import JWTSigner
 
-import hashlib
-from urllib.parse import unquote, urlencode
+import requests
 
-import uuid
+import json
+import math
+import re
+from time import perf_counter
+
+
+# upbit 마켓 코드 형식(e.g. KRW-BTC)
+MARKET_PATTERN = re.compile(r"^[A-Z]+-[A-Z0-9]+$")
+
+# 주문 생성 요청에 대한 정상 응답 코드
+ORDER_ACCEPTED = (200, 201)
+
+
+class OrderTiming():
+    '''
+    주문 한 건의 단계별 시각입니다. 모든 값은 time.perf_counter() 기준 초 단위이며, 지나지 않은 단계는 None입니다.
+
+    Attributes
+    ----------
+    signal: float, 매매 신호가 발생한 시각
+    prepared: float, 주문 검증과 직렬화를 마친 시각
+    submitted: float | None, 요청을 보내기 직전의 시각(요청 제한 대기 이후)
+    acked: float | None, 서버의 응답을 받은 시각
+    '''
+
+
+    def __init__(self, signal: float, prepared: float) -> None:
+        self.signal = signal
+        self.prepared = prepared
+        self.submitted: float | None = None
+        self.acked: float | None = None
+
+
+    @property
+    def submit_latency(self) -> float | None:
+        # 신호 -> 전송
+        return None if self.submitted is None else self.submitted - self.signal
+
+
+    @property
+    def ack_latency(self) -> float | None:
+        # 전송 -> 응답
+        return None if self.submitted is None or self.acked is None else self.acked - self.submitted
+
+
+    @property
+    def total_latency(self) -> float | None:
+        # 신호 -> 응답
+        return None if self.acked is None else self.acked - self.signal
+
+
+    def as_dict(self) -> Dict[str, float | None]:
+        '''
+        단계별 지연 시간을 밀리초 단위로 반환합니다.
+        '''
+
+        to_ms = lambda value: None if value is None else value * 1e3
+
+        return {
+            "prepare_ms": to_ms(self.prepared - self.signal),
+            "submit_ms": to_ms(self.submit_latency),
+            "ack_ms": to_ms(self.ack_latency),
+            "total_ms": to_ms(self.total_latency),
+        }
+
+
+    def __repr__(self) -> str:
+        return f"OrderTiming({self.as_dict()})"
+
+
+class OrderRequest():
+    '''
+    검증과 직렬화를 마친 주문입니다. Order.prepare()로 만듭니다.
+
+    주문 파라미터, query_hash, 요청 본문을 미리 만들어 두므로 전송 시점에는
+    nonce를 넣은 토큰 서명만 하면 됩니다.
+
+    Attributes
+    ----------
+    params: Dict[str, str], upbit에 보낼 주문 파라미터
+    query_hash: str, params의 SHA512 해시
+    body: bytes, JSON으로 직렬화한 요청 본문
+    timing: OrderTiming, 단계별 시각
+    '''
+
+
+    def __init__(self, params: Dict[str, str], signal_time: float) -> None:
+        self.params = params
+        self.query_hash = JWTSigner.query_hash(params)
+        self.body = json.dumps(params).encode("utf-8")
+        self.timing = OrderTiming(signal=signal_time, prepared=perf_counter())
+
+
+    def __repr__(self) -> str:
+        return f"OrderRequest({self.params})"
 
 
 class Order():
-    def __init__(self):
-        self.requestManager = RequestManager()
+    '''
+    upbit API로 주문을 넣습니다.
+
+    주문은 prepare()에서 미리 검증/직렬화한 뒤 submit()으로 v1/orders에 POST합니다.
+    요청 제한기(RateLimiter)의 order 그룹 제한 외에 임의의 딜레이는 두지 않으며,
+    같은 주문이 두 번 들어가지 않도록 재시도하지 않습니다. 대신 전송 전에 retry_policy의 회로 차단기를 확인하고 결과를 기록하며,
+    응답을 받으면 hooks에 등록된 함수들을 (OrderRequest, 응답 JSON)으로 호출하여 지연 시간을 알립니다.
+
+
+    예제
+    ----
+
+    >> order = Order()
+    >> order.hooks.append(lambda request, result: print(request.timing))
+    >> request = order.prepare("bid", funds=10_000, signal_time=signal_time)
+    >> order.submit(request)
+    '''
+
+
+    def __init__(self, requestManager: RequestManager | None=None, timeout: float=10.0):
+        '''
+        Args
+        ----
+        requestManager: RequestManager | None=None, 주문에 사용할 RequestManager, None인 경우 새로 만듭니다.
+        timeout: float=10.0, 주문 요청 하나의 응답을 기다릴 최대 시간(초)
+
+        Raises
+        ------
+        ValueError: timeout이 0 이하인 경우 발생합니다.
+        '''
+
+        if timeout <= 0:
+            raise ValueError("timeout must be upper than 0.")
+
+        self.requestManager = RequestManager() if requestManager is None else requestManager
+        self.timeout = timeout
+        self.url = self.requestManager.generate_url(source="upbit", api_url="v1/orders")
+        self.hooks: List[Callable[[OrderRequest, Dict], None]] = []
+
 
     def order(
             self,
             order_type: Literal["bid", "ask"],
             volume: float=0.01,
-            method: Literal["market_price"]|float="market_price"
-            ) -> str:
+            method: Literal["market_price"]|float="market_price",
+            funds: float | None=None,
+            market: str="KRW-BTC",
+            ) -> Dict:
         '''
-        upbit API를 활용하여 주문을 넣습니다.
+        upbit API를 활용하여 주문을 넣습니다. prepare()와 submit()을 차례로 호출합니다.
 
         Args
         ----
@@ -26,69 +159,195 @@ class Order():
             - "bid"인 경우 매수. "ask"인 경우 매도 주문입니다.
 
         volume: float=0.01
-            - 주문량을 지정합니다.
+            - 주문량을 지정합니다. 시장가 매수에서는 사용하지 않습니다.
 
         method: Literal["market_price"] | float="market_price"
             - 주문 가격을 지정합니다.
             - "market_price"인 경우 시장가로 지정합니다.
             - 특정 값이 들어간 경우 지정가로 주문을 진행합니다.
+
+        funds: float | None=None
+            - 시장가 매수에 사용할 금액(KRW)을 지정합니다. 시장가 매수에서만 필요합니다.
+
+        market: str="KRW-BTC"
+            - 마켓 코드를 지정합니다.
+
+        Raises
+        ------
+        ValueError: 주문 파라미터가 잘못된 경우 발생합니다.
+        RuntimeError: 서버가 주문을 받아들이지 않은 경우 발생합니다.
+
+        Returns
+        -------
+        Dict, 서버가 돌려준 주문 정보
+        '''
+
+        return self.submit(self.prepare(order_type, volume=volume, method=method, funds=funds, market=market))
+
+
+    def prepare(
+            self,
+            order_type: Literal["bid", "ask"],
+            volume: float=0.01,
+            method: Literal["market_price"]|float="market_price",
+            funds: float | None=None,
+            market: str="KRW-BTC",
+            identifier: str | None=None,
+            signal_time: float | None=None,
+            ) -> OrderRequest:
         '''
+        주문을 검증하고 전송할 수 있는 형태로 직렬화합니다. 인자는 order()와 같습니다.
 
+        Args
+        ----
+        identifier: str | None=None, 주문을 구분할 사용자 지정 식별자, 같은 값으로 두 번 주문할 수 없습니다.
+        signal_time: float | None=None, 매매 신호가 발생한 time.perf_counter() 값, None인 경우 지금 시각
+
+        Raises
+        ------
+        ValueError: 주문 파라미터가 잘못된 경우 발생합니다.
+
+        Returns
+        -------
+        OrderRequest, 전송할 주문
+        '''
+
+        signal_time = perf_counter() if signal_time is None else signal_time
+
+        if order_type not in ("bid", "ask"):
+            raise ValueError(f"failed to parse order_type: {order_type}.")
+
+        if not MARKET_PATTERN.match(market):
+            raise ValueError(f"failed to parse market: {market}.")
+
+        params = {
+            "market": market,
+            "side": order_type,
+        }
 
         # 시장가 주문
         if method == "market_price":
-            # 지정가
-            price = None
-
-            # 매수
+            # 매수: 주문 금액으로 주문
             if order_type == "bid":
-                ord_type = "price"
+                if funds is None:
+                    raise ValueError("funds must be given for a market price bid.")
 
-            # 매도
-            elif order_type == "ask":
-                ord_type = "market"
+                params["ord_type"] = "price"
+                params["price"] = self._format_number(funds, "funds")
 
+            # 매도: 주문량으로 주문
             else:
-                raise ValueError(f"failed to parse order_type: {order_type}.")
+                params["ord_type"] = "market"
+                params["volume"] = self._format_number(volume, "volume")
 
         # 지정가 주문
-        elif type(method) is float and method > 0:
-            ord_type = "limit"
-            price = method
+        elif isinstance(method, (int, float)) and not isinstance(method, bool):
+            params["ord_type"] = "limit"
+            params["volume"] = self._format_number(volume, "volume")
+            params["price"] = self._format_number(method, "price")
 
         else:
-            raise ValueError(f"failed to parse order_type: {order_type}.")
+            raise ValueError(f"failed to parse method: {method}.")
 
+        if identifier is not None:
+            params["identifier"] = identifier
 
-        url = self.requestManager.generate_url(source="upbit", api_url="")
+        return OrderRequest(params, signal_time)
 
-        params = {
-            'market': 'KRW-BTC',
-            'side': order_type,
-            'ord_type': ord_type,
-            'price': price,
-        }
 
-        header = self.requestManager.generate_header(source="upbit", payload=dict())
+    def submit(self, request: OrderRequest) -> Dict:
+        '''
+        준비된 주문을 v1/orders로 전송하고 응답을 기다립니다. 실패하더라도 다시 보내지 않습니다.
+
+        Raises
+        ------
+        CircuitOpenError: upbit의 회로 차단기가 열려 있는 경우 발생합니다.
+        requests.RequestException: 연결에 실패했거나 timeout초 안에 응답이 없는 경우 발생합니다. 주문이 들어갔을 수 있으므로 주문 내역을 확인해야 합니다.
+        RuntimeError: 서버가 주문을 받아들이지 않은 경우 발생합니다.
+
+        Returns
+        -------
+        Dict, 서버가 돌려준 주문 정보
+        '''
+
+        requestManager = self.requestManager
+        policy = requestManager.retry_policy
+        source = policy.source(self.url)
+
+        policy.admit(source, requestManager.metrics)
+        waited = requestManager.rate_limiter.acquire(self.url, "POST")
+
+        headers = self.headers(request)
+        request.timing.submitted = perf_counter()
 
-        response = None
         try:
-            response = self.requestManager.delayed_get(url=url, headers=header)
-        except:
-            print("An error accured.")
-            return "Error"
+            response = requestManager.session(self.url).post(self.url, data=request.body, headers=headers, timeout=self.timeout)
+
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # 차단기에 실패만 기록하고 재시도하지 않음
+            policy.decide(source, 0, False, error=e, metrics=requestManager.metrics)
+            raise
+
+        request.timing.acked = perf_counter()
+
+        requestManager.rate_limiter.update(self.url, response.status_code, response.headers, "POST")
+        policy.decide(source, 0, False, response.status_code, metrics=requestManager.metrics)
 
-        return str(response.content)
+        if requestManager.metrics.enabled:
+            requestManager._record(self.url, "POST", response.status_code, request.timing.acked - request.timing.submitted, waited, len(response.content))
 
+        return self._finish(request, response.status_code, response.reason, response.content)
 
-    def order_available(self) -> Dict[str, str]:
+
+    def headers(self, request: OrderRequest) -> Dict[str, str]:
+        '''
+        주문 요청의 헤더를 만듭니다. nonce가 매번 달라야 하므로 전송 직전에 호출해야 합니다.
+        '''
+
+        header = self.requestManager.generate_header(
+            source="upbit",
+            payload={"query_hash": request.query_hash, "query_hash_alg": "SHA512"},
+        )
+        header["Content-Type"] = "application/json"
+
+        return header
+
+
+    def _finish(self, request: OrderRequest, status_code: int, reason: str, content: bytes) -> Dict:
+        if status_code not in ORDER_ACCEPTED:
+            raise RuntimeError((
+                "server responsed with error code: "
+                f"{status_code}, "
+                f"reason is: {reason}, "
+                f"body is: {content[:200]!r}"
+            ))
+
+        result = json.loads(content)
+
+        for hook in self.hooks:
+            hook(request, result)
+
+        return result
+
+
+    @staticmethod
+    def _format_number(value: float, name: str) -> str:
+        # upbit는 숫자를 문자열로 받으며, 지수 표기는 허용하지 않음
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+            raise ValueError(f"{name} must be a positive number. input is {value}")
+
+        return format(value, ".8f").rstrip("0").rstrip(".")
+
+
+    def order_available(self, market: str="KRW-BTC") -> Dict[str, str]:
         '''
         주문 가능 여부 정보를 가져옵니다.
         여기에는 수수료 정보도 포함됩니다.
+        자주 조회하는 경우 매번 요청하지 않도록 MetadataCache.chance()를 사용합니다.
 
         Args
         ----
-        None
+        market: str="KRW-BTC", 마켓 코드
 
         Raises
         ------
@@ -98,24 +357,19 @@ class Order():
         -------
         response: Dict[str, str], 주문 가능 여부 정보가 담긴 딕셔너리입니다.
         '''
-        url = self.requestManager.generate_url(
-            source="upbit",
-            api_url="v1/orders/chance",
-
-            )
 
         params = {
-            'market': 'KRW-BTC'
+            'market': market
         }
 
-        payload = {
-            'nonce': str(uuid.uuid4()),
-            'query_hash': self._encode_queries(params=params, hash_alg="SHA512"),
-            'query_hash_alg': "SHA512",
-        }
+        url = self.requestManager.generate_url(
+            source="upbit",
+            api_url="v1/orders/chance",
+            query=params,
+            )
 
-        header = self.requestManager.generate_header(source="upbit", payload=payload)
-        response = self.requestManager.delayed_get(url=url, headers=header, _raise_on_error=False)
+        header = self.requestManager.generate_header(source="upbit", query=params)
+        response = self.requestManager.get(url=url, headers=header)
 
         return dict(response.json())
 
@@ -128,20 +382,11 @@ class Order():
         ----
         params: Dict[str, str]
             - 해시화를 진행할 파라미터
-        
+
         hash_alg: Literal["SHA512"]="SHA512"
             - 해시 함수를 지정합니다.
-        
 
-        '''
 
-        if hash_alg != "SHA512":
-            raise NotImplementedError(f"hash alg {hash_alg} is not supported, only SHA512 is supported for now.")
-
-        query_string = unquote(urlencode(params, doseq=True)).encode("utf-8")
-
-        m = hashlib.sha512()
-        m.update(query_string)
-        query_hash = m.hexdigest()
+        '''
 
-        return query_hash
+        return JWTSigner.query_hash(params, hash_alg=hash_alg)